@@ -0,0 +1,5 @@
+"""
+Package: benchmarks
+Performance benchmarks for config_manager. These are not collected by pytest, run them as modules, e.g.
+`python -m benchmarks.bench_json`.
+"""
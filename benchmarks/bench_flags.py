@@ -0,0 +1,50 @@
+"""
+Package: benchmarks
+Module: bench_flags
+Time feature flag evaluation: single users for plain, rule and variant flags, and batches of users.
+
+Usage: python -m benchmarks.bench_flags [--batch 10000]
+"""
+
+import argparse
+
+from config_manager.flags import FlagSet
+
+from .common import format_seconds, measure
+
+DEFINITIONS = {
+    "plain": {"rollout": 25},
+    "rules": {
+        "rollout": 10,
+        "deny": ["user-0"],
+        "rules": [
+            {"attribute": "country", "in": ["DE", "FR", "NL"], "rollout": 50},
+            {"attribute": "plan", "in": ["enterprise"], "rollout": 100},
+        ],
+    },
+    "variants": {"rollout": 50, "variants": {"control": 50, "blue": 25, "green": 25}},
+}
+
+
+def run(batch):
+    flags = FlagSet(DEFINITIONS)
+    attributes = {"country": "DE", "plan": "free"}
+    user_ids = [f"user-{i}" for i in range(batch)]
+    print(f"{'flag':>9} {'single':>12} {'per user in batch':>18}")
+    for name in DEFINITIONS:
+        single = measure(lambda: flags.is_enabled(name, "user-42", attributes))
+        many = measure(
+            lambda: flags.evaluate_many(name, user_ids, attributes), repeat=1
+        )
+        print(f"{name:>9} {format_seconds(single)} {format_seconds(many / batch):>18}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args(argv)
+    run(args.batch)
+
+
+if __name__ == "__main__":
+    main()
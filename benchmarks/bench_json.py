@@ -0,0 +1,48 @@
+"""
+Package: benchmarks
+Module: bench_json
+Compare JSONConfigLoader backends and write modes over generated configs from 1KB to 50MB.
+
+Usage: python -m benchmarks.bench_json [--sizes 1KB 1MB 50MB]
+"""
+
+import argparse
+import os
+import tempfile
+
+from config_manager.json_loader import JSON_BACKENDS, JSONConfigLoader
+
+from .common import SIZES, format_seconds, make_config, measure, parse_size
+
+
+def run(sizes):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.json")
+        print(
+            f"{'size':>6} {'backend':>8} {'mode':>7} {'save':>12} {'load':>12} {'bytes':>12}"
+        )
+        for size in sizes:
+            config = make_config(parse_size(size))
+            for name in sorted(JSON_BACKENDS):
+                for pretty in (True, False):
+                    loader = JSONConfigLoader(
+                        file_path=path, backend=name, pretty=pretty
+                    )
+                    save = measure(lambda: loader.save(config), repeat=1)
+                    load = measure(loader.load, repeat=1)
+                    mode = "pretty" if pretty else "compact"
+                    print(
+                        f"{size:>6} {name:>8} {mode:>7} {format_seconds(save)} "
+                        f"{format_seconds(load)} {os.path.getsize(path):>12}"
+                    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES))
+    args = parser.parse_args(argv)
+    run(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
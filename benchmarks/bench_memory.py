@@ -0,0 +1,85 @@
+"""
+Package: benchmarks
+Module: bench_memory
+Measure per-instance memory of Configuration and loader objects held by the thousand, as in a multi-application
+registry, comparing plain dicts with shared key tables (compact=True).
+
+Usage: python -m benchmarks.bench_memory [--instances 1000] [--keys 10 100]
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from config_manager.configuration import Configuration
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+
+class DictConfiguration(Configuration):
+    """
+    Configuration with a per-instance __dict__, the layout before __slots__.
+    """
+
+
+class DictSQLiteConfigLoader(SQLiteConfigLoader):
+    """
+    SQLiteConfigLoader with a per-instance __dict__, the layout before __slots__.
+    """
+
+
+def make_rows(key_count, app_index):
+    # Rows read from a database carry fresh key strings, join() avoids compile-time interning.
+    return {
+        "".join(("KEY_", str(i))): f"value-{app_index}-{i}" for i in range(key_count)
+    }
+
+
+def per_instance_bytes(factory, instances):
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(instances)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return used / instances
+
+
+def run(instances, key_counts):
+    layouts = {
+        "dict attrs, dict config": (DictConfiguration, DictSQLiteConfigLoader, False),
+        "slots, dict config": (Configuration, SQLiteConfigLoader, False),
+        "slots, compact config": (Configuration, SQLiteConfigLoader, True),
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        location = os.path.join(directory, "config.db")
+        print(f"{'keys':>6} {'layout':<26} {'bytes/instance':>15}")
+        for key_count in key_counts:
+            for name, (config_class, loader_class, compact) in layouts.items():
+
+                def factory(i):
+                    app_id = f"app-{i:08d}"
+                    loader = loader_class(location, app_name=f"app {i}", app_id=app_id)
+                    return config_class(
+                        loader,
+                        app_id=app_id,
+                        config=make_rows(key_count, i),
+                        compact=compact,
+                    )
+
+                size = per_instance_bytes(factory, instances)
+                print(f"{key_count:>6} {name:<26} {size:>15,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--instances", type=int, default=1000)
+    parser.add_argument("--keys", nargs="+", type=int, default=[10, 100])
+    args = parser.parse_args(argv)
+    run(args.instances, args.keys)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Package: benchmarks
+Module: bench_yaml
+Compare the libyaml (CSafeLoader/CSafeDumper) and pure-Python YAMLConfigLoader paths.
+
+Usage: python -m benchmarks.bench_yaml [--sizes 1KB 1MB]
+"""
+
+import argparse
+import os
+import tempfile
+
+from config_manager.yaml_loader import HAS_LIBYAML, YAMLConfigLoader
+
+from .common import format_seconds, make_config, measure, parse_size
+
+
+def run(sizes):
+    implementations = [False, True] if HAS_LIBYAML else [False]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.yaml")
+        print(f"{'size':>6} {'impl':>7} {'save':>12} {'load':>12}")
+        for size in sizes:
+            config = make_config(parse_size(size))
+            for use_libyaml in implementations:
+                loader = YAMLConfigLoader(file_path=path, use_libyaml=use_libyaml)
+                save = measure(lambda: loader.save(config), repeat=1)
+                load = measure(loader.load, repeat=1)
+                name = "libyaml" if use_libyaml else "python"
+                print(
+                    f"{size:>6} {name:>7} {format_seconds(save)} {format_seconds(load)}"
+                )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", default=["1KB", "100KB", "1MB", "10MB"])
+    args = parser.parse_args(argv)
+    run(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Package: benchmarks
+Module: common
+Helpers shared by the benchmark scripts.
+"""
+
+import time
+from typing import Any, Callable, Dict
+
+SIZES = {
+    "1KB": 1_000,
+    "100KB": 100_000,
+    "1MB": 1_000_000,
+    "10MB": 10_000_000,
+    "50MB": 50_000_000,
+}
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse a size label such as '10MB' into bytes.
+    :param size: Size label.
+    :return: Number of bytes.
+    """
+    return SIZES[size] if size in SIZES else int(size)
+
+
+def make_config(target_bytes: int) -> Dict[str, Any]:
+    """
+    Generate a nested configuration whose JSON encoding is roughly target_bytes long.
+    :param target_bytes: Approximate encoded size.
+    :return: Dict containing generated configuration data.
+    """
+    config: Dict[str, Any] = {}
+    entry = {
+        "host": "db-replica.internal.example.com",
+        "port": 5432,
+        "weight": 0.75,
+        "enabled": True,
+        "tags": ["primary", "eu-west-1", "ssd"],
+    }
+    # Each entry encodes to roughly 130 bytes including its key.
+    for i in range(max(1, target_bytes // 130)):
+        config[f"SERVICE_{i:08d}"] = dict(entry, port=5432 + i % 100)
+    return config
+
+
+def measure(func: Callable[[], Any], min_time: float = 0.2, repeat: int = 3) -> float:
+    """
+    Measure the best mean wall time of func over several rounds.
+    :param func: Zero-argument callable to time.
+    :param min_time: Minimum duration of a round, in seconds.
+    :param repeat: Number of rounds.
+    :return: Best seconds per call.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:9.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:9.2f} ms"
+    return f"{seconds:9.3f} s "
@@ -0,0 +1,248 @@
+"""
+Package: benchmarks
+Module: suite
+Reproducible benchmark suite for config_manager: import time, Configuration construction and access, save cost per
+backend and loader load/save across key counts.
+
+Usage:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.15
+
+PostgreSQL cases run when --postgres-uri or CONFIG_MANAGER_BENCH_POSTGRES_URI points at a local server, they are
+skipped otherwise. With --compare, the exit status is 1 when any case is slower than the baseline by more than the
+threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config_manager.base_loader import BaseConfigLoader
+from config_manager.binary_loader import BinaryConfigLoader
+from config_manager.configuration import Configuration
+from config_manager.json_loader import JSONConfigLoader
+from config_manager.sqlite_loader import SQLiteConfigLoader
+from config_manager.yaml_loader import YAMLConfigLoader
+
+from .common import format_seconds, measure
+
+DEFAULT_KEY_COUNTS = [10, 100, 1_000, 10_000, 100_000]
+QUICK_KEY_COUNTS = [10, 1_000]
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+class MemoryLoader(BaseConfigLoader):
+    """
+    Loader without I/O, isolates Configuration overhead from backend cost.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+
+    def load(self) -> Dict[str, Any]:
+        return dict(self.data)
+
+    def save(self, config: Dict[str, Any]) -> None:
+        pass
+
+
+def make_flat_config(key_count: int) -> Dict[str, Any]:
+    return {f"KEY_{i:06d}": f"value-{i}" for i in range(key_count)}
+
+
+def import_time_cases() -> Iterator[Case]:
+    command = [sys.executable, "-c", "import config_manager"]
+    interpreter = [sys.executable, "-c", "pass"]
+
+    def import_package():
+        subprocess.run(command, check=True)
+
+    def start_interpreter():
+        subprocess.run(interpreter, check=True)
+
+    yield "import/interpreter_baseline", start_interpreter
+    yield "import/config_manager", import_package
+
+
+def access_cases(key_count: int) -> Iterator[Case]:
+    data = make_flat_config(key_count)
+    data["db"] = {"replicas": [{"host": "r1"}, {"host": "r2"}]}
+    loader = MemoryLoader(data)
+    config = Configuration(loader, app_id="bench")
+    key = f"KEY_{key_count // 2:06d}"
+    config.get("db.replicas.1.host")
+    batch = range(1000)
+
+    def getitem():
+        for _ in batch:
+            config[key]
+
+    def get():
+        for _ in batch:
+            config.get(key)
+
+    def getattr_():
+        for _ in batch:
+            getattr(config, key)
+
+    def dotted_get():
+        for _ in batch:
+            config.get("db.replicas.1.host")
+
+    yield f"configuration/construct/{key_count}", lambda: Configuration(
+        loader, app_id="bench"
+    )
+    # Access cases run 1000 lookups per call.
+    yield f"configuration/getitem_x1000/{key_count}", getitem
+    yield f"configuration/get_x1000/{key_count}", get
+    yield f"configuration/getattr_x1000/{key_count}", getattr_
+    yield f"configuration/dotted_get_x1000/{key_count}", dotted_get
+
+
+def backend_loaders(
+    directory: str, postgres_uri: Optional[str]
+) -> Iterator[Tuple[str, Callable[[], BaseConfigLoader]]]:
+    yield "json", lambda: JSONConfigLoader(os.path.join(directory, "config.json"))
+    yield "yaml", lambda: YAMLConfigLoader(os.path.join(directory, "config.yaml"))
+    yield "binary", lambda: BinaryConfigLoader(os.path.join(directory, "config.bin"))
+    yield "sqlite", lambda: SQLiteConfigLoader(
+        os.path.join(directory, "config.db"), app_name="bench", app_id="bench"
+    )
+    if postgres_uri:
+        from config_manager.postgres_loader import PostgresConfigLoader
+
+        app_id = str(uuid.uuid4())
+
+        def postgres_loader():
+            loader = PostgresConfigLoader(
+                postgres_uri, app_name=f"bench-{app_id}", app_id=app_id
+            )
+            return loader
+
+        yield "postgres", postgres_loader
+
+
+def prepare_postgres(postgres_uri: str) -> None:
+    from config_manager.postgres_loader import PostgresConfigLoader
+
+    PostgresConfigLoader(postgres_uri, app_name="bench").initialize_database()
+
+
+def backend_cases(
+    key_count: int, directory: str, postgres_uri: Optional[str]
+) -> Iterator[Case]:
+    data = make_flat_config(key_count)
+    for name, factory in backend_loaders(directory, postgres_uri):
+        loader = factory()
+        if name == "postgres":
+            prepare_postgres(postgres_uri)
+            loader.initialize_application()
+        loader.save(data)
+        config = Configuration(loader, app_id="bench")
+        counter = iter(range(10**9))
+
+        def setitem(config=config, counter=counter):
+            config["BENCH_KEY"] = next(counter)
+
+        yield f"{name}/save/{key_count}", lambda loader=loader: loader.save(data)
+        yield f"{name}/load/{key_count}", loader.load
+        yield f"{name}/setitem/{key_count}", setitem
+
+
+def collect_cases(args: argparse.Namespace, directory: str) -> Iterator[Case]:
+    if not args.skip_import:
+        yield from import_time_cases()
+    for key_count in args.keys:
+        yield from access_cases(key_count)
+        yield from backend_cases(key_count, directory, args.postgres_uri)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, func in collect_cases(args, directory):
+            if args.filter and args.filter not in name:
+                continue
+            seconds = measure(func, min_time=args.min_time, repeat=args.repeat)
+            results[name] = seconds
+            print(f"{name:<48} {format_seconds(seconds)}", flush=True)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """
+    Compare results against a baseline run.
+    :param current: Seconds per case of this run.
+    :param baseline: Seconds per case of the baseline run.
+    :param threshold: Allowed slowdown as a fraction, e.g. 0.1 for 10%.
+    :return: Names of the cases that regressed.
+    """
+    regressions = []
+    print(f"\n{'case':<48} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, seconds in current.items():
+        if name not in baseline:
+            continue
+        change = seconds / baseline[name] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<48} {format_seconds(baseline[name])} {format_seconds(seconds)} "
+            f"{change:+8.1%}{flag}"
+        )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--keys", nargs="+", type=int, default=DEFAULT_KEY_COUNTS)
+    parser.add_argument("--quick", action="store_true", help="Run 10 and 1000 keys.")
+    parser.add_argument("--filter", help="Only run cases containing this string.")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-import", action="store_true")
+    parser.add_argument(
+        "--postgres-uri", default=os.environ.get("CONFIG_MANAGER_BENCH_POSTGRES_URI")
+    )
+    parser.add_argument("--output", help="Write results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.keys = QUICK_KEY_COUNTS
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=4)
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(report["results"], baseline, args.threshold)
+        if regressions:
+            print(
+                f"\n{len(regressions)} case(s) regressed beyond {args.threshold:.0%}."
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
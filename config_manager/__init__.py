@@ -1,7 +1,7 @@
 """
 A simple configuration manager for Python applications.
 
-This package provides a simple way to load and save configuration data from various sources such as JSON, YAML, environment variables, SQLite, and PostgreSQL databases.
+This package provides a simple way to load and save configuration data from various sources such as JSON, YAML, environment variables, memory-mapped binary files, SQLite, and PostgreSQL databases, or from a ConfigServer over HTTP.
 
 The package is designed to be easy to use and flexible, allowing you to choose the configuration source that best fits your needs.
 
@@ -27,22 +27,67 @@ For more information, please refer to the documentation at https://git.willmo.de
 
 """
 
-from .configuration import Configuration
-from .env_loader import EnvConfigLoader
-from .json_loader import JSONConfigLoader
-from .postgres_loader import PostgresConfigLoader
-from .sqlite_loader import SQLiteConfigLoader
-from .yaml_loader import YAMLConfigLoader
+import importlib
+from typing import Any, List
+
+# Public names and the modules defining them. Modules are imported on first access, so a process only pays for
+# the backends it uses (see __getattr__).
+_EXPORTS = {
+    "BinaryConfigLoader": "binary_loader",
+    "ConfigConflictError": "concurrency",
+    "ConfigServer": "server",
+    "Configuration": "configuration",
+    "ConfigurationRegistry": "registry",
+    "EnvConfigLoader": "env_loader",
+    "FlagSet": "flags",
+    "HTTPConfigLoader": "http_loader",
+    "InterpolationError": "interpolation",
+    "JSONConfigLoader": "json_loader",
+    "YAMLConfigLoader": "yaml_loader",
+    "PostgresConfigLoader": "postgres_loader",
+    "SQLiteConfigLoader": "sqlite_loader",
+    "SnapshotLoader": "snapshot",
+    "Secret": "encryption",
+    "SecretBox": "encryption",
+    "Profile": "profiling",
+    "profile": "profiling",
+}
 
 __all__ = [
+    "BinaryConfigLoader",
+    "ConfigConflictError",
+    "ConfigServer",
     "Configuration",
+    "ConfigurationRegistry",
     "EnvConfigLoader",
+    "FlagSet",
+    "HTTPConfigLoader",
+    "InterpolationError",
     "JSONConfigLoader",
     "YAMLConfigLoader",
     "PostgresConfigLoader",
     "SQLiteConfigLoader",
+    "SnapshotLoader",
+    "Secret",
+    "SecretBox",
+    "Profile",
+    "profile",
 ]
 
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
 __package__ = "config_manager"
 __version__ = "0.1.0"
 __author__ = "Will Morris"
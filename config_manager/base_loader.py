@@ -5,14 +5,61 @@ This module contains the BaseConfigLoader class that is used to load and save co
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from .instrumentation import instrumented
+
+
+def _describe_save(loader, result, config, *args, **kwargs):
+    return None, config
+
+
+def _describe_changes(loader, result, upserts, deletes, *args, **kwargs):
+    return [*upserts, *deletes], upserts
+
+
+def _describe_save_many(loader, result, configs, *args, **kwargs):
+    # Counted in rows, like save().
+    return [key for config in configs.values() for key in config], configs
 
 
 class BaseConfigLoader(ABC):
     """
     Base class for configuration loaders
+
+    The load, load_keys, load_many, save, save_many, apply_changes and compare_and_set methods of every subclass are
+    instrumented, see the instrumentation module.
     """
 
+    __slots__ = ("__weakref__",)
+
+    _instrumented_methods = {
+        "load": None,
+        "load_keys": None,
+        "load_many": None,
+        "save": _describe_save,
+        "save_many": _describe_save_many,
+        "apply_changes": _describe_changes,
+        "compare_and_set": None,
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, describe in cls._instrumented_methods.items():
+            method = cls.__dict__.get(name)
+            if method is None or getattr(method, "__instrumented__", False):
+                continue
+            if getattr(method, "__isabstractmethod__", False):
+                continue
+            setattr(cls, name, instrumented("loader", name, describe)(method))
+
+    def payload_size(self) -> Optional[int]:
+        """
+        Size in bytes of the stored configuration, reported to instrumentation observers.
+        :return: Size in bytes, or None if the loader cannot tell cheaply.
+        """
+        return None
+
     @abstractmethod
     def load(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,316 @@
+"""
+Package: config_manager
+Module: binary_loader
+This module contains the BinaryConfigLoader class that is used to load and save configuration data from a compact,
+memory-mapped binary format with a hash index.
+
+File layout (all integers little-endian):
+
+    header   magic b"CMCB", format version (u16), flags (u16), entry count (u32),
+             table size (u32), table offset (u64)
+    entries  one record per key, in insertion order:
+             key length (u32), value length (u32), value tag (u8), key bytes, value bytes
+    table    open-addressing hash table of (key hash (u64), entry offset (u64)) slots,
+             an entry offset of 0 marks an empty slot
+
+Opening a file only maps it and reads the header, lookups hash the key, probe the table and decode a single entry.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from .base_loader import BaseConfigLoader
+
+MAGIC = b"CMCB"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIIQ")
+_ENTRY = struct.Struct("<IIB")
+_SLOT = struct.Struct("<QQ")
+
+TAG_NONE = 0
+TAG_STR = 1
+TAG_INT = 2
+TAG_FLOAT = 3
+TAG_BOOL = 4
+TAG_JSON = 5
+
+
+def _hash_key(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def _encode_value(value: Any) -> Tuple[int, bytes]:
+    if value is None:
+        return TAG_NONE, b""
+    if isinstance(value, bool):
+        return TAG_BOOL, b"\x01" if value else b"\x00"
+    if isinstance(value, str):
+        return TAG_STR, value.encode("utf-8")
+    if isinstance(value, int):
+        return TAG_INT, str(value).encode("ascii")
+    if isinstance(value, float):
+        return TAG_FLOAT, repr(value).encode("ascii")
+    return TAG_JSON, json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _decode_value(tag: int, data: bytes) -> Any:
+    if tag == TAG_STR:
+        return data.decode("utf-8")
+    if tag == TAG_NONE:
+        return None
+    if tag == TAG_INT:
+        return int(data)
+    if tag == TAG_FLOAT:
+        return float(data)
+    if tag == TAG_BOOL:
+        return data == b"\x01"
+    if tag == TAG_JSON:
+        return json.loads(data)
+    raise ValueError(f"Unknown value tag in binary configuration: {tag}")
+
+
+def encode_binary(config: Mapping[str, Any]) -> bytes:
+    """
+    Serialize configuration data to the binary format.
+    :param config: A mapping containing configuration data.
+    :return: The encoded bytes.
+    """
+    chunks = []
+    slots = []
+    offset = _HEADER.size
+    for key, value in config.items():
+        key_bytes = str(key).encode("utf-8")
+        tag, value_bytes = _encode_value(value)
+        record = _ENTRY.pack(len(key_bytes), len(value_bytes), tag)
+        chunks.append(record)
+        chunks.append(key_bytes)
+        chunks.append(value_bytes)
+        slots.append((_hash_key(key_bytes), offset))
+        offset += len(record) + len(key_bytes) + len(value_bytes)
+
+    table_size = 1
+    while table_size < len(slots) * 2:
+        table_size <<= 1
+    table = [(0, 0)] * table_size
+    mask = table_size - 1
+    for key_hash, entry_offset in slots:
+        index = key_hash & mask
+        while table[index][1]:
+            index = (index + 1) & mask
+        table[index] = (key_hash, entry_offset)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(slots), table_size, offset)
+    return b"".join([header, *chunks, b"".join(_SLOT.pack(*slot) for slot in table)])
+
+
+class BinaryConfigReader(Mapping):
+    """
+    Read-only view over an encoded binary configuration.
+
+    Values are decoded on access, nothing is cached.
+    """
+
+    def __init__(self, buffer):
+        """
+        Initialize the reader over a bytes-like object or mmap.
+        :param buffer: Encoded binary configuration.
+        """
+        magic, version, _flags, count, table_size, table_offset = _HEADER.unpack_from(
+            buffer, 0
+        )
+        if magic != MAGIC:
+            raise ValueError("Not a binary configuration file.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary configuration version: {version}")
+        self._buffer = buffer
+        self._count = count
+        self._mask = table_size - 1
+        self._table_offset = table_offset
+
+    def _read_entry(self, offset: int) -> Tuple[bytes, int, int, int]:
+        key_len, value_len, tag = _ENTRY.unpack_from(self._buffer, offset)
+        key_start = offset + _ENTRY.size
+        value_start = key_start + key_len
+        return (
+            self._buffer[key_start:value_start],
+            tag,
+            value_start,
+            value_start + value_len,
+        )
+
+    def _find(self, key: str) -> Optional[Tuple[int, int, int]]:
+        key_bytes = key.encode("utf-8")
+        key_hash = _hash_key(key_bytes)
+        index = key_hash & self._mask
+        while True:
+            slot_hash, entry_offset = _SLOT.unpack_from(
+                self._buffer, self._table_offset + index * _SLOT.size
+            )
+            if not entry_offset:
+                return None
+            if slot_hash == key_hash:
+                entry_key, tag, start, end = self._read_entry(entry_offset)
+                if entry_key == key_bytes:
+                    return tag, start, end
+            index = (index + 1) & self._mask
+
+    def __getitem__(self, key: str) -> Any:
+        if not isinstance(key, str):
+            raise KeyError(key)
+        found = self._find(key)
+        if found is None:
+            raise KeyError(key)
+        tag, start, end = found
+        return _decode_value(tag, self._buffer[start:end])
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entries(self) -> Iterator[Tuple[bytes, int, int, int]]:
+        offset = _HEADER.size
+        while offset < self._table_offset:
+            entry = self._read_entry(offset)
+            yield entry
+            offset = entry[3]
+
+    def __iter__(self) -> Iterator[str]:
+        for key_bytes, _tag, _start, _end in self._entries():
+            yield key_bytes.decode("utf-8")
+
+    def iter_items(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Decode every entry in file order with a single sequential scan.
+        :return: Iterator of (key, value) pairs.
+        """
+        for key_bytes, tag, start, end in self._entries():
+            yield key_bytes.decode("utf-8"), _decode_value(tag, self._buffer[start:end])
+
+
+class BinaryConfigMapping(MutableMapping):
+    """
+    Mutable configuration mapping backed by a BinaryConfigReader.
+
+    Writes and deletions are kept in an overlay, so the mapped file is never modified in place.
+    """
+
+    def __init__(self, reader: BinaryConfigReader):
+        self._reader = reader
+        self._overlay: Dict[str, Any] = {}
+        self._deleted = set()
+        self._len = len(reader)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._overlay:
+            return self._overlay[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        return self._reader[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self:
+            self._len += 1
+        self._overlay[key] = value
+        self._deleted.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._overlay:
+            del self._overlay[key]
+            if key in self._reader:
+                self._deleted.add(key)
+        elif key not in self._deleted and key in self._reader:
+            self._deleted.add(key)
+        else:
+            raise KeyError(key)
+        self._len -= 1
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._overlay:
+            return True
+        return key not in self._deleted and key in self._reader
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._reader:
+            if key not in self._deleted and key not in self._overlay:
+                yield key
+        yield from self._overlay
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.copy()!r})"
+
+    def clear(self) -> None:
+        self._overlay.clear()
+        self._deleted.update(self._reader)
+        self._len = 0
+
+    def copy(self) -> Dict[str, Any]:
+        data = {
+            key: value
+            for key, value in self._reader.iter_items()
+            if key not in self._deleted
+        }
+        data.update(self._overlay)
+        return data
+
+
+class BinaryConfigLoader(BaseConfigLoader):
+    """
+    Configuration loader for memory-mapped binary configuration files.
+    """
+
+    __slots__ = ("file_path",)
+
+    def __init__(self, file_path: str):
+        """
+        Initialize BinaryConfigLoader with file path.
+        :param file_path: Path to the binary configuration file.
+        """
+        self.file_path = file_path
+
+    def open(self) -> BinaryConfigReader:
+        """
+        Memory-map the configuration file and return a read-only view over it.
+        :return: BinaryConfigReader over the mapped file.
+        """
+        if not self.file_path:
+            raise ValueError("File path must be provided for BinaryConfigLoader.")
+        with open(self.file_path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return BinaryConfigReader(mapped)
+
+    def payload_size(self) -> Optional[int]:
+        if self.file_path and os.path.exists(self.file_path):
+            return os.path.getsize(self.file_path)
+        return None
+
+    def load(self) -> BinaryConfigMapping:
+        """
+        Load configuration data from the binary file without decoding any values.
+        :return: Mapping containing configuration data.
+        """
+        return BinaryConfigMapping(self.open())
+
+    def save(self, config: Mapping[str, Any]) -> bytes | None:
+        """
+        Save configuration data to the binary file.
+        :param config: A mapping containing configuration data.
+        :return: The encoded bytes if no file path is set, otherwise None.
+        """
+        data = encode_binary(config)
+        if not self.file_path:
+            return data
+        temp_path = f"{self.file_path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, self.file_path)
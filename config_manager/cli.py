@@ -0,0 +1,311 @@
+"""
+Package: config_manager
+Module: cli
+This module contains the `config-manager` command line interface for scripted and bulk configuration operations.
+
+Backends are given as a single string, e.g. 'config.db', 'sqlite:config.db', 'postgresql://...', 'config.json',
+'yaml:config.yaml', 'http://127.0.0.1:8080' or 'env'. Only the modules of the backends in use are imported.
+
+Example usage:
+
+```bash
+config-manager get config.db --app-id $APP_ID DB_HOST
+config-manager set config.db --app-id $APP_ID DB_HOST=db.internal DB_PORT=5432
+config-manager dump config.db --app-id $APP_ID --format ndjson > config.ndjson
+config-manager set postgresql://... --app-id $APP_ID - < config.ndjson  # one write for every key
+config-manager diff config.db postgresql://... --app-id $APP_ID
+config-manager migrate config.db postgresql://... --checkpoint migrate.checkpoint
+```
+"""
+
+import argparse
+import json
+import sys
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from .configuration import Configuration
+from .working_set import lookup_path
+
+_MISSING = object()
+
+_EXTENSIONS = {
+    ".json": "json",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".bin": "binary",
+    ".db": "sqlite",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+}
+
+
+def parse_backend(spec: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parse a backend string into a configuration type and loader arguments.
+    :param spec: Backend string, e.g. 'sqlite:config.db' or 'postgresql://user@host/db'.
+    :return: (config_type, kwargs) for Configuration._get_loader().
+    """
+    if spec.startswith(("postgres://", "postgresql://")):
+        return "postgres", {"postgres_uri": spec}
+    if spec.startswith(("http://", "https://")):
+        return "http", {"base_url": spec}
+    if spec in ("env", "env:"):
+        return "env", {}
+    config_type, separator, path = spec.partition(":")
+    if separator and config_type in ("sqlite", "json", "yaml", "binary"):
+        path = path[2:] if path.startswith("//") else path
+    else:
+        path = spec
+        extension = "." + spec.rsplit(".", 1)[-1].lower() if "." in spec else ""
+        if extension not in _EXTENSIONS:
+            raise ValueError(
+                f"Cannot tell the backend of {spec!r}, use e.g. 'sqlite:{spec}'."
+            )
+        config_type = _EXTENSIONS[extension]
+    if config_type == "sqlite":
+        return config_type, {"sqlite_location": path}
+    return config_type, {"file_path": path}
+
+
+def open_loader(
+    spec: str,
+    app_id: Optional[str] = None,
+    nested: bool = False,
+    require_app: bool = True,
+):
+    """
+    Create the loader of a backend string.
+    :param spec: Backend string, see parse_backend().
+    :param app_id: Application of the SQL and HTTP backends.
+    :param nested: Store nested values as dotted keys in the SQL backends.
+    :param require_app: Raise if a SQL or HTTP backend is given without app_id.
+    :return: The loader.
+    """
+    config_type, kwargs = parse_backend(spec)
+    if require_app and not app_id and config_type in ("sqlite", "postgres", "http"):
+        raise ValueError(f"--app-id is required for {config_type} backends.")
+    if config_type in ("sqlite", "postgres"):
+        kwargs["nested"] = nested
+    return Configuration._get_loader(
+        config_type, app_name="", app_id=app_id or "", **kwargs
+    )
+
+
+def read_pairs(stream: IO[str]) -> Iterator[Tuple[str, Any]]:
+    """
+    Read key/value pairs from NDJSON, one {"key": ..., "value": ...} object or one {key: value, ...} object per
+    line. A single JSON object spanning several lines, as written by `dump`, is read too.
+    :param stream: Text stream.
+    :return: Iterator of (key, value) pairs.
+    """
+    text = stream.read()
+    stripped = text.lstrip()
+    if stripped.startswith("{") and "\n" in stripped.rstrip():
+        try:
+            document = json.loads(text)
+        except ValueError:
+            document = None
+        if isinstance(document, dict):
+            yield from _pairs(document)
+            return
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {number}: {e}") from e
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number}: expected a JSON object.")
+        yield from _pairs(record)
+
+
+def _pairs(record: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+    if set(record) == {"key", "value"}:
+        yield str(record["key"]), record["value"]
+    else:
+        yield from record.items()
+
+
+def write_changes(loader: Any, changes: Dict[str, Any]) -> None:
+    """
+    Write many keys with one backend write: a single save_many() transaction for the SQL loaders, a single save()
+    of the merged configuration otherwise.
+    :param loader: Loader to write to.
+    :param changes: Keys and values to set.
+    :return: None
+    """
+    if not changes:
+        return
+    save_many = getattr(loader, "save_many", None)
+    if save_many is not None:
+        # Registers a new application, and with nested=True deletes the dotted rows of replaced sub-trees.
+        save_many({loader.app_id: changes})
+        return
+    try:
+        config = dict(loader.load())
+    except FileNotFoundError:
+        config = {}
+    config.update(changes)
+    loader.save(config)
+
+
+def _print_value(value: Any, out: IO[str]) -> None:
+    if isinstance(value, str):
+        out.write(value + "\n")
+    else:
+        out.write(json.dumps(value, default=str) + "\n")
+
+
+def command_get(args: argparse.Namespace, out: IO[str]) -> int:
+    loader = open_loader(args.backend, args.app_id, args.nested)
+    roots = [key.split(".", 1)[0] for key in args.keys]
+    load_keys = getattr(loader, "load_keys", None)
+    # Only the requested keys are read from the SQL backends.
+    config = load_keys(roots + args.keys) if load_keys is not None else loader.load()
+    status = 0
+    for key in args.keys:
+        value = config.get(key, _MISSING)
+        if value is _MISSING and "." in key:
+            value = lookup_path(config, key, _MISSING)
+        if value is _MISSING:
+            print(f"Key not found: {key}", file=sys.stderr)
+            status = 1
+            continue
+        if len(args.keys) == 1:
+            _print_value(value, out)
+        else:
+            out.write(json.dumps({"key": key, "value": value}, default=str) + "\n")
+    return status
+
+
+def command_set(args: argparse.Namespace, out: IO[str]) -> int:
+    changes: Dict[str, Any] = {}
+    for item in args.pairs:
+        if item == "-":
+            changes.update(read_pairs(sys.stdin))
+            continue
+        key, separator, value = item.partition("=")
+        if not separator:
+            raise ValueError(f"Expected KEY=VALUE or '-', got {item!r}.")
+        changes[key] = value
+    write_changes(open_loader(args.backend, args.app_id, args.nested), changes)
+    print(f"Set {len(changes)} keys.", file=sys.stderr)
+    return 0
+
+
+def command_load(args: argparse.Namespace, out: IO[str]) -> int:
+    if args.file == "-":
+        changes = dict(read_pairs(sys.stdin))
+    else:
+        with open(args.file, "r", encoding="utf-8") as file:
+            changes = dict(read_pairs(file))
+    changes.pop("APP_ID", None)
+    write_changes(open_loader(args.backend, args.app_id, args.nested), changes)
+    print(f"Loaded {len(changes)} keys.", file=sys.stderr)
+    return 0
+
+
+def command_dump(args: argparse.Namespace, out: IO[str]) -> int:
+    config = open_loader(args.backend, args.app_id, args.nested).load()
+    if args.format == "ndjson":
+        for key, value in config.items():
+            out.write(json.dumps({"key": key, "value": value}, default=str) + "\n")
+    else:
+        json.dump(dict(config), out, indent=2, sort_keys=True, default=str)
+        out.write("\n")
+    return 0
+
+
+def command_diff(args: argparse.Namespace, out: IO[str]) -> int:
+    from .merkle import diff
+
+    changes = diff(
+        open_loader(args.backend, args.app_id, args.nested),
+        open_loader(args.other, args.app_id, args.nested),
+    )
+    json.dump(changes.as_dict(), out, indent=2, sort_keys=True, default=str)
+    out.write("\n")
+    return 1 if changes else 0
+
+
+def command_migrate(args: argparse.Namespace, out: IO[str]) -> int:
+    from .pipeline import migrate
+
+    stats = migrate(
+        open_loader(args.backend, args.app_id, args.nested, require_app=False),
+        open_loader(args.target, args.app_id, args.nested, require_app=False),
+        app_ids=args.app_ids or None,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint=args.checkpoint,
+    )
+    json.dump(stats.as_dict(), out)
+    out.write("\n")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="config-manager", description="Read and write configurations."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(name: str, help: str, handler) -> argparse.ArgumentParser:
+        sub = commands.add_parser(name, help=help)
+        sub.add_argument(
+            "backend", help="e.g. config.db, postgresql://..., config.json"
+        )
+        sub.add_argument("--app-id", help="application of the SQL and HTTP backends")
+        sub.add_argument(
+            "--nested",
+            action="store_true",
+            help="SQL backends store nested values as dotted keys",
+        )
+        sub.set_defaults(handler=handler)
+        return sub
+
+    get = command("get", "print the values of keys or dotted paths", command_get)
+    get.add_argument("keys", nargs="+")
+    set_ = command(
+        "set", "set KEY=VALUE pairs, '-' reads NDJSON from stdin", command_set
+    )
+    set_.add_argument("pairs", nargs="+")
+    load = command("load", "import a JSON or NDJSON file, '-' for stdin", command_load)
+    load.add_argument("file")
+    dump = command("dump", "print the whole configuration", command_dump)
+    dump.add_argument("--format", choices=["json", "ndjson"], default="json")
+    diff = command(
+        "diff",
+        "compare with another backend, exit status 1 if they differ",
+        command_diff,
+    )
+    diff.add_argument("other")
+    migrate = command(
+        "migrate", "copy every application to another backend", command_migrate
+    )
+    migrate.add_argument("target")
+    migrate.add_argument("--app-ids", nargs="*")
+    migrate.add_argument("--batch-size", type=int, default=100)
+    migrate.add_argument("--workers", type=int, default=4)
+    migrate.add_argument("--checkpoint")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, out: IO[str] = None) -> int:
+    """
+    Run the command line interface.
+    :param argv: Arguments, defaults to sys.argv[1:].
+    :param out: Output stream, defaults to stdout.
+    :return: Exit status.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args, out or sys.stdout)
+    except Exception as e:
+        print(f"config-manager {args.command}: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Package: config_manager
+Module: compact
+This module contains the KeyTable and CompactMapping classes that store configurations sharing the same keys
+(e.g. many applications with one schema) with a single, interned copy of the key strings.
+
+A CompactMapping holds a reference to a shared KeyTable and a list of values. Adding a key moves the mapping to the
+KeyTable for the extended key tuple, which is cached, so mappings that gain the same keys keep sharing tables.
+"""
+
+import sys
+import threading
+import weakref
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+_MISSING = object()
+
+_tables: "weakref.WeakValueDictionary[Tuple[int, int], KeyTable]" = (
+    weakref.WeakValueDictionary()
+)
+_tables_lock = threading.Lock()
+
+
+def intern_key(key: Any) -> Any:
+    return sys.intern(key) if type(key) is str else key
+
+
+def _signature(signature: Tuple[int, int], key: Any) -> Tuple[int, int]:
+    # Hash of the key sequence, extended one key at a time.
+    return hash((signature[0], key)), signature[1] + 1
+
+
+_EMPTY = (0, 0)
+
+
+class KeyTable:
+    """
+    Immutable, shared table of keys and their positions.
+
+    A table extended by one key shares its key list and index with the extended table, so adding n keys one at a time
+    costs O(n) rather than a copy of every table. Index entries at or beyond len(table) belong to longer tables.
+    """
+
+    __slots__ = ("_keys", "index", "size", "signature", "_transitions", "__weakref__")
+
+    def __init__(
+        self,
+        keys: List[Any],
+        index: Dict[Any, int],
+        size: int,
+        signature: Tuple[int, int],
+    ):
+        self._keys = keys
+        self.index = index
+        self.size = size
+        self.signature = signature
+        self._transitions: Optional[Dict[Any, "KeyTable"]] = None
+
+    @property
+    def keys(self) -> Tuple[Any, ...]:
+        return tuple(self._keys[: self.size])
+
+    @classmethod
+    def for_keys(cls, keys: Iterable[Any]) -> "KeyTable":
+        """
+        Get the shared table for a sequence of keys, creating it on first use.
+        :param keys: Keys in insertion order.
+        :return: The KeyTable.
+        """
+        keys = [intern_key(key) for key in keys]
+        signature = _EMPTY
+        for key in keys:
+            signature = _signature(signature, key)
+        with _tables_lock:
+            table = _tables.get(signature)
+            if table is not None and table._keys[: table.size] == keys:
+                return table
+            table = cls(
+                keys, {key: i for i, key in enumerate(keys)}, len(keys), signature
+            )
+            _tables.setdefault(signature, table)
+            return table
+
+    def with_key(self, key: Any) -> "KeyTable":
+        """
+        Get the table with one more key appended.
+        :param key: Key to append.
+        :return: The extended KeyTable.
+        """
+        transitions = self._transitions
+        table = transitions.get(key) if transitions is not None else None
+        if table is not None:
+            return table
+        key = intern_key(key)
+        signature = _signature(self.signature, key)
+        with _tables_lock:
+            table = _tables.get(signature)
+            if table is None or not self._extended_by(table, key):
+                if len(self._keys) == self.size:
+                    # No longer table uses the list yet, extend it in place.
+                    keys, index = self._keys, self.index
+                    keys.append(key)
+                else:
+                    keys = self._keys[: self.size] + [key]
+                    index = {k: i for i, k in enumerate(keys)}
+                index[key] = self.size
+                table = KeyTable(keys, index, self.size + 1, signature)
+                _tables.setdefault(signature, table)
+            if self._transitions is None:
+                self._transitions = {}
+            self._transitions[key] = table
+        return table
+
+    def _extended_by(self, table: "KeyTable", key: Any) -> bool:
+        size = self.size
+        if table.size != size + 1 or table._keys[size] != key:
+            return False
+        return table._keys is self._keys or table._keys[:size] == self._keys[:size]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __reduce__(self):
+        # Copies and unpickled mappings attach to the shared table.
+        return KeyTable.for_keys, (self.keys,)
+
+    def __repr__(self) -> str:
+        return f"KeyTable({self.keys!r})"
+
+
+class CompactMapping(MutableMapping):
+    """
+    Mutable mapping storing its values against a shared KeyTable.
+    """
+
+    __slots__ = ("_table", "_values", "_len")
+
+    def __init__(self, data: Optional[Mapping[str, Any]] = None):
+        """
+        Initialize the mapping.
+        :param data: Initial configuration data.
+        """
+        items = list(data.items()) if data else []
+        self._table = KeyTable.for_keys(key for key, _ in items)
+        self._values = [value for _, value in items]
+        self._len = len(items)
+
+    @property
+    def table(self) -> KeyTable:
+        return self._table
+
+    def __getitem__(self, key: Any) -> Any:
+        i = self._table.index.get(key)
+        if i is None or i >= len(self._values):
+            raise KeyError(key)
+        value = self._values[i]
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        i = self._table.index.get(key)
+        if i is None or i >= len(self._values):
+            return default
+        value = self._values[i]
+        return default if value is _MISSING else value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        i = self._table.index.get(key)
+        if i is None or i >= len(self._values):
+            self._table = self._table.with_key(key)
+            self._values.append(value)
+            self._len += 1
+            return
+        if self._values[i] is _MISSING:
+            self._len += 1
+        self._values[i] = value
+
+    def __delitem__(self, key: Any) -> None:
+        i = self._table.index.get(key)
+        if i is None or i >= len(self._values) or self._values[i] is _MISSING:
+            raise KeyError(key)
+        # The slot is kept so the table stays shared, re-adding the key reuses it.
+        self._values[i] = _MISSING
+        self._len -= 1
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[Any]:
+        for key, value in zip(self._table._keys, self._values):
+            if value is not _MISSING:
+                yield key
+
+    def __len__(self) -> int:
+        return self._len
+
+    def clear(self) -> None:
+        self._table = KeyTable.for_keys(())
+        self._values = []
+        self._len = 0
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def __sizeof__(self) -> int:
+        # The key table is shared, only the values belong to this mapping.
+        return object.__sizeof__(self) + sys.getsizeof(self._values)
+
+    def __repr__(self) -> str:
+        return f"CompactMapping({dict(self.items())!r})"
+
+
+def compact(config: Mapping[str, Any]) -> CompactMapping:
+    """
+    Convert configuration data to a CompactMapping.
+    :param config: A mapping containing configuration data.
+    :return: CompactMapping sharing its keys with other mappings of the same schema.
+    """
+    if isinstance(config, CompactMapping):
+        return config
+    return CompactMapping(config)
@@ -0,0 +1,61 @@
+"""
+Package: config_manager
+Module: compression
+This module contains the compression of large configuration values.
+
+Values above a size threshold are stored as a marker followed by their zlib (or lzma) compressed, base64 encoded
+bytes, so every loader stores them as plain text. Configuration decompresses a value on its first access and keeps
+the result, later reads do not decompress again.
+
+Example usage:
+
+```python
+config = Configuration.load_existing(
+    "sqlite", app_id, sqlite_location="config.db", compress_threshold=4096
+)
+config["CA_BUNDLE"] = open("ca.pem").read()  # stored as 'cmp:v1:zlib:...'
+config["CA_BUNDLE"]  # decompressed once
+```
+"""
+
+import base64
+import lzma
+import zlib
+from typing import Any, Callable, Dict, Tuple
+
+PREFIX = "cmp:v1:"
+
+_CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def is_compressed(value: Any) -> bool:
+    return type(value) is str and value.startswith(PREFIX)
+
+
+def compress(value: str, algorithm: str = "zlib") -> str:
+    """
+    Compress a text value into a marked token.
+    :param value: Value to compress.
+    :param algorithm: 'zlib' or 'lzma'.
+    :return: The token, or the value itself if compression does not make it shorter.
+    """
+    if algorithm not in _CODECS:
+        raise ValueError(f"Unsupported compression algorithm: {algorithm}")
+    data = _CODECS[algorithm][0](value.encode("utf-8"))
+    token = f"{PREFIX}{algorithm}:{base64.b64encode(data).decode('ascii')}"
+    return token if len(token) < len(value) else value
+
+
+def decompress(token: str) -> str:
+    """
+    Decompress a token produced by compress().
+    :param token: Marked token.
+    :return: The original value.
+    """
+    algorithm, _, payload = token[len(PREFIX) :].partition(":")
+    if algorithm not in _CODECS:
+        raise ValueError(f"Unsupported compression algorithm: {algorithm}")
+    return _CODECS[algorithm][1](base64.b64decode(payload)).decode("utf-8")
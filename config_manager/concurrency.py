@@ -0,0 +1,61 @@
+"""
+Package: config_manager
+Module: concurrency
+This module contains the conflict error raised by optimistic SQL loaders and the helper that retries a mutation
+after reloading the configuration.
+
+Example usage:
+
+```python
+from config_manager.concurrency import retry_on_conflict
+
+config = Configuration.load_existing("postgres", app_id, postgres_uri=uri, optimistic=True)
+retry_on_conflict(config, lambda cfg: cfg.update({"REPLICAS": int(cfg["REPLICAS"]) + 1}))
+```
+"""
+
+import random
+import time
+from typing import Any, Callable, Iterable, Optional
+
+
+class ConfigConflictError(Exception):
+    """
+    Raised when keys were changed by another writer since they were loaded.
+    """
+
+    def __init__(self, app_id: Optional[str], keys: Iterable[str]):
+        self.app_id = app_id
+        self.keys = list(keys)
+        super().__init__(
+            f"Configuration of {app_id} was modified concurrently: {', '.join(map(str, self.keys))}"
+        )
+
+
+def retry_on_conflict(
+    config: Any,
+    mutate: Callable[[Any], Any],
+    attempts: int = 5,
+    backoff: float = 0.01,
+    max_backoff: float = 1.0,
+) -> Any:
+    """
+    Apply a mutation, reloading the configuration and retrying when another writer got there first.
+    The mutation must read the values it depends on from the configuration it is given.
+    :param config: Configuration to mutate.
+    :param mutate: Callable receiving the configuration.
+    :param attempts: Maximum number of attempts.
+    :param backoff: Initial delay between attempts in seconds, doubled after each conflict, with jitter.
+    :param max_backoff: Upper bound of the delay.
+    :return: The return value of mutate.
+    """
+    delay = backoff
+    for attempt in range(attempts):
+        try:
+            return mutate(config)
+        except ConfigConflictError:
+            if attempt == attempts - 1:
+                raise
+            config.reload()
+            time.sleep(random.uniform(0, delay))
+            delay = min(delay * 2, max_backoff)
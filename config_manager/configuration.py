@@ -4,23 +4,130 @@ Module: configuration
 This module contains the Configuration class that is used to manage application configurations.
 """
 
+import functools
+import threading
 import uuid
-from typing import Any, Dict, Mapping, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 from .base_loader import BaseConfigLoader
-from .env_loader import EnvConfigLoader
+from .binary_loader import BinaryConfigLoader
+from .compact import CompactMapping
+from .compact import compact as compact_mapping
+from .compression import compress, decompress, is_compressed
+from .encryption import Secret, SecretBox, is_token
+from .flags import PREFIX as FLAGS_PREFIX
+from .flags import FlagSet
+from .history import DEFAULT_RETENTION
+from .instrumentation import instrumented
+from .interpolation import InterpolationError, Interpolator
 from .json_loader import JSONConfigLoader
-from .postgres_loader import PostgresConfigLoader
-from .sqlite_loader import SQLiteConfigLoader
-from .yaml_loader import YAMLConfigLoader
+from .merkle import ConfigDiff
+from .merkle import diff as merkle_diff
+from .path_index import SEPARATOR, PathIndex
+from .snapshot import SnapshotLoader
+from .working_set import AccessLog, LazyMapping, lookup_path
+
+_MISSING = object()
+
+
+def _describe_key(config, result, key, *args, **kwargs):
+    return (key,), None
+
+
+def _describe_update(config, result, mapping, *args, **kwargs):
+    return tuple(mapping), None
+
+
+def _describe_clear(config, result, *args, **kwargs):
+    return (), None
+
+
+def _write(method):
+    # Writes wait for fresh data while the loader serves a stale snapshot (see SnapshotLoader), then run under the
+    # lock that _replace() holds while the fresh data is swapped in.
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._wait_fresh()
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class Configuration:
-    def __init__(self, loader: BaseConfigLoader, app_id: Optional[str] = None):
+    __slots__ = (
+        "loader",
+        "app_id",
+        "config",
+        "_path_index",
+        "_indexed_config",
+        "secrets",
+        "_interpolator",
+        "access_log",
+        "compress_threshold",
+        "compression",
+        "_inflated",
+        "_flags",
+        "_lock",
+        "__weakref__",
+        # Allocated on first use, so callers can still attach their own attributes.
+        "__dict__",
+    )
+
+    def __init__(
+        self,
+        loader: BaseConfigLoader,
+        app_id: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        compact: bool = False,
+        secrets: Optional[SecretBox] = None,
+        interpolate: bool = False,
+        access_log: Optional[AccessLog] = None,
+        compress_threshold: Optional[int] = None,
+        compression: str = "zlib",
+    ):
         self.loader = loader
+        self.secrets = secrets
+        self.access_log = access_log
+        self.compress_threshold = compress_threshold
+        self.compression = compression
+        # Decompressed values by key, with the stored token they came from.
+        self._inflated: Dict[str, Tuple[str, str]] = {}
+        self._interpolator: Optional[Interpolator] = None
+        # Compiled feature flags with the config dict they came from.
+        self._flags: Optional[Tuple[Any, FlagSet]] = None
+        self._lock = threading.RLock()
         self.app_id = app_id or self._generate_uuid()
-        self.config = self.loader.load()
+        # Already loaded data (e.g. from a bulk load) skips the loader round trip.
+        self.config = self._load(interpolate) if config is None else config
+        if compact and not isinstance(self.config, LazyMapping):
+            # Key strings are shared with every configuration of the same schema.
+            self.config = compact_mapping(self.config)
         self.config["APP_ID"] = self.app_id  # Ensure APP_ID is always present
+        self._path_index: Optional[PathIndex] = None
+        self._indexed_config = None
+        if interpolate:
+            # References are parsed once here, then maintained by each mutation.
+            self._interpolator = Interpolator(self.config, self._raw_lookup)
+        subscribe = getattr(self.loader, "subscribe", None)
+        if config is None and subscribe is not None:
+            # Loaders serving stale data (see SnapshotLoader) deliver the fresh data later.
+            subscribe(self._replace)
+
+    def _load(self, interpolate: bool = False) -> Dict[str, Any]:
+        load_keys = getattr(self.loader, "load_keys", None)
+        keys = self.access_log.keys() if self.access_log is not None else None
+        if (
+            not keys
+            or load_keys is None
+            or interpolate
+            or getattr(self.loader, "optimistic", False)
+        ):
+            # References are parsed from every value, and conditional writes need the revisions of every key read
+            # at load time.
+            return self.loader.load()
+        # Only the working set recorded by earlier runs, other keys are fetched on first access.
+        return LazyMapping(load_keys(keys), keys, load_keys, self.loader.load)
 
     def __repr__(self) -> str:
         items = [
@@ -35,22 +142,36 @@ class Configuration:
         return self.__repr__()
 
     def __getitem__(self, key: str) -> Any:
-        return self.config.get(key, "")
+        return self._lookup(key, "")
 
+    @instrumented("configuration", "set", _describe_key)
+    @_write
     def __setitem__(self, key: str, value: Any) -> None:
+        value = self._seal(key, value)
+        if self._interpolator is not None:
+            self._interpolated().set(key, value)
         self.config[key] = value
+        self._index_key(key, value)
         self.loader.save(self.config)
 
+    @instrumented("configuration", "delete", _describe_key)
+    @_write
     def __delitem__(self, key: str) -> None:
         if key in self.config:
+            self._forget_secret(key)
+            self._inflated.pop(key, None)
+            self._forget_flags(key)
             del self.config[key]
+            self._index_key(key)
+            if self._interpolator is not None:
+                self._interpolated().delete(key)
             self.loader.save(self.config)
 
     def __contains__(self, key: str) -> bool:
         return key in self.config
 
     def __iter__(self):
-        return iter(self.config.items())
+        return iter(self._decoded().items())
 
     def __len__(self) -> int:
         return len(self.config)
@@ -67,7 +188,8 @@ class Configuration:
         return hash(tuple(sorted(self.config.items())))
 
     def __getattr__(self, item):
-        return str(self.config[item])
+        self.config[item]
+        return str(self._lookup(item, ""))
 
     @classmethod
     def initialize(cls, config_type: str, app_name: str, **kwargs) -> "Configuration":
@@ -75,7 +197,7 @@ class Configuration:
         Initialize a new application with the given app_name and configuration type.
 
         Args:
-            config_type (str): Type of configuration ('env', 'json', 'yaml', 'postgres', 'sqlite').
+            config_type (str): Type of configuration ('env', 'json', 'yaml', 'binary', 'postgres', 'sqlite', 'http').
             app_name (str): Name of the application.
             **kwargs: Additional arguments required by the loader.
 
@@ -86,7 +208,15 @@ class Configuration:
         loader = cls._get_loader(
             config_type, app_name=app_name, app_id=app_id, **kwargs
         )
-        config = cls(loader, app_id=app_id)
+        config = cls(
+            loader,
+            app_id=app_id,
+            secrets=kwargs.get("secrets"),
+            interpolate=kwargs.get("interpolate", False),
+            access_log=cls._access_log(app_id, kwargs),
+            compress_threshold=kwargs.get("compress_threshold"),
+            compression=kwargs.get("compression", "zlib"),
+        )
         config["APP_NAME"] = app_name  # Store app_name in config
         return config
 
@@ -94,17 +224,38 @@ class Configuration:
     def _get_loader(
         cls, config_type: str, app_name: str, app_id: str, **kwargs
     ) -> BaseConfigLoader:
+        snapshot_dir = kwargs.pop("snapshot_dir", None)
+        if snapshot_dir is not None:
+            return SnapshotLoader(
+                cls._get_loader(config_type, app_name, app_id, **kwargs),
+                snapshot_dir,
+                app_id=app_id or None,
+                revalidate=kwargs.get("revalidate", True),
+            )
+        # Backend modules are imported on first use, their drivers (psycopg2, PyYAML, python-dotenv) are slow to import.
         if config_type == "env":
+            from .env_loader import EnvConfigLoader
+
             return EnvConfigLoader()
         elif config_type == "json":
             return JSONConfigLoader(
-                file_path=kwargs.get("file_path"), json_data=kwargs.get("json_data")
+                file_path=kwargs.get("file_path"),
+                json_data=kwargs.get("json_data"),
+                root_path=kwargs.get("root_path"),
             )
         elif config_type == "yaml":
+            from .yaml_loader import YAMLConfigLoader
+
             return YAMLConfigLoader(
-                file_path=kwargs.get("file_path"), yaml_data=kwargs.get("yaml_data")
+                file_path=kwargs.get("file_path"),
+                yaml_data=kwargs.get("yaml_data"),
+                root_path=kwargs.get("root_path"),
             )
+        elif config_type == "binary":
+            return BinaryConfigLoader(file_path=kwargs.get("file_path"))
         elif config_type == "postgres":
+            from .postgres_loader import PostgresConfigLoader
+
             postgres_uri = kwargs.get("postgres_uri")
             postgres_table = kwargs.get("postgres_table", "config")
             return PostgresConfigLoader(
@@ -112,11 +263,33 @@ class Configuration:
                 app_name=app_name,
                 app_id=app_id,
                 config_table=postgres_table,
+                nested=kwargs.get("nested", False),
+                history=kwargs.get("history", False),
+                retention=kwargs.get("retention", DEFAULT_RETENTION),
+                optimistic=kwargs.get("optimistic", False),
+                replica_uris=kwargs.get("replica_uris"),
             )
         elif config_type == "sqlite":
+            from .sqlite_loader import SQLiteConfigLoader
+
             sqlite_location = kwargs.get("sqlite_location")
             return SQLiteConfigLoader(
-                sqlite_location=sqlite_location, app_name=app_name, app_id=app_id
+                sqlite_location=sqlite_location,
+                app_name=app_name,
+                app_id=app_id,
+                nested=kwargs.get("nested", False),
+                history=kwargs.get("history", False),
+                retention=kwargs.get("retention", DEFAULT_RETENTION),
+                optimistic=kwargs.get("optimistic", False),
+            )
+        elif config_type == "http":
+            from .http_loader import HTTPConfigLoader
+
+            return HTTPConfigLoader(
+                base_url=kwargs.get("base_url"),
+                app_id=app_id,
+                app_name=app_name,
+                timeout=kwargs.get("timeout", 5.0),
             )
         else:
             raise ValueError(f"Unsupported configuration type: {config_type}")
@@ -127,7 +300,7 @@ class Configuration:
         Load an existing application's configuration using app_id.
 
         Args:
-            config_type (str): Type of configuration ('env', 'json', 'yaml', 'postgres', 'sqlite').
+            config_type (str): Type of configuration ('env', 'json', 'yaml', 'binary', 'postgres', 'sqlite', 'http').
             app_id (str): UUID of the application.
             **kwargs: Additional arguments required by the loader.
 
@@ -135,61 +308,423 @@ class Configuration:
             Configuration: An instance of Configuration.
         """
         loader = cls._get_loader(config_type, app_name="", app_id=app_id, **kwargs)
-        return cls(loader, app_id=app_id)
+        return cls(
+            loader,
+            app_id=app_id,
+            secrets=kwargs.get("secrets"),
+            interpolate=kwargs.get("interpolate", False),
+            access_log=cls._access_log(app_id, kwargs),
+            compress_threshold=kwargs.get("compress_threshold"),
+            compression=kwargs.get("compression", "zlib"),
+        )
+
+    @classmethod
+    def load_many(
+        cls, config_type: str, app_ids: Iterable[str], **kwargs
+    ) -> Iterator["Configuration"]:
+        """
+        Load the configurations of many existing applications with a single bulk query.
+
+        Args:
+            config_type (str): Type of configuration ('postgres', 'sqlite').
+            app_ids (Iterable[str]): UUIDs of the applications.
+            **kwargs: Additional arguments required by the loader.
+
+        Returns:
+            Iterator[Configuration]: One Configuration per app_id, streamed as rows arrive.
+        """
+        if config_type not in ("postgres", "sqlite"):
+            raise ValueError(f"Bulk loading is not supported for: {config_type}")
+        template = cls._get_loader(config_type, app_name="", app_id="", **kwargs)
+        for loader, config in template.iter_loaders(app_ids):
+            app_id = loader.app_id
+            yield cls(
+                loader,
+                app_id=app_id,
+                config=config,
+                secrets=kwargs.get("secrets"),
+                interpolate=kwargs.get("interpolate", False),
+                access_log=cls._access_log(app_id, kwargs),
+                compress_threshold=kwargs.get("compress_threshold"),
+                compression=kwargs.get("compression", "zlib"),
+            )
+
+    @staticmethod
+    def _access_log(app_id: str, kwargs: Dict[str, Any]) -> Optional[AccessLog]:
+        access_dir = kwargs.get("access_dir")
+        if access_dir is None:
+            return None
+        return AccessLog(access_dir, app_id, process_name=kwargs.get("process_name"))
 
     @staticmethod
     def _generate_uuid() -> str:
         return str(uuid.uuid4())
 
-    def to_json(self, file_path: Optional[str] = None) -> Optional[str]:
-        loader = JSONConfigLoader(file_path=file_path)
-        loader.save(self.config)
+    def to_json(
+        self,
+        file_path: Optional[str] = None,
+        pretty: bool = True,
+        backend: Optional[str] = "json",
+    ) -> Optional[str]:
+        loader = JSONConfigLoader(file_path=file_path, backend=backend, pretty=pretty)
         if not file_path:
-            import json
-
-            return json.dumps(self.config, indent=4)
+            return loader.dumps(self._decoded(), pretty=pretty)
+        loader.save(self._decoded())
         return None
 
     def to_yaml(self, file_path: Optional[str] = None) -> Optional[str]:
+        from .yaml_loader import YAMLConfigLoader
+
         loader = YAMLConfigLoader(file_path=file_path)
-        loader.save(self.config)
-        if not file_path:
-            import yaml
+        return loader.save(self._decoded())
 
-            return yaml.dump(self.config, default_flow_style=False)
-        return None
+    def to_binary(self, file_path: Optional[str] = None) -> Optional[bytes]:
+        loader = BinaryConfigLoader(file_path=file_path)
+        return loader.save(self.config)
 
     def to_env(self) -> None:
+        from .env_loader import EnvConfigLoader
+
         loader = EnvConfigLoader()
-        loader.save(self.config)
+        loader.save(self._decoded())
 
     def to_postgres(self, postgres_uri: str, postgres_table: str = "config") -> None:
+        from .postgres_loader import PostgresConfigLoader
+
         loader = PostgresConfigLoader(
             postgres_uri=postgres_uri,
             app_name=self.config.get("APP_NAME", "default"),
             app_id=self.app_id,
             config_table=postgres_table,
         )
-        loader.save(self.config)
+        # One batched write, which also registers the application.
+        loader.save_many({self.app_id: self.config})
 
     def to_sqlite(self, sqlite_location: str) -> None:
+        from .sqlite_loader import SQLiteConfigLoader
+
         loader = SQLiteConfigLoader(
             sqlite_location=sqlite_location,
             app_name=self.config.get("APP_NAME", "default"),
             app_id=self.app_id,
         )
-        loader.save(self.config)
+        # One batched write, which also registers the application.
+        loader.save_many({self.app_id: self.config})
 
     def to_dict(self) -> Dict[str, Any]:
-        return self.config.copy()
+        if self.compress_threshold is None:
+            return self.config.copy()
+        return self._decoded()
 
+    @instrumented("configuration", "update", _describe_update)
+    @_write
     def update(self, config: Mapping[str, Any]) -> None:
+        config = {key: self._seal(key, value) for key, value in config.items()}
+        if self._interpolator is not None:
+            # Only the changed keys are reparsed, checked before anything changes.
+            interpolator = self._interpolated()
+            applied: List[str] = []
+            try:
+                for key, value in config.items():
+                    interpolator.set(key, value)
+                    applied.append(key)
+            except InterpolationError:
+                for key in reversed(applied):
+                    if key in self.config:
+                        interpolator.set(key, self.config[key])
+                    else:
+                        interpolator.delete(key)
+                raise
         self.config.update(config)
+        for key, value in config.items():
+            self._index_key(key, value)
         self.loader.save(self.config)
 
+    @instrumented("configuration", "clear", _describe_clear)
+    @_write
     def clear(self) -> None:
         self.config.clear()
+        self._inflated.clear()
+        self._flags = None
+        if self._path_index is not None:
+            self._path_index.clear()
+        if self._interpolator is not None:
+            self._interpolator = Interpolator(self.config, self._raw_lookup)
         self.loader.save(self.config)
 
+    @instrumented("configuration", "compare_and_set", _describe_key)
+    @_write
+    def compare_and_set(self, key: str, old: Any, new: Any) -> bool:
+        """
+        Set a key only if its value is still old. SQL loaders check the stored value atomically, so concurrent
+        writers cannot both succeed. Other loaders only compare against the in-memory value and then save the whole
+        configuration, which is not atomic against other writers.
+
+        Args:
+            key (str): Key to set.
+            old (Any): Expected current value, None if the key is expected to be missing.
+            new (Any): New value.
+
+        Returns:
+            bool: True if the value was set, False if it had changed (call reload() to see the new value).
+        """
+        stored = self.config.get(key)
+        if isinstance(old, Secret):
+            old = old.value
+        if (
+            self.compress_threshold is not None
+            and is_compressed(stored)
+            and old == self._inflate(key, stored)
+        ):
+            # The loader compares against the stored token.
+            old = stored
+        elif (
+            self.secrets is not None
+            and is_token(stored)
+            and old == self.secrets.decrypt(key, stored)
+        ):
+            old = stored
+        new = self._seal(key, new)
+        compare_and_set = getattr(self.loader, "compare_and_set", None)
+        if compare_and_set is None and self.config.get(key) != old:
+            return False
+        if self._interpolator is not None:
+            self._interpolated().set(key, new)
+        if compare_and_set is not None and not compare_and_set(key, old, new):
+            if self._interpolator is not None:
+                self._interpolated().set(key, self.config.get(key))
+            return False
+        self.config[key] = new
+        self._index_key(key, new)
+        if compare_and_set is None:
+            # A full save, attributed to this call by the profiler rather than to a nested set.
+            self.loader.save(self.config)
+        return True
+
+    def reload(self) -> None:
+        """
+        Replace the in-memory data with the stored configuration, e.g. after a ConfigConflictError.
+        """
+        self._replace(self.loader.load())
+
+    def _replace(self, config: Dict[str, Any]) -> None:
+        config["APP_ID"] = self.app_id
+        with self._lock:
+            if isinstance(self.config, CompactMapping):
+                config = compact_mapping(config)
+            self.config = config
+            self._path_index = None
+            self._indexed_config = None
+            self._inflated.clear()
+            self._flags = None
+            if self._interpolator is not None:
+                self._interpolator = Interpolator(self.config, self._raw_lookup)
+
+    def _wait_fresh(self) -> None:
+        loader = self.loader
+        if getattr(loader, "stale", False) and not loader.wait_fresh(
+            loader.write_timeout
+        ):
+            raise TimeoutError(
+                "Configuration is served from a stale snapshot and the primary is unavailable."
+            )
+
+    def diff(self, other: Any) -> ConfigDiff:
+        """
+        Compare this configuration with another one. SQL loaders are compared through bucket hashes computed in the
+        database, so only the rows of differing buckets are read.
+
+        Args:
+            other (Any): Configuration, loader or mapping.
+
+        Returns:
+            ConfigDiff: Keys added, removed and changed in other, relative to this configuration.
+        """
+        return merkle_diff(self, other)
+
+    def versions(self) -> List[Tuple[int, Any]]:
+        """
+        List the stored versions of this configuration.
+
+        Returns:
+            List[Tuple[int, Any]]: (version, created_at) pairs, oldest first.
+        """
+        return self._history_loader().versions()
+
+    def at_version(self, version: int) -> "Configuration":
+        """
+        Get the configuration as it was at a stored version.
+
+        Args:
+            version (int): Version to read, see versions().
+
+        Returns:
+            Configuration: A copy holding the old data. Mutating it saves a new version.
+        """
+        config = self._history_loader().load_version(version)
+        return Configuration(
+            self.loader,
+            app_id=self.app_id,
+            config=config,
+            secrets=self.secrets,
+            compress_threshold=self.compress_threshold,
+            compression=self.compression,
+        )
+
+    @instrumented("configuration", "rollback", _describe_clear)
+    @_write
+    def rollback(self, version: int) -> None:
+        """
+        Restore the configuration of a stored version, recorded as a new version.
+
+        Args:
+            version (int): Version to restore.
+        """
+        self._replace(self._history_loader().load_version(version))
+        self.loader.save(self.config)
+
+    def _history_loader(self) -> BaseConfigLoader:
+        if not getattr(self.loader, "history", False):
+            raise ValueError(
+                f"{type(self.loader).__name__} does not keep version history."
+            )
+        return self.loader
+
     def get(self, key: str, default: Any = None) -> Any:
-        return self.config.get(key, default)
+        """
+        Get a value by key, or by dotted path into nested values, e.g. 'db.replicas.0.host'.
+
+        Args:
+            key (str): Top-level key or dotted path.
+            default (Any): Value returned when the key is missing.
+
+        Returns:
+            Any: The value, or default.
+        """
+        return self._lookup(key, default)
+
+    @property
+    def flags(self) -> FlagSet:
+        """
+        Get the feature flags of this configuration, compiled on first use after each load or reload and after
+        changes to the 'flags' keys.
+
+        Returns:
+            FlagSet: Compiled flags, see config_manager.flags for the definition format.
+        """
+        if self._flags is None or self._flags[0] is not self.config:
+            definitions = {}
+            for key in self.config.keys():
+                if key == FLAGS_PREFIX or (
+                    isinstance(key, str) and key.startswith(FLAGS_PREFIX + ".")
+                ):
+                    definitions[key] = self._raw_lookup(key, None)
+            self._flags = (self.config, FlagSet.from_config(definitions))
+        return self._flags[1]
+
+    def reindex(self) -> None:
+        """
+        Rebuild the dotted-path index, needed after nested values were mutated in place.
+        """
+        self._path_index = PathIndex(self.config)
+        self._indexed_config = self.config
+
+    def _lookup(self, key: str, default: Any) -> Any:
+        if self._interpolator is not None:
+            interpolator = self._interpolated()
+            if key in interpolator.templates:
+                return interpolator.resolve(key)
+        return self._raw_lookup(key, default)
+
+    def _raw_lookup(self, key: str, default: Any) -> Any:
+        value = self.config.get(key, _MISSING)
+        if value is not _MISSING:
+            if self.access_log is not None:
+                self.access_log.record(key)
+            if self.compress_threshold is not None and is_compressed(value):
+                return self._inflate(key, value)
+            if self.secrets is not None and is_token(value):
+                return self.secrets.decrypt(key, value)
+            return value
+        if not isinstance(key, str) or SEPARATOR not in key:
+            if self.access_log is not None:
+                # Known absent keys are part of the working set, so they cost no query either.
+                self.access_log.record(key)
+            return default
+        if self.access_log is not None:
+            self.access_log.record(key.split(SEPARATOR, 1)[0])
+        if isinstance(self.config, LazyMapping) and not self.config.complete:
+            # Indexing every path would load the whole configuration.
+            return lookup_path(self.config, key, default)
+        if self._indexed_config is not self.config:
+            # Built on the first dotted lookup, then maintained by each mutation.
+            self.reindex()
+        return self._path_index.get(key, default)
+
+    def _interpolated(self) -> Interpolator:
+        if self._interpolator.source is not self.config:
+            # The config dict was replaced directly, reparse it.
+            self._interpolator = Interpolator(self.config, self._raw_lookup)
+        return self._interpolator
+
+    def _seal(self, key: str, value: Any) -> Any:
+        self._inflated.pop(key, None)
+        self._forget_flags(key)
+        if not isinstance(value, Secret):
+            return self._compress(value)
+        if self.secrets is None:
+            raise ValueError(f"Storing secret {key} requires a SecretBox.")
+        self._forget_secret(key)
+        return self.secrets.encrypt(key, value.value)
+
+    def _compress(self, value: Any) -> Any:
+        if (
+            self.compress_threshold is None
+            or type(value) is not str
+            or len(value) < self.compress_threshold
+            or is_compressed(value)
+            or is_token(value)
+        ):
+            return value
+        if self._interpolator is not None and "${" in value:
+            # Templates stay readable for the interpolator.
+            return value
+        return compress(value, self.compression)
+
+    def _decoded(self) -> Mapping[str, Any]:
+        # Exports hold compressed values decoded, as __getitem__ returns them. Secrets stay encrypted.
+        if self.compress_threshold is None:
+            return self.config
+        return {
+            key: self._inflate(key, value) if is_compressed(value) else value
+            for key, value in self.config.items()
+        }
+
+    def _inflate(self, key: str, token: str) -> str:
+        cached = self._inflated.get(key)
+        if cached is not None and cached[0] == token:
+            return cached[1]
+        value = decompress(token)
+        self._inflated[key] = (token, value)
+        return value
+
+    def _forget_flags(self, key: str) -> None:
+        if key == FLAGS_PREFIX or (
+            isinstance(key, str) and key.startswith(FLAGS_PREFIX + ".")
+        ):
+            self._flags = None
+
+    def _forget_secret(self, key: str) -> None:
+        # Zeroizes the plaintext of a secret that is replaced or deleted.
+        if self.secrets is not None:
+            old = self.config.get(key)
+            if is_token(old):
+                self.secrets.cache.discard((key, old))
+
+    def _index_key(self, key: str, value: Any = _MISSING) -> None:
+        if self._path_index is None:
+            return
+        if value is _MISSING:
+            self._path_index.remove(key)
+        else:
+            self._path_index.add(key, value)
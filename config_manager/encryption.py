@@ -0,0 +1,239 @@
+"""
+Package: config_manager
+Module: encryption
+This module contains the envelope encryption of secret configuration values.
+
+Each secret is encrypted with its own random data key, and the data key is encrypted with the master key read from a
+local key file. Only the resulting token is stored, so every loader persists ciphertext. Tokens are decrypted on
+first read and held in a bounded cache of buffers that can be overwritten with zeros. Reads return ordinary `str`
+objects, which are immutable: zeroizing wipes the cached copy, not the strings already handed out (or intermediate
+copies made by the cipher), so it limits how long plaintext stays reachable rather than guaranteeing it is gone.
+Requires the `cryptography` package.
+
+Example usage:
+
+```python
+from config_manager.encryption import Secret, SecretBox
+
+secrets = SecretBox("config.key")
+config = Configuration.load_existing("sqlite", app_id, sqlite_location="config.db", secrets=secrets)
+config["API_KEY"] = Secret("s3cr3t")  # stored as 'enc:v1:...'
+config.get("API_KEY")  # 's3cr3t', decrypted once
+secrets.zeroize()
+```
+"""
+
+import base64
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+TOKEN_PREFIX = "enc:v1:"
+KEY_SIZE = 32
+NONCE_SIZE = 12
+_WRAPPED_KEY_SIZE = KEY_SIZE + 16  # AES-GCM appends a 16 byte tag
+
+
+class Secret:
+    """
+    Marks a value to be encrypted when it is stored in a Configuration.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def __repr__(self) -> str:
+        return "Secret('***')"
+
+
+def is_token(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(TOKEN_PREFIX)
+
+
+class LocalKeyFile:
+    """
+    Master key stored base64 encoded in a local file, created with mode 0600 if missing.
+    """
+
+    __slots__ = ("path", "create")
+
+    def __init__(self, path: str, create: bool = True):
+        """
+        Initialize the key source.
+        :param path: Path to the key file.
+        :param create: Generate a new key if the file does not exist.
+        """
+        self.path = path
+        self.create = create
+
+    def read(self) -> bytes:
+        """
+        Read the master key, generating it first if allowed.
+        :return: The 32 byte master key.
+        """
+        try:
+            with open(self.path, "rb") as file:
+                key = base64.b64decode(file.read().strip())
+        except FileNotFoundError:
+            if not self.create:
+                raise
+            key = os.urandom(KEY_SIZE)
+            try:
+                descriptor = os.open(
+                    self.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600
+                )
+            except FileExistsError:
+                # Another process created it first.
+                return self.read()
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(base64.b64encode(key))
+        if len(key) != KEY_SIZE:
+            raise ValueError(f"Key file {self.path} does not hold a 32 byte key.")
+        return key
+
+
+class SecretCache:
+    """
+    Bounded LRU cache of decrypted values. Plaintext is held in bytearrays that are overwritten with zeros on
+    eviction. Only the cache's own copy is wiped, see the module documentation. SecretBox caches by
+    (configuration key, token), so a cached plaintext is never returned for another key.
+    """
+
+    __slots__ = ("maxsize", "_entries", "_lock")
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Initialize the cache.
+        :param maxsize: Maximum number of decrypted values held.
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, bytearray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, entry: Hashable) -> Optional[bytearray]:
+        with self._lock:
+            plaintext = self._entries.get(entry)
+            if plaintext is not None:
+                self._entries.move_to_end(entry)
+            return plaintext
+
+    def put(self, entry: Hashable, plaintext: bytearray) -> None:
+        with self._lock:
+            if entry in self._entries:
+                _wipe(self._entries.pop(entry))
+            self._entries[entry] = plaintext
+            while len(self._entries) > self.maxsize:
+                _wipe(self._entries.popitem(last=False)[1])
+
+    def discard(self, entry: Hashable) -> None:
+        with self._lock:
+            plaintext = self._entries.pop(entry, None)
+        if plaintext is not None:
+            _wipe(plaintext)
+
+    def zeroize(self) -> None:
+        """
+        Overwrite and drop every cached value.
+        :return: None
+        """
+        with self._lock:
+            entries, self._entries = self._entries, OrderedDict()
+        for plaintext in entries.values():
+            _wipe(plaintext)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _wipe(buffer: bytearray) -> None:
+    buffer[:] = bytes(len(buffer))
+
+
+class SecretBox:
+    """
+    Encrypts secret values into tokens and decrypts them through a SecretCache.
+    """
+
+    __slots__ = ("key_source", "key_id", "cache", "_master")
+
+    def __init__(self, key_source: Any, cache_size: int = 128):
+        """
+        Initialize the box.
+        :param key_source: Path to a key file, or an object with a read() method returning the master key.
+        :param cache_size: Maximum number of decrypted values held in memory.
+        """
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        if isinstance(key_source, str):
+            key_source = LocalKeyFile(key_source)
+        self.key_source = key_source
+        master = key_source.read()
+        # Identifies the master key in tokens, so a wrong key file fails clearly.
+        self.key_id = hashlib.sha256(master).hexdigest()[:8]
+        self._master = AESGCM(master)
+        self.cache = SecretCache(cache_size)
+
+    def encrypt(self, key: str, value: str) -> str:
+        """
+        Encrypt a value with a fresh data key.
+        :param key: Configuration key, bound to the ciphertext so tokens cannot be moved between keys.
+        :param value: Plaintext value.
+        :return: Token to store in place of the value.
+        """
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        data_key = AESGCM.generate_key(bit_length=KEY_SIZE * 8)
+        key_nonce = os.urandom(NONCE_SIZE)
+        value_nonce = os.urandom(NONCE_SIZE)
+        wrapped_key = self._master.encrypt(key_nonce, data_key, self.key_id.encode())
+        ciphertext = AESGCM(data_key).encrypt(
+            value_nonce, value.encode("utf-8"), key.encode("utf-8")
+        )
+        payload = key_nonce + wrapped_key + value_nonce + ciphertext
+        return f"{TOKEN_PREFIX}{self.key_id}:{base64.urlsafe_b64encode(payload).decode('ascii')}"
+
+    def decrypt(self, key: str, token: str) -> str:
+        """
+        Decrypt a token, from the cache after the first call.
+        :param key: Configuration key the token was stored under.
+        :param token: Token returned by encrypt().
+        :return: Plaintext value, a new str that zeroize() cannot wipe.
+        """
+        # Keyed by both, a token read under another key must fail authentication as on the first read.
+        entry: Tuple[str, str] = (key, token)
+        plaintext = self.cache.get(entry)
+        if plaintext is None:
+            plaintext = self._decrypt(key, token)
+            self.cache.put(entry, plaintext)
+        return plaintext.decode("utf-8")
+
+    def _decrypt(self, key: str, token: str) -> bytearray:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+        key_id, _, encoded = token[len(TOKEN_PREFIX) :].partition(":")
+        if key_id != self.key_id:
+            raise ValueError(
+                f"Secret {key} was encrypted with key {key_id}, not {self.key_id}."
+            )
+        payload = base64.urlsafe_b64decode(encoded)
+        key_end = NONCE_SIZE + _WRAPPED_KEY_SIZE
+        data_key = self._master.decrypt(
+            payload[:NONCE_SIZE], payload[NONCE_SIZE:key_end], self.key_id.encode()
+        )
+        value_nonce = payload[key_end : key_end + NONCE_SIZE]
+        return bytearray(
+            AESGCM(data_key).decrypt(
+                value_nonce, payload[key_end + NONCE_SIZE :], key.encode("utf-8")
+            )
+        )
+
+    def zeroize(self) -> None:
+        """
+        Overwrite and drop every decrypted value held by the cache.
+        :return: None
+        """
+        self.cache.zeroize()
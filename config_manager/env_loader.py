@@ -17,6 +17,8 @@ class EnvConfigLoader(BaseConfigLoader):
     Configuration loader for environment variables.
     """
 
+    __slots__ = ()
+
     def load(self, file_path: str | None = None) -> Dict[str, Any]:
         """
         Load configuration data from environment variables.
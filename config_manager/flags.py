@@ -0,0 +1,299 @@
+"""
+Package: config_manager
+Module: flags
+This module contains the FlagSet class that compiles feature flag definitions stored in a configuration into
+evaluation functions.
+
+Flags are read from a top-level 'flags' mapping ({"flags": {"new_checkout": {...}}}, e.g. in JSON or YAML files, or
+with nested=True in the SQL loaders) or from 'flags.<name>' keys holding a JSON object. A definition looks like:
+
+```json
+{
+    "enabled": true,
+    "rollout": 25,
+    "allow": ["user-1"],
+    "deny": ["user-2"],
+    "rules": [{"attribute": "country", "in": ["DE", "FR"], "rollout": 100}],
+    "variants": {"blue": 50, "green": 50}
+}
+```
+
+Evaluation order: a disabled flag is off, denied users are off, allowed users are on. Otherwise the first rule
+matching the attributes sets the rollout percentage, and a user is on when their bucket is below it. Buckets are
+crc32(salt + user_id) modulo 10000, so every process assigns a user the same bucket. Variant flags return a variant
+picked by weight with an independent hash, or None when off.
+
+Definitions are compiled once. Rules are indexed by attribute value, and flags without rules, allow or deny lists
+compile to a single hash and comparison. Values may come back from a loader as text, as with nested=True in the SQL
+loaders: `enabled` accepts true/false, 1/0, yes/no and on/off, and user ids and rule values are compared as strings.
+
+Example usage:
+
+```python
+flags = config.flags  # compiled after each load or reload
+flags.is_enabled("new_checkout", user_id, {"country": "DE"})
+flags.evaluate_many("new_checkout", user_ids)
+```
+"""
+
+import bisect
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+PREFIX = "flags"
+BUCKETS = 10_000
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+_crc32 = zlib.crc32
+
+
+def bucket(salt: str, user_id: Any) -> int:
+    """
+    Bucket of a user for a salt, the same in every process.
+    :param salt: Flag salt, the flag name by default.
+    :param user_id: User identifier.
+    :return: Bucket in [0, BUCKETS).
+    """
+    return _crc32(str(user_id).encode("utf-8"), _crc32(salt.encode("utf-8"))) % BUCKETS
+
+
+def _threshold(percent: Any, name: str) -> int:
+    percent = float(percent)
+    if not 0 <= percent <= 100:
+        raise ValueError(
+            f"Flag {name}: rollout must be between 0 and 100, got {percent}."
+        )
+    return round(percent * BUCKETS / 100)
+
+
+def _enabled(value: Any, name: str) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"Flag {name}: enabled must be a boolean, got {value!r}.")
+
+
+def _hasher(salt: str, threshold: int) -> Callable[[Any], bool]:
+    if threshold >= BUCKETS:
+        return lambda user_id: True
+    if threshold <= 0:
+        return lambda user_id: False
+    seed = _crc32(salt.encode("utf-8"))
+
+    def check(user_id: Any) -> bool:
+        return _crc32(str(user_id).encode("utf-8"), seed) % BUCKETS < threshold
+
+    return check
+
+
+class CompiledFlag:
+    """
+    Evaluation structure of one flag.
+    """
+
+    __slots__ = (
+        "name",
+        "enabled",
+        "allow",
+        "deny",
+        "index",
+        "rule_checks",
+        "variant_names",
+        "variant_bounds",
+        "check",
+        "evaluate",
+        "_variant_seed",
+    )
+
+    def __init__(self, name: str, definition: Mapping[str, Any]):
+        """
+        Compile a flag definition.
+        :param name: Flag name.
+        :param definition: Flag definition, see the module documentation.
+        :raise ValueError: If the definition is invalid.
+        """
+        self.name = name
+        self.enabled = _enabled(definition.get("enabled", True), name)
+        salt = str(definition.get("salt", name))
+        self.allow = frozenset(map(str, definition.get("allow", ())))
+        self.deny = frozenset(map(str, definition.get("deny", ())))
+        self.check = _hasher(salt, _threshold(definition.get("rollout", 100), name))
+        # attribute -> value -> index of the first rule matching it.
+        self.index: Dict[str, Dict[Any, int]] = {}
+        self.rule_checks: List[Callable[[Any], bool]] = []
+        for position, rule in enumerate(definition.get("rules", ())):
+            if "attribute" not in rule or "in" not in rule:
+                raise ValueError(f"Flag {name}: rules need 'attribute' and 'in'.")
+            values = self.index.setdefault(str(rule["attribute"]), {})
+            for value in rule["in"]:
+                values.setdefault(str(value), position)
+            self.rule_checks.append(
+                _hasher(salt, _threshold(rule.get("rollout", 100), name))
+            )
+        variants = definition.get("variants") or {}
+        self.variant_names: Tuple[str, ...] = tuple(variants)
+        bounds, total = [], 0
+        for weight in variants.values():
+            total += float(weight)
+            bounds.append(total)
+        if variants and total <= 0:
+            raise ValueError(
+                f"Flag {name}: variant weights must add up to more than 0."
+            )
+        # Upper bound of each variant in bucket units.
+        self.variant_bounds = [bound * BUCKETS / total for bound in bounds]
+        self._variant_seed = _crc32(f"{salt}:variant".encode("utf-8"))
+        self.evaluate = self._specialize()
+
+    def _specialize(self) -> Callable[..., Any]:
+        if not self.enabled:
+            off = None if self.variant_names else False
+            return lambda user_id, attributes=None: off
+        if self.allow or self.deny or self.index or self.variant_names:
+            return self._evaluate
+        check = self.check
+        return lambda user_id, attributes=None: check(user_id)
+
+    def _evaluate(
+        self, user_id: Any, attributes: Optional[Mapping[str, Any]] = None
+    ) -> Any:
+        user = str(user_id)
+        if user in self.deny:
+            on = False
+        elif user in self.allow:
+            on = True
+        else:
+            check = self.check
+            if attributes and self.index:
+                first = None
+                for attribute, values in self.index.items():
+                    value = attributes.get(attribute)
+                    if value is not None:
+                        position = values.get(str(value))
+                        if position is not None and (first is None or position < first):
+                            first = position
+                if first is not None:
+                    check = self.rule_checks[first]
+            on = check(user_id)
+        if not self.variant_names:
+            return on
+        return self.variant(user_id) if on else None
+
+    def variant(self, user_id: Any) -> str:
+        """
+        Variant assigned to a user, regardless of the rollout.
+        :param user_id: User identifier.
+        :return: Variant name.
+        """
+        position = _crc32(str(user_id).encode("utf-8"), self._variant_seed) % BUCKETS
+        index = bisect.bisect_right(self.variant_bounds, position)
+        return self.variant_names[min(index, len(self.variant_names) - 1)]
+
+
+def definitions(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Collect the flag definitions of a configuration.
+    :param config: Configuration data.
+    :return: Dict mapping flag names to definitions.
+    """
+    found: Dict[str, Any] = {}
+    nested = config.get(PREFIX)
+    if isinstance(nested, str):
+        nested = json.loads(nested)
+    if isinstance(nested, Mapping):
+        found.update(nested)
+    prefix = PREFIX + "."
+    for key, value in config.items():
+        if isinstance(key, str) and key.startswith(prefix):
+            found[key[len(prefix) :]] = value
+    return found
+
+
+class FlagSet:
+    """
+    Compiled feature flags of a configuration.
+    """
+
+    __slots__ = ("flags",)
+
+    def __init__(self, definitions: Mapping[str, Any]):
+        """
+        Compile flag definitions.
+        :param definitions: Dict mapping flag names to definitions, as dicts or JSON strings.
+        :raise ValueError: If a definition is invalid.
+        """
+        self.flags: Dict[str, CompiledFlag] = {}
+        for name, definition in definitions.items():
+            try:
+                if isinstance(definition, str):
+                    definition = json.loads(definition)
+                self.flags[name] = CompiledFlag(name, definition)
+            except Exception as e:
+                print("Error compiling feature flag:", e)
+                raise
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "FlagSet":
+        return cls(definitions(config))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.flags
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def is_enabled(
+        self, name: str, user_id: Any, attributes: Optional[Mapping[str, Any]] = None
+    ) -> bool:
+        """
+        Evaluate a flag for one user.
+        :param name: Flag name. Unknown flags are off.
+        :param user_id: User identifier.
+        :param attributes: Attributes matched by the rules, e.g. {"country": "DE"}.
+        :return: True if the flag is on for the user.
+        """
+        flag = self.flags.get(name)
+        return flag is not None and bool(flag.evaluate(user_id, attributes))
+
+    def variant(
+        self, name: str, user_id: Any, attributes: Optional[Mapping[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Evaluate a variant flag for one user.
+        :param name: Flag name.
+        :param user_id: User identifier.
+        :param attributes: Attributes matched by the rules.
+        :return: The variant, or None if the flag is off, unknown or has no variants.
+        """
+        flag = self.flags.get(name)
+        if flag is None or not flag.variant_names:
+            return None
+        return flag.evaluate(user_id, attributes)
+
+    def evaluate_many(
+        self,
+        name: str,
+        user_ids: Iterable[Any],
+        attributes: Optional[Mapping[str, Any]] = None,
+    ) -> List[Any]:
+        """
+        Evaluate a flag for many users sharing the same attributes.
+        :param name: Flag name.
+        :param user_ids: User identifiers.
+        :param attributes: Attributes matched by the rules.
+        :return: One result per user, as is_enabled() for boolean flags and variant() for variant flags.
+        """
+        flag = self.flags.get(name)
+        if flag is None:
+            return [False for _ in user_ids]
+        evaluate = flag.evaluate
+        if attributes is None:
+            return [evaluate(user_id) for user_id in user_ids]
+        return [evaluate(user_id, attributes) for user_id in user_ids]
@@ -0,0 +1,82 @@
+"""
+Package: config_manager
+Module: history
+This module contains the helpers shared by the SQL loaders to keep an append-only version history of each
+application's configuration.
+
+The config table stays the materialized current state. Every save that changes something appends one row per
+changed or deleted key to the history table, tagged with the next version of the application, so reading any
+version only scans the history of that application.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+# Number of versions kept per application when no retention is given.
+DEFAULT_RETENTION = 100
+
+
+def sqlite_text(value: Any) -> Any:
+    """
+    Text stored by SQLite for a value bound to a TEXT column.
+    :param value: Value to store.
+    :return: The stored value.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value)
+
+
+def postgres_text(value: Any) -> Any:
+    """
+    Text stored by PostgreSQL for a value bound to a TEXT column.
+    :param value: Value to store.
+    :return: The stored value.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def diff_rows(
+    current: Mapping[str, Any],
+    config: Mapping[str, Any],
+    as_text: Callable[[Any], Any],
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Compare stored rows with the configuration about to be saved.
+    :param current: Key/value rows currently stored.
+    :param config: A mapping containing configuration data.
+    :param as_text: Conversion applied by the database to stored values.
+    :return: (changed or added keys with their values, deleted keys).
+    """
+    changed = {
+        key: value
+        for key, value in config.items()
+        if key not in current or current[key] != as_text(value)
+    }
+    deleted = [key for key in current if key not in config]
+    return changed, deleted
+
+
+def prune_cutoff(version: int, retention: int) -> int:
+    """
+    Oldest version kept after saving version with the given retention.
+    :param version: Version just saved.
+    :param retention: Number of versions to keep.
+    :return: The oldest version to keep.
+    """
+    return version - retention + 1
+
+
+def prune_due(version: int, retention: int) -> bool:
+    """
+    Pruning runs once every retention / 10 versions instead of on every save.
+    :param version: Version just saved.
+    :param retention: Number of versions to keep.
+    :return: True if older versions should be pruned now.
+    """
+    return version > retention and version % max(1, retention // 10) == 0
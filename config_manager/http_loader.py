@@ -0,0 +1,124 @@
+"""
+Package: config_manager
+Module: http_loader
+This module contains the HTTPConfigLoader class that is used to load and save configuration data through a
+ConfigServer.
+
+The loader keeps the ETag and body of the last response and sends If-None-Match, so loading an unchanged
+configuration costs a 304 without a body.
+"""
+
+import http.client
+import json
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from .base_loader import BaseConfigLoader
+
+
+class HTTPConfigLoader(BaseConfigLoader):
+    """
+    Configuration loader for a ConfigServer.
+    """
+
+    __slots__ = ("base_url", "app_id", "app_name", "timeout", "etag", "_body")
+
+    def __init__(
+        self,
+        base_url: str,
+        app_id: str,
+        app_name: str = "",
+        timeout: float = 5.0,
+    ):
+        """
+        Initialize the HTTPConfigLoader.
+        :param base_url: URL of the ConfigServer, e.g. 'http://127.0.0.1:8080'.
+        :param app_id: Unique identifier for the application.
+        :param app_name: Name of the application.
+        :param timeout: Socket timeout in seconds, long polls add their wait to it.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.app_id = app_id
+        self.app_name = app_name
+        self.timeout = timeout
+        self.etag: Optional[str] = None
+        self._body: Optional[bytes] = None
+
+    def payload_size(self) -> Optional[int]:
+        return len(self._body) if self._body is not None else None
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load configuration data, revalidating the cached copy with If-None-Match.
+        :return: Dict containing configuration data.
+        """
+        data = self._get(wait=0)
+        return data if data is not None else json.loads(self._body)
+
+    def wait_for_change(self, timeout: float = 30.0) -> Optional[Dict[str, Any]]:
+        """
+        Long poll until the configuration differs from the last one loaded.
+        :param timeout: Seconds to wait, capped by the server's max_wait.
+        :return: The new configuration data, or None if it did not change in time.
+        """
+        return self._get(wait=timeout)
+
+    def save(self, config: Dict[str, Any]) -> None:
+        """
+        Save configuration data through the server.
+        :param config: A dict containing configuration data.
+        :return: None
+        """
+        body = json.dumps(dict(config), default=str).encode("utf-8")
+        status, etag, response = self._request(
+            "PUT", body=body, headers={"Content-Type": "application/json"}
+        )
+        if status != 200:
+            raise ConnectionError(f"Saving {self.app_id} failed with HTTP {status}.")
+        self.etag, self._body = etag, response
+
+    def for_app(self, app_id: str, app_name: str = "") -> "HTTPConfigLoader":
+        """
+        Create a loader for another application on the same server.
+        :param app_id: Unique identifier for the application.
+        :param app_name: Name of the application.
+        :return: HTTPConfigLoader bound to app_id.
+        """
+        return HTTPConfigLoader(self.base_url, app_id, app_name, self.timeout)
+
+    def _get(self, wait: float) -> Optional[Dict[str, Any]]:
+        headers = {}
+        if self.etag is not None and self._body is not None:
+            headers["If-None-Match"] = self.etag
+        status, etag, body = self._request(
+            "GET", query=f"?wait={wait}" if wait else "", headers=headers, wait=wait
+        )
+        if status == 304:
+            return None
+        if status != 200:
+            raise ConnectionError(f"Loading {self.app_id} failed with HTTP {status}.")
+        self.etag, self._body = etag, body
+        return json.loads(body)
+
+    def _request(
+        self,
+        method: str,
+        query: str = "",
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        wait: float = 0,
+    ) -> Tuple[int, Optional[str], bytes]:
+        url = urlsplit(self.base_url)
+        connection = http.client.HTTPConnection(
+            url.hostname, url.port, timeout=self.timeout + wait
+        )
+        try:
+            path = f"{url.path}/apps/{quote(str(self.app_id), safe='')}{query}"
+            connection.request(method, path, body=body, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, response.getheader("ETag"), response.read()
+        except Exception as e:
+            print("Error requesting configuration:", e)
+            raise
+        finally:
+            connection.close()
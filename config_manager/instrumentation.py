@@ -0,0 +1,315 @@
+"""
+Package: config_manager
+Module: instrumentation
+This module contains the observer hooks that report timings, sizes and counts for loader and Configuration
+operations.
+
+Nothing is measured until an observer is registered, instrumented calls then only pay a truthiness check on the
+observer list.
+
+Example usage:
+
+```python
+from config_manager.instrumentation import MetricsObserver, observe
+
+metrics = MetricsObserver()
+with observe(metrics):
+    config["KEY"] = "value"
+print(metrics.snapshot())
+```
+"""
+
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+_observers: List["Observer"] = []
+_active = threading.local()
+
+
+class OperationEvent:
+    """
+    A completed loader or Configuration operation.
+    """
+
+    __slots__ = (
+        "component",
+        "operation",
+        "source",
+        "start_time_ns",
+        "duration_ns",
+        "keys",
+        "key_count",
+        "bytes",
+        "error",
+        "payload",
+    )
+
+    def __init__(
+        self,
+        component: str,
+        operation: str,
+        source: Any,
+        start_time_ns: int,
+        duration_ns: int,
+        keys: Optional[Sequence[str]] = None,
+        key_count: Optional[int] = None,
+        bytes: Optional[int] = None,
+        error: Optional[BaseException] = None,
+        payload: Any = None,
+    ):
+        """
+        Initialize the event.
+        :param component: 'loader' or 'configuration'.
+        :param operation: Name of the operation, e.g. 'load', 'save', 'set'.
+        :param source: The loader or Configuration that ran the operation.
+        :param start_time_ns: Wall clock start time, in nanoseconds since the epoch.
+        :param duration_ns: Duration in nanoseconds.
+        :param keys: Keys changed by a Configuration mutation, or rows written by save_many() and apply_changes().
+        :param key_count: Number of keys (rows) loaded or saved.
+        :param bytes: Size of the underlying file, when the loader knows it.
+        :param error: Exception raised by the operation, if any.
+        :param payload: Mapping that was loaded or saved, only valid while observers run.
+        """
+        self.component = component
+        self.operation = operation
+        self.source = source
+        self.start_time_ns = start_time_ns
+        self.duration_ns = duration_ns
+        self.keys = keys
+        self.key_count = key_count
+        self.bytes = bytes
+        self.error = error
+        self.payload = payload
+
+    @property
+    def source_name(self) -> str:
+        return type(self.source).__name__
+
+    @property
+    def name(self) -> str:
+        return f"{self.source_name}.{self.operation}"
+
+    def __repr__(self) -> str:
+        return (
+            f"OperationEvent({self.name}, duration_ns={self.duration_ns}, "
+            f"key_count={self.key_count}, bytes={self.bytes}, error={self.error!r})"
+        )
+
+
+class Observer:
+    """
+    Base class for instrumentation observers.
+    """
+
+    def on_event(self, event: OperationEvent) -> None:
+        """
+        Called after every instrumented operation.
+        :param event: The completed operation.
+        :return: None
+        """
+        pass
+
+
+def add_observer(observer: Observer) -> None:
+    _observers.append(observer)
+
+
+def remove_observer(observer: Observer) -> None:
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+@contextmanager
+def observe(observer: Observer) -> Iterator[Observer]:
+    """
+    Register an observer for the duration of a with block.
+    :param observer: Observer to register.
+    :return: The observer.
+    """
+    add_observer(observer)
+    try:
+        yield observer
+    finally:
+        remove_observer(observer)
+
+
+def enabled() -> bool:
+    return bool(_observers)
+
+
+def emit(event: OperationEvent) -> None:
+    for observer in list(_observers):
+        try:
+            observer.on_event(event)
+        except Exception as e:
+            print("Error in instrumentation observer:", e)
+
+
+def active_operations() -> Set[str]:
+    """
+    Get the instrumented operations currently running on this thread, e.g. {'set', 'save'} inside a save triggered
+    by `config[key] = value`.
+    :return: Set of operation names.
+    """
+    return {operation for _, operation in getattr(_active, "running", ())}
+
+
+def _key_count(value: Any) -> Optional[int]:
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def instrumented(
+    component: str,
+    operation: str,
+    describe: Optional[Callable[..., Tuple[Optional[Sequence[str]], Any]]] = None,
+) -> Callable:
+    """
+    Decorate a method so that each call emits an OperationEvent while observers are registered.
+    Nested calls of the same operation on the same object (e.g. through super()) are reported once.
+    :param component: 'loader' or 'configuration'.
+    :param operation: Name of the operation.
+    :param describe: Callable receiving (self, result, *args, **kwargs) and returning (keys, payload).
+    :return: Decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not _observers:
+                return func(self, *args, **kwargs)
+            marker = (id(self), operation)
+            running = _active.__dict__.setdefault("running", set())
+            if marker in running:
+                return func(self, *args, **kwargs)
+            running.add(marker)
+            start_time_ns = time.time_ns()
+            start = time.perf_counter_ns()
+            result = error = None
+            try:
+                result = func(self, *args, **kwargs)
+                return result
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                duration_ns = time.perf_counter_ns() - start
+                running.discard(marker)
+                if describe is not None:
+                    keys, payload = describe(self, result, *args, **kwargs)
+                else:
+                    keys, payload = None, result
+                size = getattr(type(self), "payload_size", None)
+                emit(
+                    OperationEvent(
+                        component,
+                        operation,
+                        self,
+                        start_time_ns,
+                        duration_ns,
+                        keys=keys,
+                        key_count=_key_count(keys if keys is not None else payload),
+                        bytes=size(self) if size and error is None else None,
+                        error=error,
+                        payload=payload,
+                    )
+                )
+
+        wrapper.__instrumented__ = True
+        return wrapper
+
+    return decorator
+
+
+class MetricsObserver(Observer):
+    """
+    Aggregates call counts, errors, total duration, keys and bytes per operation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, int]] = {}
+
+    def on_event(self, event: OperationEvent) -> None:
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                event.name,
+                {"count": 0, "errors": 0, "duration_ns": 0, "keys": 0, "bytes": 0},
+            )
+            metrics["count"] += 1
+            metrics["errors"] += event.error is not None
+            metrics["duration_ns"] += event.duration_ns
+            metrics["keys"] += event.key_count or 0
+            metrics["bytes"] += event.bytes or 0
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get a copy of the aggregated metrics.
+        :return: Dict mapping '<Class>.<operation>' to its counters.
+        """
+        with self._lock:
+            return {name: dict(values) for name, values in self._metrics.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+
+class LoggingObserver(Observer):
+    """
+    Logs every operation through the logging module.
+    """
+
+    def __init__(
+        self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG
+    ):
+        self.logger = logger or logging.getLogger("config_manager")
+        self.level = level
+
+    def on_event(self, event: OperationEvent) -> None:
+        self.logger.log(
+            logging.ERROR if event.error is not None else self.level,
+            "%s took %.3f ms (keys=%s, bytes=%s, error=%r)",
+            event.name,
+            event.duration_ns / 1e6,
+            event.key_count,
+            event.bytes,
+            event.error,
+        )
+
+
+class OpenTelemetryObserver(Observer):
+    """
+    Records each operation as an OpenTelemetry span. Requires the `opentelemetry-api` package.
+    """
+
+    def __init__(self, tracer=None):
+        """
+        Initialize the observer.
+        :param tracer: OpenTelemetry tracer, defaults to the 'config_manager' tracer of the global provider.
+        """
+        if tracer is None:
+            from opentelemetry import trace
+
+            tracer = trace.get_tracer("config_manager")
+        self.tracer = tracer
+
+    def on_event(self, event: OperationEvent) -> None:
+        span = self.tracer.start_span(
+            f"config_manager.{event.name}", start_time=event.start_time_ns
+        )
+        span.set_attribute("config_manager.component", event.component)
+        span.set_attribute("config_manager.operation", event.operation)
+        if event.key_count is not None:
+            span.set_attribute("config_manager.key_count", event.key_count)
+        if event.bytes is not None:
+            span.set_attribute("config_manager.bytes", event.bytes)
+        if event.error is not None:
+            span.record_exception(event.error)
+        span.end(end_time=event.start_time_ns + event.duration_ns)
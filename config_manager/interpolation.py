@@ -0,0 +1,224 @@
+"""
+Package: config_manager
+Module: interpolation
+This module contains the Interpolator class that expands `${KEY}` references between configuration values.
+
+Values are parsed once, when they are loaded or set, into templates and a dependency graph. Resolved values are
+cached; changing a key only invalidates the values that depend on it, directly or transitively. Reference cycles are
+rejected when a value is set.
+
+Syntax:
+
+- `${KEY}` or `${db.host}`: value of a key or dotted path, an empty string if it is missing.
+- `${KEY:-default}`: default used when the key is missing.
+- `$${`: a literal `${`.
+
+A value that is a single reference (`"${PORT}"`) resolves to the referenced value with its type.
+"""
+
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .path_index import SEPARATOR
+
+_REFERENCE = re.compile(r"\$\$\{|\$\{([^}:]+)(?::-([^}]*))?\}")
+
+_MISSING = object()
+
+Part = Union[str, Tuple[str, Optional[str]]]
+
+
+class InterpolationError(ValueError):
+    """
+    Raised for reference cycles.
+    """
+
+
+def parse(value: str) -> Optional[List[Part]]:
+    """
+    Parse a value into literal strings and (reference, default) pairs.
+    :param value: Value to parse.
+    :return: The parts, or None if the value holds no reference.
+    """
+    if "${" not in value:
+        return None
+    parts: List[Part] = []
+    position = 0
+    has_reference = False
+    for match in _REFERENCE.finditer(value):
+        literal = value[position : match.start()]
+        if match.group(0) == "$${":
+            literal += "${"
+        if literal:
+            parts.append(literal)
+        if match.group(1) is not None:
+            parts.append((match.group(1).strip(), match.group(2)))
+            has_reference = True
+        position = match.end()
+    if position < len(value):
+        parts.append(value[position:])
+    if not has_reference:
+        # Only escapes: store the unescaped literal as a template without dependencies.
+        return ["".join(part for part in parts if isinstance(part, str))]
+    return parts
+
+
+def _roots(reference: str) -> Tuple[str, ...]:
+    # A dotted reference depends on its full name and on its top-level key.
+    root = reference.split(SEPARATOR, 1)[0]
+    return (reference,) if root == reference else (reference, root)
+
+
+class Interpolator:
+    """
+    Templates, dependency graph and resolved values of one configuration.
+    """
+
+    __slots__ = ("source", "lookup", "templates", "dependents", "_resolved")
+
+    def __init__(self, source: Mapping[str, Any], lookup: Callable[[str, Any], Any]):
+        """
+        Initialize the interpolator and parse every value of the configuration.
+        :param source: The configuration data.
+        :param lookup: Callable returning the raw value of a key or dotted path, or the given default.
+        :raise InterpolationError: If references form a cycle.
+        """
+        self.source = source
+        self.lookup = lookup
+        self.templates: Dict[str, List[Part]] = {}
+        self.dependents: Dict[str, Set[str]] = {}
+        self._resolved: Dict[str, Any] = {}
+        for key, value in source.items():
+            self._compile(key, value)
+        checked: Set[str] = set()
+        for key in self.templates:
+            self._check_cycle(key, checked)
+
+    def _compile(self, key: str, value: Any) -> None:
+        parts = parse(value) if isinstance(value, str) else None
+        if parts is None:
+            return
+        self.templates[key] = parts
+        for reference in self._references(key):
+            for root in _roots(reference):
+                self.dependents.setdefault(root, set()).add(key)
+
+    def _references(self, key: str) -> List[str]:
+        return [
+            part[0] for part in self.templates.get(key, ()) if isinstance(part, tuple)
+        ]
+
+    def _discard(self, key: str) -> None:
+        for reference in self._references(key):
+            for root in _roots(reference):
+                dependents = self.dependents.get(root)
+                if dependents is not None:
+                    dependents.discard(key)
+                    if not dependents:
+                        del self.dependents[root]
+        self.templates.pop(key, None)
+
+    def _check_cycle(self, start: str, done: Optional[Set[str]] = None) -> None:
+        path: List[str] = []
+        on_path: Set[str] = set()
+        done = set() if done is None else done
+
+        def visit(key: str) -> None:
+            if key in on_path:
+                cycle = path[path.index(key) :] + [key]
+                raise InterpolationError(f"Reference cycle: {' -> '.join(cycle)}")
+            if key in done or key not in self.templates:
+                return
+            path.append(key)
+            on_path.add(key)
+            for reference in self._references(key):
+                for root in _roots(reference):
+                    visit(root)
+            on_path.discard(path.pop())
+            done.add(key)
+
+        visit(start)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Reparse a changed value and invalidate its dependents.
+        :param key: Changed key.
+        :param value: New value.
+        :raise InterpolationError: If the new value closes a reference cycle, the previous state is kept.
+        """
+        previous = self.templates.get(key)
+        self._discard(key)
+        self._compile(key, value)
+        if key in self.templates:
+            try:
+                self._check_cycle(key)
+            except InterpolationError:
+                self._discard(key)
+                if previous is not None:
+                    self.templates[key] = previous
+                    for reference in self._references(key):
+                        for root in _roots(reference):
+                            self.dependents.setdefault(root, set()).add(key)
+                raise
+        self.invalidate((key,))
+
+    def delete(self, key: str) -> None:
+        self._discard(key)
+        self.invalidate((key,))
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """
+        Drop the resolved values of keys and of everything depending on them.
+        :param keys: Changed keys.
+        :return: None
+        """
+        pending = list(keys)
+        seen: Set[str] = set()
+        while pending:
+            key = pending.pop()
+            if key in seen:
+                continue
+            seen.add(key)
+            self._resolved.pop(key, None)
+            roots = {key, key.split(SEPARATOR, 1)[0]}
+            for root in roots:
+                pending.extend(self.dependents.get(root, ()))
+
+    def resolve(self, key: str) -> Any:
+        """
+        Get the expanded value of a key holding references, from the cache after the first call.
+        :param key: Key whose value is a template.
+        :return: Expanded value.
+        """
+        value = self._resolved.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._expand(self.templates[key])
+            self._resolved[key] = value
+        return value
+
+    def _reference_value(self, reference: str, default: Optional[str]) -> Any:
+        if reference in self.templates:
+            return self.resolve(reference)
+        value = self.lookup(reference, _MISSING)
+        if value is _MISSING or value is None:
+            return default if default is not None else ""
+        return value
+
+    def _expand(self, parts: List[Part]) -> Any:
+        if len(parts) == 1 and isinstance(parts[0], tuple):
+            return self._reference_value(*parts[0])
+        return "".join(
+            part if isinstance(part, str) else str(self._reference_value(*part))
+            for part in parts
+        )
@@ -2,48 +2,202 @@
 Package: config_manager
 Module: json_loader
 This module contains the JSONConfigLoader class that is used to load and save configuration data from JSON files.
+
+The JSON engine is pluggable. The stdlib `json` module is used by default, so the output does not depend on what is
+installed. `backend='auto'` picks `orjson` or `ujson` when installed; their output differs (e.g. 2-space indent,
+NaN written as null).
 """
 
+import io
 import json
-from typing import Any, Dict, Optional
+import os
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
 
 from .base_loader import BaseConfigLoader
+from .streaming import PathType, iter_json_items, replace_at_path
+
+
+class JSONBackend:
+    """
+    A JSON engine used by JSONConfigLoader.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loads: Callable[[Any], Any],
+        dumps: Callable[[Any, bool], bytes],
+    ):
+        """
+        Initialize the backend.
+        :param name: Name of the backend.
+        :param loads: Callable parsing str or bytes into Python objects.
+        :param dumps: Callable serializing an object to UTF-8 bytes, pretty-printed if the flag is set.
+        """
+        self.name = name
+        self.loads = loads
+        self._dumps = dumps
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        """
+        Serialize an object to UTF-8 encoded JSON.
+        :param obj: Object to serialize.
+        :param pretty: Indent the output.
+        :return: Encoded JSON.
+        """
+        try:
+            return self._dumps(obj, pretty)
+        except (TypeError, OverflowError):
+            if self is STDLIB_BACKEND:
+                raise
+            # Fast engines are stricter about value types than the stdlib.
+            return STDLIB_BACKEND.dumps(obj, pretty)
+
+    def __repr__(self) -> str:
+        return f"JSONBackend({self.name!r})"
+
+
+def _stdlib_dumps(obj: Any, pretty: bool) -> bytes:
+    if pretty:
+        return json.dumps(obj, indent=4).encode("utf-8")
+    return json.dumps(obj).encode("utf-8")
+
+
+STDLIB_BACKEND = JSONBackend("json", json.loads, _stdlib_dumps)
+
+JSON_BACKENDS: Dict[str, JSONBackend] = {"json": STDLIB_BACKEND}
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+
+    def _orjson_dumps(obj: Any, pretty: bool) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+    JSON_BACKENDS["orjson"] = JSONBackend("orjson", orjson.loads, _orjson_dumps)
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover - optional dependency
+    ujson = None
+
+if ujson is not None:  # pragma: no cover - optional dependency
+
+    def _ujson_dumps(obj: Any, pretty: bool) -> bytes:
+        return ujson.dumps(obj, indent=4 if pretty else 0).encode("utf-8")
+
+    JSON_BACKENDS["ujson"] = JSONBackend("ujson", ujson.loads, _ujson_dumps)
+
+_PREFERRED_BACKENDS = ("orjson", "ujson", "json")
+
+
+def get_json_backend(name: Optional[str] = None) -> JSONBackend:
+    """
+    Get a JSON backend by name, or the fastest installed one.
+    :param name: 'orjson', 'ujson', 'json' or None to auto-detect.
+    :return: The selected JSONBackend.
+    """
+    if name is None or name == "auto":
+        for candidate in _PREFERRED_BACKENDS:
+            if candidate in JSON_BACKENDS:
+                return JSON_BACKENDS[candidate]
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"JSON backend not available: {name}")
+    return JSON_BACKENDS[name]
 
 
 class JSONConfigLoader(BaseConfigLoader):
     """Configuration loader for JSON files."""
 
+    __slots__ = ("file_path", "json_data", "backend", "pretty", "root_path")
+
     def __init__(
-        self, file_path: Optional[str] = None, json_data: Optional[str] = None
+        self,
+        file_path: Optional[str] = None,
+        json_data: Optional[str] = None,
+        backend: Optional[str] = "json",
+        pretty: bool = True,
+        root_path: PathType = None,
     ):
         """
         Initialize JSONConfigLoader with file path and JSON data.
         :param file_path: Path to JSON file.
         :param json_data: JSON data.
+        :param backend: JSON engine to use: 'json' (default), 'orjson', 'ujson' or 'auto' for the fastest installed.
+        :param pretty: Indent JSON written to files, compact output is faster and smaller.
+        :param root_path: Dotted path of the object to load, parsed incrementally when set.
         """
         self.file_path = file_path
         self.json_data = json_data
+        self.backend = get_json_backend(backend)
+        self.pretty = pretty
+        self.root_path = root_path
+
+    def payload_size(self) -> Optional[int]:
+        if self.file_path and os.path.exists(self.file_path):
+            return os.path.getsize(self.file_path)
+        return None
 
     def load(self) -> Dict[str, Any]:
         """
         Load configuration data from JSON file.
         :return: Dict containing configuration data.
         """
+        if self.root_path:
+            return dict(self.iter_items(self.root_path))
         if self.json_data:
-            return json.loads(self.json_data)
+            return self.backend.loads(self.json_data)
         if not self.file_path:
             raise ValueError("File path must be provided for JSONConfigLoader.")
-        with open(self.file_path, "r") as file:
-            return json.load(file)
+        with open(self.file_path, "rb") as file:
+            return self.backend.loads(file.read())
+
+    def iter_items(self, path: PathType = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Incrementally parse the JSON document, yielding the (key, value) pairs of the object at path.
+        Branches outside path are scanned without being materialized.
+        :param path: Dotted path of the object to read, the document root by default.
+        :return: Iterator of (key, value) pairs.
+        """
+        if self.json_data:
+            yield from iter_json_items(io.StringIO(self.json_data), path)
+            return
+        if not self.file_path:
+            raise ValueError("File path must be provided for JSONConfigLoader.")
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            yield from iter_json_items(file, path)
+
+    def dumps(self, config: Mapping[str, Any], pretty: Optional[bool] = None) -> str:
+        """
+        Serialize configuration data to a JSON string.
+        :param config: A mapping containing configuration data.
+        :param pretty: Indent the output, defaults to compact.
+        :return: JSON string.
+        """
+        if not isinstance(config, dict):
+            config = dict(config)
+        return self.backend.dumps(config, bool(pretty)).decode("utf-8")
 
-    def save(self, config: Dict[str, Any]) -> str | None:
+    def save(self, config: Mapping[str, Any]) -> str | None:
         """
         Save configuration data to JSON file.
-        :param config: A dict containing configuration data.
-        :return: None
+        :param config: A mapping containing configuration data.
+        :return: The JSON string if no file path is set, otherwise None.
         """
         if not self.file_path:
-            # raise ValueError("File path must be provided for JSONConfigLoader.")
-            return json.dumps(config)
-        with open(self.file_path, "w") as file:
-            json.dump(config, file, indent=4)  # noqa
+            return self.dumps(config)
+        if not isinstance(config, dict):
+            config = dict(config)
+        if self.root_path:
+            # Only a sub-tree was loaded, write it back into the full document.
+            with open(self.file_path, "rb") as file:
+                document = self.backend.loads(file.read())
+            config = replace_at_path(document, self.root_path, config)
+        with open(self.file_path, "wb") as file:
+            file.write(self.backend.dumps(config, self.pretty))
@@ -0,0 +1,248 @@
+"""
+Package: config_manager
+Module: merkle
+This module contains the hash-tree diff and sync between configuration stores.
+
+Keys are spread over a fixed number of buckets. The hash of a bucket is the sum, modulo 2^64, of a digest of each
+(key, value) row in it, so it does not depend on row order and both SQL loaders compute it in the database with a
+single GROUP BY query. Two stores compare their bucket hashes first and only read the rows of buckets that differ;
+sync() then writes only the rows that changed.
+
+Example usage:
+
+```python
+from config_manager.merkle import sync
+
+changes = sync(postgres_loader, sqlite_loader)  # make the SQLite replica match PostgreSQL
+print(changes.as_dict())
+```
+"""
+
+import hashlib
+import sqlite3
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .history import sqlite_text
+from .path_index import flatten
+
+BUCKETS = 64
+_MASK = (1 << 64) - 1
+_EMPTY = "0" * 16
+
+
+def key_bucket(key: str, buckets: int = BUCKETS) -> int:
+    """
+    Bucket of a key, computed the same way by the SQL loaders.
+    :param key: Configuration key.
+    :param buckets: Number of buckets, a power of two.
+    :return: Bucket number.
+    """
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:8], 16) & (buckets - 1)
+
+
+def row_digest(key: str, value: Optional[str]) -> int:
+    """
+    Signed 64-bit digest of a stored row.
+    :param key: Configuration key.
+    :param value: Stored text value.
+    :return: Digest.
+    """
+    data = f"{key}\x1f{value if value is not None else chr(30)}".encode("utf-8")
+    digest = int(hashlib.md5(data).hexdigest()[:16], 16)
+    return digest - (1 << 64) if digest >= 1 << 63 else digest
+
+
+def bucket_hex(total: int) -> str:
+    return f"{int(total) & _MASK:016x}"
+
+
+def bucket_hashes(
+    rows: Mapping[str, Optional[str]], buckets: int = BUCKETS
+) -> Dict[int, str]:
+    """
+    Compute bucket hashes in memory.
+    :param rows: Key/text value rows.
+    :param buckets: Number of buckets.
+    :return: Dict mapping each non-empty bucket to its hash.
+    """
+    totals: Dict[int, int] = {}
+    for key, value in rows.items():
+        bucket = key_bucket(key, buckets)
+        totals[bucket] = totals.get(bucket, 0) + row_digest(key, value)
+    return {bucket: bucket_hex(total) for bucket, total in totals.items()}
+
+
+def root_hash(hashes: Mapping[int, str], buckets: int = BUCKETS) -> str:
+    """
+    Hash of all bucket hashes, equal for two stores holding the same rows.
+    :param hashes: Bucket hashes, missing buckets are empty.
+    :param buckets: Number of buckets.
+    :return: Hex digest.
+    """
+    joined = "".join(hashes.get(bucket, _EMPTY) for bucket in range(buckets))
+    return hashlib.md5(joined.encode("ascii")).hexdigest()
+
+
+def changed_buckets(
+    left: Mapping[int, str], right: Mapping[int, str], buckets: int = BUCKETS
+) -> List[int]:
+    return [
+        bucket
+        for bucket in range(buckets)
+        if left.get(bucket, _EMPTY) != right.get(bucket, _EMPTY)
+    ]
+
+
+class _BucketSum:
+    # SQLite aggregate, SUM() raises on 64-bit overflow.
+    def __init__(self):
+        self.total = 0
+
+    def step(self, key: str, value: Optional[str]) -> None:
+        self.total += row_digest(key, value)
+
+    def finalize(self) -> str:
+        return bucket_hex(self.total)
+
+
+def register_sqlite_functions(connection: sqlite3.Connection) -> None:
+    """
+    Register cm_bucket(key, buckets) and cm_bucket_hash(key, value) on a SQLite connection.
+    :param connection: SQLite connection.
+    :return: None
+    """
+    connection.create_function("cm_bucket", 2, key_bucket, deterministic=True)
+    connection.create_aggregate("cm_bucket_hash", 2, _BucketSum)
+
+
+def postgres_bucket_sql(buckets: int = BUCKETS) -> str:
+    return f"(('x' || substr(md5(key), 1, 8))::bit(32)::int & {buckets - 1})"
+
+
+POSTGRES_DIGEST_SQL = "('x' || substr(md5(key || chr(31) || coalesce(value, chr(30))), 1, 16))::bit(64)::bigint"
+
+
+class ConfigDiff:
+    """
+    Key-level changes turning one configuration into another.
+    """
+
+    __slots__ = ("added", "removed", "changed")
+
+    def __init__(
+        self,
+        added: Optional[Dict[str, Any]] = None,
+        removed: Optional[Dict[str, Any]] = None,
+        changed: Optional[Dict[str, Tuple[Any, Any]]] = None,
+    ):
+        """
+        Initialize the diff.
+        :param added: Keys only present in the other configuration, with their values.
+        :param removed: Keys only present in this configuration, with their values.
+        :param changed: Keys present in both with different values, as (old, new) pairs.
+        """
+        self.added = added or {}
+        self.removed = removed or {}
+        self.changed = changed or {}
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ConfigDiff):
+            return False
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        return f"ConfigDiff({self.as_dict()})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"added": self.added, "removed": self.removed, "changed": self.changed}
+
+
+class _MemoryStore:
+    """
+    Bucket hashes of an in-memory mapping, for loaders and objects without hashing support.
+    """
+
+    def __init__(self, config: Mapping[str, Any]):
+        self.rows = {key: sqlite_text(value) for key, value in flatten(config).items()}
+
+    def bucket_hashes(self, buckets: int = BUCKETS) -> Dict[int, str]:
+        return bucket_hashes(self.rows, buckets)
+
+    def rows_in_buckets(
+        self, bucket_ids: Iterable[int], buckets: int = BUCKETS
+    ) -> Dict[str, Any]:
+        wanted = set(bucket_ids)
+        return {
+            key: value
+            for key, value in self.rows.items()
+            if key_bucket(key, buckets) in wanted
+        }
+
+
+def _store(source: Any) -> Any:
+    if hasattr(source, "config") and hasattr(source, "loader"):
+        # A Configuration compares its in-memory state, which may have unsaved changes.
+        return _MemoryStore(source.config)
+    if hasattr(source, "bucket_hashes"):
+        return source
+    if isinstance(source, Mapping):
+        return _MemoryStore(source)
+    return _MemoryStore(source.load())
+
+
+def diff(source: Any, other: Any, buckets: int = BUCKETS) -> ConfigDiff:
+    """
+    Compare two stores, reading only the rows of buckets whose hashes differ.
+    :param source: SQL loader, other loader, Configuration or mapping.
+    :param other: SQL loader, other loader, Configuration or mapping.
+    :param buckets: Number of buckets, a power of two.
+    :return: Changes turning source into other. Values are compared as stored text.
+    """
+    left, right = _store(source), _store(other)
+    bucket_ids = changed_buckets(
+        left.bucket_hashes(buckets), right.bucket_hashes(buckets), buckets
+    )
+    if not bucket_ids:
+        return ConfigDiff()
+    old = left.rows_in_buckets(bucket_ids, buckets)
+    new = right.rows_in_buckets(bucket_ids, buckets)
+    return ConfigDiff(
+        added={key: value for key, value in new.items() if key not in old},
+        removed={key: value for key, value in old.items() if key not in new},
+        changed={
+            key: (value, new[key])
+            for key, value in old.items()
+            if key in new and sqlite_text(value) != sqlite_text(new[key])
+        },
+    )
+
+
+def sync(source: Any, target: Any, buckets: int = BUCKETS) -> ConfigDiff:
+    """
+    Make target hold the same rows as source, writing only the rows that differ.
+    :param source: Store to copy from.
+    :param target: Loader to write to. SQL loaders upsert and delete single rows, other loaders save a full copy.
+    :param buckets: Number of buckets, a power of two.
+    :return: The changes applied to target.
+    """
+    changes = diff(target, source, buckets)
+    if not changes:
+        return changes
+    upserts = dict(changes.added)
+    upserts.update({key: new for key, (_, new) in changes.changed.items()})
+    apply_changes = getattr(target, "apply_changes", None)
+    if apply_changes is not None:
+        apply_changes(upserts, list(changes.removed))
+        return changes
+    config = dict(target.load())
+    for key in changes.removed:
+        config.pop(key, None)
+    config.update(upserts)
+    target.save(config)
+    return changes
@@ -0,0 +1,369 @@
+"""
+Package: config_manager
+Module: migrations
+This module contains the versioned schema migrations of the SQLite and PostgreSQL loaders and the runner that
+applies them.
+
+Applied migrations are recorded in a schema_version table. Each database is checked once per process: later loaders
+for the same database skip the check, and a database that is already current only costs one SELECT, no DDL.
+"""
+
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Any, Callable, List, Sequence, Set, Tuple, Union
+
+_checked: Set[Tuple[str, ...]] = set()
+_checked_lock = threading.Lock()
+
+
+class Migration:
+    """
+    One schema change, applied at most once per database.
+    """
+
+    __slots__ = ("version", "description", "statements")
+
+    def __init__(
+        self,
+        version: int,
+        description: str,
+        statements: Union[Sequence[str], Callable[[Any], None]],
+    ):
+        """
+        Initialize the migration.
+        :param version: Schema version reached once applied, migrations run in ascending order.
+        :param description: Short description stored in schema_version.
+        :param statements: SQL statements, or a callable receiving the cursor for conditional changes.
+        """
+        self.version = version
+        self.description = description
+        self.statements = statements
+
+    def apply(self, cursor) -> None:
+        if callable(self.statements):
+            self.statements(cursor)
+            return
+        for statement in self.statements:
+            cursor.execute(statement)
+
+    def __repr__(self) -> str:
+        return f"Migration({self.version}, {self.description!r})"
+
+
+def _sqlite_add_revision(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("PRAGMA table_info(config);")
+    if "revision" not in [column[1] for column in cursor.fetchall()]:
+        cursor.execute(
+            "ALTER TABLE config ADD COLUMN revision INTEGER NOT NULL DEFAULT 1;"
+        )
+
+
+# Statements use IF NOT EXISTS so databases created before schema_version existed are adopted as they are.
+SQLITE_MIGRATIONS: List[Migration] = [
+    Migration(
+        1,
+        "create applications and config tables",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS applications (
+                app_id TEXT PRIMARY KEY,
+                app_name TEXT UNIQUE NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS config (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                app_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (app_id, key),
+                FOREIGN KEY (app_id) REFERENCES applications(app_id) ON DELETE CASCADE
+            );
+            """,
+        ],
+    ),
+    Migration(2, "add config.revision", _sqlite_add_revision),
+    Migration(
+        3,
+        "create version history tables",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS config_versions (
+                app_id TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (app_id, version)
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS config_history (
+                app_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                value TEXT,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (app_id, key, version)
+            );
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS config_history_app_version
+            ON config_history (app_id, version);
+            """,
+        ],
+    ),
+    Migration(
+        4,
+        "index config by (app_id, updated_at) for incremental sync",
+        [
+            """
+            CREATE INDEX IF NOT EXISTS config_app_updated
+            ON config (app_id, updated_at);
+            """
+        ],
+    ),
+]
+
+
+def postgres_migrations(config_table: str, applications_table: str) -> List[Migration]:
+    """
+    Get the PostgreSQL migrations for a pair of tables.
+    :param config_table: Name of the table storing configuration data.
+    :param applications_table: Name of the table storing application data.
+    :return: Migrations in ascending order.
+    """
+    return [
+        Migration(
+            1,
+            "create applications and config tables",
+            [
+                f"""
+                CREATE TABLE IF NOT EXISTS {applications_table} (
+                    app_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+                    app_name TEXT UNIQUE NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+                """,
+                f"""
+                CREATE TABLE IF NOT EXISTS {config_table} (
+                    id SERIAL PRIMARY KEY,
+                    app_id UUID REFERENCES {applications_table}(app_id) ON DELETE CASCADE,
+                    key TEXT NOT NULL,
+                    value TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (app_id, key)
+                );
+                """,
+            ],
+        ),
+        Migration(
+            2,
+            "generate app_id with the built-in gen_random_uuid()",
+            [
+                f"ALTER TABLE {applications_table} ALTER COLUMN app_id SET DEFAULT gen_random_uuid();"
+            ],
+        ),
+        Migration(
+            3,
+            "add config.revision",
+            [
+                f"ALTER TABLE {config_table} ADD COLUMN IF NOT EXISTS revision INTEGER NOT NULL DEFAULT 1;"
+            ],
+        ),
+        Migration(
+            4,
+            "create version history tables",
+            [
+                f"""
+                CREATE TABLE IF NOT EXISTS {config_table}_versions (
+                    app_id UUID NOT NULL,
+                    version INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (app_id, version)
+                );
+                """,
+                f"""
+                CREATE TABLE IF NOT EXISTS {config_table}_history (
+                    app_id UUID NOT NULL,
+                    key TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    value TEXT,
+                    deleted BOOLEAN NOT NULL DEFAULT FALSE,
+                    PRIMARY KEY (app_id, key, version)
+                );
+                """,
+                f"""
+                CREATE INDEX IF NOT EXISTS {config_table}_history_app_version
+                ON {config_table}_history (app_id, version);
+                """,
+            ],
+        ),
+        Migration(
+            5,
+            "index config by (app_id, updated_at) for incremental sync",
+            [
+                f"""
+                CREATE INDEX IF NOT EXISTS {config_table}_app_updated
+                ON {config_table} (app_id, updated_at);
+                """
+            ],
+        ),
+    ]
+
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    scope TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    description TEXT,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (scope, version)
+);
+"""
+
+
+def _is_checked(key: Tuple[str, ...]) -> bool:
+    with _checked_lock:
+        return key in _checked
+
+
+def _mark_checked(key: Tuple[str, ...]) -> None:
+    with _checked_lock:
+        _checked.add(key)
+
+
+def reset_schema_cache() -> None:
+    """
+    Forget which databases were checked, so the next loader checks its schema again.
+    :return: None
+    """
+    with _checked_lock:
+        _checked.clear()
+
+
+def migrate_sqlite(
+    sqlite_location: str, migrations: Sequence[Migration] = SQLITE_MIGRATIONS
+) -> int:
+    """
+    Apply pending migrations to a SQLite database, once per process.
+    :param sqlite_location: Path to the SQLite database.
+    :param migrations: Migrations in ascending order.
+    :return: The schema version of the database.
+    """
+    latest = migrations[-1].version
+    key = ("sqlite", os.path.abspath(sqlite_location))
+    # A database file deleted since it was checked is migrated again.
+    if _is_checked(key) and os.path.exists(sqlite_location):
+        return latest
+    connection = sqlite3.connect(sqlite_location, isolation_level=None)
+    cursor = connection.cursor()
+    try:
+        current = _sqlite_version(cursor)
+        if current < latest:
+            # Serializes concurrent processes, the version is read again under the lock.
+            cursor.execute("BEGIN IMMEDIATE;")
+            try:
+                cursor.execute(SCHEMA_VERSION_TABLE)
+                current = _sqlite_version(cursor)
+                for migration in migrations:
+                    if migration.version > current:
+                        migration.apply(cursor)
+                        cursor.execute(
+                            "INSERT INTO schema_version (scope, version, description) VALUES (?, ?, ?);",
+                            ("config", migration.version, migration.description),
+                        )
+                cursor.execute("COMMIT;")
+            except Exception:
+                cursor.execute("ROLLBACK;")
+                raise
+    except Exception as e:
+        print("Error migrating database:", e)
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+    _mark_checked(key)
+    return latest
+
+
+def _sqlite_version(cursor: sqlite3.Cursor) -> int:
+    try:
+        cursor.execute(
+            "SELECT COALESCE(MAX(version), 0) FROM schema_version WHERE scope = ?;",
+            ("config",),
+        )
+    except sqlite3.OperationalError:
+        # No schema_version table yet.
+        return 0
+    return cursor.fetchone()[0]
+
+
+def migrate_postgres(
+    postgres_uri: str,
+    config_table: str = "config",
+    applications_table: str = "applications",
+) -> int:
+    """
+    Apply pending migrations to a PostgreSQL database, once per process.
+    :param postgres_uri: URI for the PostgreSQL database.
+    :param config_table: Name of the table storing configuration data.
+    :param applications_table: Name of the table storing application data.
+    :return: The schema version of the database.
+    """
+    migrations = postgres_migrations(config_table, applications_table)
+    latest = migrations[-1].version
+    key = ("postgres", postgres_uri, config_table, applications_table)
+    if _is_checked(key):
+        return latest
+    # Imported here, so SQLite users never load the PostgreSQL driver.
+    import psycopg2
+
+    connection = psycopg2.connect(postgres_uri)
+    cursor = connection.cursor()
+    try:
+        current = _postgres_version(cursor, config_table)
+        if current < latest:
+            # Held until commit, serializes processes migrating the same tables.
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s);",
+                (zlib.crc32(f"config_manager:{config_table}".encode("utf-8")),),
+            )
+            cursor.execute(SCHEMA_VERSION_TABLE)
+            current = _postgres_version(cursor, config_table)
+            for migration in migrations:
+                if migration.version > current:
+                    migration.apply(cursor)
+                    cursor.execute(
+                        "INSERT INTO schema_version (scope, version, description) VALUES (%s, %s, %s);",
+                        (config_table, migration.version, migration.description),
+                    )
+            connection.commit()
+    except Exception as e:
+        print("Error migrating database:", e)
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        connection.close()
+    _mark_checked(key)
+    return latest
+
+
+def _postgres_version(cursor, scope: str) -> int:
+    import psycopg2.errors
+
+    cursor.execute("SAVEPOINT schema_version_check;")
+    try:
+        cursor.execute(
+            "SELECT COALESCE(MAX(version), 0) FROM schema_version WHERE scope = %s;",
+            (scope,),
+        )
+    except psycopg2.errors.UndefinedTable:
+        cursor.execute("ROLLBACK TO SAVEPOINT schema_version_check;")
+        return 0
+    return cursor.fetchone()[0]
@@ -0,0 +1,173 @@
+"""
+Package: config_manager
+Module: path_index
+This module contains the PathIndex class that maps dotted paths such as 'db.replicas.0.host' to nested values, and
+helpers to flatten nested configurations into dotted keys and back.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+SEPARATOR = "."
+
+_MISSING = object()
+
+
+def _walk(prefix: str, value: Any) -> Iterator[Tuple[str, Any]]:
+    if isinstance(value, Mapping):
+        children = value.items()
+    elif isinstance(value, list):
+        children = enumerate(value)
+    else:
+        return
+    for child_key, child in children:
+        path = f"{prefix}{SEPARATOR}{child_key}"
+        yield path, child
+        yield from _walk(path, child)
+
+
+class PathIndex:
+    """
+    Flattened index of every nested value below the top-level keys of a configuration.
+
+    Entries are grouped by top-level key, so replacing or deleting a key only re-indexes that key.
+    """
+
+    def __init__(self, config: Mapping[str, Any] = None):
+        """
+        Initialize the index.
+        :param config: Configuration data to index.
+        """
+        self._paths: Dict[str, Any] = {}
+        self._by_key: Dict[str, List[str]] = {}
+        if config is not None:
+            self.build(config)
+
+    def build(self, config: Mapping[str, Any]) -> None:
+        """
+        Rebuild the index from scratch.
+        :param config: Configuration data to index.
+        :return: None
+        """
+        self.clear()
+        for key, value in config.items():
+            self.add(key, value)
+
+    def add(self, key: str, value: Any) -> None:
+        """
+        Index, or re-index, the value of one top-level key.
+        :param key: Top-level key.
+        :param value: Its value.
+        :return: None
+        """
+        self.remove(key)
+        if not isinstance(value, (Mapping, list)):
+            return
+        paths = []
+        for path, child in _walk(str(key), value):
+            self._paths[path] = child
+            paths.append(path)
+        self._by_key[key] = paths
+
+    def remove(self, key: str) -> None:
+        """
+        Drop the entries of one top-level key.
+        :param key: Top-level key.
+        :return: None
+        """
+        for path in self._by_key.pop(key, ()):
+            del self._paths[path]
+
+    def clear(self) -> None:
+        self._paths.clear()
+        self._by_key.clear()
+
+    def get(self, path: str, default: Any = None) -> Any:
+        return self._paths.get(path, default)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+def flatten(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten nested mappings and lists into dotted keys, e.g. {'db': {'host': 'h'}} becomes {'db.host': 'h'}.
+    Empty containers are stored as the JSON strings '{}' and '[]'.
+    :param config: A mapping containing configuration data.
+    :return: Dict with only scalar values.
+    """
+    flat: Dict[str, Any] = {}
+    for key, value in config.items():
+        if isinstance(value, (Mapping, list)) and value:
+            for path, child in _walk(str(key), value):
+                if not isinstance(child, (Mapping, list)):
+                    flat[path] = child
+                elif not child:
+                    flat[path] = json.dumps(child)
+        elif isinstance(value, (Mapping, list)):
+            flat[key] = json.dumps(value)
+        else:
+            flat[key] = value
+    return flat
+
+
+def stale_keys(
+    stored: Iterable[str], config: Mapping[str, Any], flat: Mapping[str, Any]
+) -> List[str]:
+    """
+    Find the stored dotted keys at or below the keys of config that flatten(config) no longer writes, e.g.
+    'db.host' after 'db' was replaced by a scalar or lost its 'host' entry. A dotted key of config such as
+    'db.host' only replaces its own sub-tree and a scalar stored at 'db', 'db.port' is kept.
+    :param stored: Flat keys currently stored.
+    :param config: Nested configuration data being saved.
+    :param flat: flatten(config).
+    :return: Keys to delete.
+    """
+    keys = {str(key) for key in config}
+    prefixes = tuple(key + SEPARATOR for key in keys)
+    for key in list(keys):
+        parts = key.split(SEPARATOR)
+        keys.update(SEPARATOR.join(parts[:end]) for end in range(1, len(parts)))
+    return [
+        key
+        for key in stored
+        if key not in flat and (key in keys or key.startswith(prefixes))
+    ]
+
+
+def _restore_lists(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    for key, child in value.items():
+        value[key] = _restore_lists(child)
+    if value and all(key.isdigit() for key in value):
+        indexes = sorted(int(key) for key in value)
+        if indexes == list(range(len(indexes))):
+            return [value[str(index)] for index in indexes]
+    return value
+
+
+def unflatten(flat: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Rebuild nested mappings and lists from dotted keys, the inverse of flatten().
+    :param flat: A mapping with dotted keys.
+    :return: Dict containing nested configuration data.
+    """
+    config: Dict[str, Any] = {}
+    for key, value in flat.items():
+        if value in ("{}", "[]"):
+            value = {} if value == "{}" else []
+        parts = key.split(SEPARATOR)
+        node = config
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if not isinstance(child, dict):
+                raise ValueError(f"Conflicting dotted keys at '{key}'.")
+            node = child
+        if isinstance(node.get(parts[-1]), dict):
+            raise ValueError(f"Conflicting dotted keys at '{key}'.")
+        node[parts[-1]] = value
+    return {key: _restore_lists(value) for key, value in config.items()}
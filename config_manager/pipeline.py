@@ -0,0 +1,235 @@
+"""
+Package: config_manager
+Module: pipeline
+This module contains migrate(), a streaming pipeline that copies the configurations of many applications from one
+loader to another.
+
+A reader thread streams batches of applications from the source (one bulk query per batch with the SQL loaders) into
+a bounded queue. Worker threads write each batch to the target (one transaction per batch with save_many()). Completed
+applications are appended to an optional checkpoint file, so an interrupted migration resumes where it stopped.
+
+Example usage:
+
+```python
+from config_manager.pipeline import migrate
+
+stats = migrate(
+    SQLiteConfigLoader("config.db", app_name=""),
+    PostgresConfigLoader(postgres_uri, app_name=""),
+    checkpoint="migration.checkpoint",
+    progress=lambda stats: print(stats.as_dict()),
+)
+```
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .base_loader import BaseConfigLoader
+
+Batch = List[Tuple[str, Dict[str, Any]]]
+
+_DONE = object()
+
+
+class MigrationStats:
+    """
+    Progress of a migration, updated as batches complete.
+    """
+
+    def __init__(self, apps_total: int, apps_skipped: int):
+        self.apps_total = apps_total
+        self.apps_skipped = apps_skipped
+        self.apps_done = 0
+        self.keys = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, batch: Batch) -> None:
+        with self._lock:
+            self.apps_done += len(batch)
+            self.keys += sum(len(config) for _, config in batch)
+            self.batches += 1
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def apps_per_second(self) -> float:
+        return self.apps_done / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "apps_total": self.apps_total,
+                "apps_skipped": self.apps_skipped,
+                "apps_done": self.apps_done,
+                "keys": self.keys,
+                "batches": self.batches,
+                "elapsed_s": round(self.elapsed, 3),
+                "apps_per_second": round(self.apps_per_second, 1),
+            }
+
+    def __repr__(self) -> str:
+        return f"MigrationStats({self.as_dict()})"
+
+
+class Checkpoint:
+    """
+    Append-only file of migrated app_ids, one per line.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Initialize the checkpoint.
+        :param file_path: Path to the checkpoint file, created on the first completed batch.
+        """
+        self.file_path = file_path
+        self.done: Set[str] = set()
+        if os.path.exists(file_path):
+            with open(file_path, "r", encoding="utf-8") as file:
+                self.done = {line.strip() for line in file if line.strip()}
+        self._lock = threading.Lock()
+
+    def add(self, app_ids: Iterable[str]) -> None:
+        app_ids = list(app_ids)
+        with self._lock:
+            with open(self.file_path, "a", encoding="utf-8") as file:
+                file.writelines(f"{app_id}\n" for app_id in app_ids)
+                file.flush()
+                os.fsync(file.fileno())
+            self.done.update(app_ids)
+
+
+def _source_app_ids(source: BaseConfigLoader) -> Optional[List[str]]:
+    list_app_ids = getattr(source, "list_app_ids", None)
+    return list_app_ids() if list_app_ids is not None else None
+
+
+def _read_batches(
+    source: BaseConfigLoader, app_ids: Optional[List[str]], batch_size: int
+) -> Iterator[Batch]:
+    if app_ids is None:
+        # Single-application loaders (JSON, YAML, binary, env).
+        config = dict(source.load())
+        app_id = getattr(source, "app_id", None) or config.get("APP_ID") or "default"
+        yield [(str(app_id), config)]
+        return
+    iter_many = getattr(source, "iter_many", None)
+    for start in range(0, len(app_ids), batch_size):
+        chunk = app_ids[start : start + batch_size]
+        if iter_many is not None:
+            yield list(iter_many(chunk))
+        else:
+            yield [(app_id, dict(source.for_app(app_id).load())) for app_id in chunk]
+
+
+def _write_batch(target: BaseConfigLoader, batch: Batch) -> None:
+    save_many = getattr(target, "save_many", None)
+    if save_many is not None:
+        save_many(dict(batch))
+    elif hasattr(target, "for_app"):
+        for app_id, config in batch:
+            target.for_app(app_id).save(config)
+    elif len(batch) == 1:
+        target.save(batch[0][1])
+    else:
+        raise ValueError(
+            f"{type(target).__name__} holds a single application, cannot migrate {len(batch)}."
+        )
+
+
+def migrate(
+    source: BaseConfigLoader,
+    target: BaseConfigLoader,
+    app_ids: Optional[Iterable[str]] = None,
+    batch_size: int = 100,
+    workers: int = 4,
+    buffer: int = 8,
+    checkpoint: Optional[str] = None,
+    progress: Optional[Callable[[MigrationStats], None]] = None,
+) -> MigrationStats:
+    """
+    Copy configurations from one loader to another.
+    :param source: Loader to read from. SQL loaders provide every application, see list_app_ids().
+    :param target: Loader to write to. SQL loaders write one transaction per batch, loaders holding a single
+        application only accept a single-application source.
+    :param app_ids: Applications to copy, defaults to every application of the source.
+    :param batch_size: Number of applications read and written together.
+    :param workers: Number of threads writing to the target.
+    :param buffer: Maximum number of batches read ahead of the writers.
+    :param checkpoint: Path to a checkpoint file, applications listed in it are skipped.
+    :param progress: Callable receiving the stats after each completed batch.
+    :return: Stats of the migration.
+    """
+    app_ids = list(app_ids) if app_ids is not None else _source_app_ids(source)
+    resume = Checkpoint(checkpoint) if checkpoint else None
+    skipped = 0
+    if app_ids is not None and resume is not None:
+        pending = [app_id for app_id in app_ids if app_id not in resume.done]
+        skipped = len(app_ids) - len(pending)
+        app_ids = pending
+    stats = MigrationStats(len(app_ids) if app_ids is not None else 1, skipped)
+
+    batches: "queue.Queue[Any]" = queue.Queue(maxsize=buffer)
+    stop = threading.Event()
+    errors: List[BaseException] = []
+
+    def fail(error: BaseException) -> None:
+        errors.append(error)
+        stop.set()
+
+    def read() -> None:
+        try:
+            for batch in _read_batches(source, app_ids, batch_size):
+                while not stop.is_set():
+                    try:
+                        batches.put(batch, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+        except Exception as e:
+            fail(e)
+        finally:
+            for _ in range(workers):
+                batches.put(_DONE)
+
+    def write() -> None:
+        while True:
+            batch = batches.get()
+            if batch is _DONE:
+                return
+            if stop.is_set():
+                continue
+            try:
+                _write_batch(target, batch)
+                if resume is not None:
+                    resume.add(app_id for app_id, _ in batch)
+                stats.record(batch)
+                if progress is not None:
+                    progress(stats)
+            except Exception as e:
+                fail(e)
+
+    threads = [threading.Thread(target=read, name="config-migrate-reader")]
+    threads += [
+        threading.Thread(target=write, name=f"config-migrate-writer-{index}")
+        for index in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats.finished = time.perf_counter()
+    if errors:
+        print("Error migrating configurations:", errors[0])
+        raise errors[0]
+    return stats
@@ -4,12 +4,26 @@ Module: postgres_loader
 This module contains the PostgresConfigLoader class that is used to load and save configuration data from PostgreSQL database.
 """
 
+import copy
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 import psycopg2
+import psycopg2.extras
 
 from .base_loader import BaseConfigLoader
+from .concurrency import ConfigConflictError
+from .history import (
+    DEFAULT_RETENTION,
+    diff_rows,
+    postgres_text,
+    prune_cutoff,
+    prune_due,
+)
+from .merkle import BUCKETS, POSTGRES_DIGEST_SQL, bucket_hex, postgres_bucket_sql
+from .migrations import migrate_postgres
+from .path_index import flatten, stale_keys, unflatten
+from .replicas import ReplicaPool, has_replicas, record_write
 
 
 class PostgresConfigLoader(BaseConfigLoader):
@@ -17,6 +31,20 @@ class PostgresConfigLoader(BaseConfigLoader):
     Configuration loader for PostgreSQL database.
     """
 
+    __slots__ = (
+        "postgres_uri",
+        "config_table",
+        "applications_table",
+        "app_name",
+        "app_id",
+        "nested",
+        "history",
+        "retention",
+        "optimistic",
+        "replicas",
+        "_baseline",
+    )
+
     def __init__(
         self,
         postgres_uri: str,
@@ -24,6 +52,11 @@ class PostgresConfigLoader(BaseConfigLoader):
         app_id: Optional[str] = None,
         config_table: str = "config",
         applications_table: str = "applications",
+        nested: bool = False,
+        history: bool = False,
+        retention: Optional[int] = DEFAULT_RETENTION,
+        optimistic: bool = False,
+        replica_uris: Optional[List[str]] = None,
     ):
         """
         Initialize the PostgresConfigLoader.
@@ -32,19 +65,36 @@ class PostgresConfigLoader(BaseConfigLoader):
         :param app_id: Unique identifier for the application.
         :param config_table: Name of the table to store configuration data.
         :param applications_table: Name of the table to store application data.
+        :param nested: Store nested values as dotted keys and rebuild them on load.
+        :param history: Record every change in the <config_table>_history table and write only changed keys.
+        :param retention: Number of versions kept per application, None keeps all of them.
+        :param optimistic: Only write keys changed since the last load, each one conditional on its revision, and
+            raise ConfigConflictError if another writer changed it in between.
+        :param replica_uris: URIs of streaming replicas serving reads, see the replicas module. Writes go to
+            postgres_uri, and reads after a write wait for a replica that has replayed it or use the primary.
         """
         self.postgres_uri = postgres_uri
         self.config_table = config_table
         self.applications_table = applications_table
         self.app_name = app_name
         self.app_id = app_id or None  # set by the Database
+        self.nested = nested
+        self.history = history
+        self.retention = retention
+        self.optimistic = optimistic
+        # Shared by the loaders created with for_app(), so their reads see each other's writes.
+        self.replicas = (
+            ReplicaPool(postgres_uri, replica_uris) if replica_uris else None
+        )
+        # Stored value and revision of each key as of the last load, used by optimistic saves.
+        self._baseline: Optional[Dict[str, Tuple[Any, int]]] = None
 
     def initialize_application(self) -> None:
         """
         Initialize a new application in the database.
         :return: None
         """
-        connection = psycopg2.connect(self.postgres_uri)
+        connection = self._connect()
         cursor = connection.cursor()
         if self.app_id:
             return
@@ -60,7 +110,7 @@ class PostgresConfigLoader(BaseConfigLoader):
             ),
             # Return the app_id if the application already exists
             self.app_id = cursor.fetchone()[0]
-            connection.commit()
+            self._commit(connection, cursor)
         except Exception as e:
             print("Error initializing application:", e)
             connection.rollback()
@@ -69,15 +119,45 @@ class PostgresConfigLoader(BaseConfigLoader):
             cursor.close()
             connection.close()
 
+    def _connect(self):
+        # Databases created by earlier versions are upgraded on first use, as SQLiteConfigLoader does on creation.
+        self.initialize_database()
+        return psycopg2.connect(self.postgres_uri)
+
+    def _read_connection(self):
+        # Reads go to a replica when one can serve them, see ReplicaPool.
+        if self.replicas is None:
+            return self._connect()
+        self.initialize_database()
+        return self.replicas.connect()
+
+    def _commit(self, connection, cursor) -> None:
+        connection.commit()
+        # Loaders without replicas record it too when another loader of the process reads this primary from them.
+        if self.replicas is not None or has_replicas(self.postgres_uri):
+            cursor.execute("SELECT pg_current_wal_lsn();")
+            record_write(self.postgres_uri, cursor.fetchone()[0])
+
     def load(self) -> Dict[str, Any]:
         """
         Load configuration data from the database.
         :return: Dict containing configuration data.
         """
         config = {}
-        connection = psycopg2.connect(self.postgres_uri)
+        connection = self._read_connection()
         cursor = connection.cursor()
         try:
+            if self.optimistic:
+                cursor.execute(
+                    f"SELECT key, value, revision FROM {self.config_table} WHERE app_id = %s;",
+                    (self.app_id,),
+                )
+                rows = cursor.fetchall()
+                self._baseline = {
+                    key: (value, revision) for key, value, revision in rows
+                }
+                config = {key: value for key, value, _ in rows}
+                return unflatten(config) if self.nested else config
             cursor.execute(
                 f"""
                 SELECT key, value FROM {self.config_table}
@@ -94,7 +174,7 @@ class PostgresConfigLoader(BaseConfigLoader):
         finally:
             cursor.close()
             connection.close()
-        return config
+        return unflatten(config) if self.nested else config
 
     def save(self, config: Dict[str, Any]) -> None:
         """
@@ -102,12 +182,27 @@ class PostgresConfigLoader(BaseConfigLoader):
         :param config: A dict containing configuration data.
         :return: None
         """
-        connection = psycopg2.connect(self.postgres_uri)
+        nested_config = config
+        if self.nested:
+            config = flatten(config)
+        connection = self._connect()
         cursor = connection.cursor()
         try:
             # Ensure the application exists
             self.initialize_application()
 
+            if self.optimistic:
+                baseline = self._save_conditional(cursor, config)
+                self._commit(connection, cursor)
+                self._baseline = baseline
+                return
+            if self.history:
+                self._save_changes(cursor, config)
+                self._commit(connection, cursor)
+                return
+
+            if self.nested:
+                self._delete_stale(cursor, self.app_id, nested_config, config)
             for key, value in config.items():
                 cursor.execute(
                     f"""
@@ -115,11 +210,15 @@ class PostgresConfigLoader(BaseConfigLoader):
                     VALUES (%s, %s, %s)
                     ON CONFLICT (app_id, key) DO UPDATE
                     SET value = EXCLUDED.value,
+                        revision = {self.config_table}.revision + 1,
                         updated_at = CURRENT_TIMESTAMP;
                 """,
                     (self.app_id, key, value),
                 )
-            connection.commit()
+            self._commit(connection, cursor)
+        except ConfigConflictError:
+            connection.rollback()
+            raise
         except Exception as e:
             print("Error saving configuration:", e)
             connection.rollback()
@@ -128,37 +227,591 @@ class PostgresConfigLoader(BaseConfigLoader):
             cursor.close()
             connection.close()
 
+    def _delete_stale(
+        self,
+        cursor,
+        app_id: str,
+        config: Mapping[str, Any],
+        flat: Mapping[str, Any],
+    ) -> None:
+        # Dotted rows of replaced or shrunk values would be merged back into the next load.
+        cursor.execute(
+            f"SELECT key FROM {self.config_table} WHERE app_id = %s;", (app_id,)
+        )
+        stale = stale_keys((row[0] for row in cursor.fetchall()), config, flat)
+        if stale:
+            cursor.execute(
+                f"DELETE FROM {self.config_table} WHERE app_id = %s AND key = ANY(%s);",
+                (app_id, stale),
+            )
+
     def initialize_database(self) -> None:
         """
-        Create the necessary tables in the database.
+        Create or upgrade the tables in the database, applying pending schema migrations once per process.
+        :return: None
+        """
+        migrate_postgres(self.postgres_uri, self.config_table, self.applications_table)
+
+    def _lock_application(self, cursor) -> None:
+        # Serializes writers of the same application, other applications are not blocked.
+        cursor.execute(
+            f"SELECT app_id FROM {self.applications_table} WHERE app_id = %s FOR UPDATE;",
+            (self.app_id,),
+        )
+
+    def _save_changes(self, cursor, config: Dict[str, Any]) -> None:
+        self._lock_application(cursor)
+        cursor.execute(
+            f"SELECT key, value FROM {self.config_table} WHERE app_id = %s;",
+            (self.app_id,),
+        )
+        changed, deleted = diff_rows(dict(cursor.fetchall()), config, postgres_text)
+        if not changed and not deleted:
+            return
+        if changed:
+            psycopg2.extras.execute_values(
+                cursor,
+                f"""
+                INSERT INTO {self.config_table} (app_id, key, value)
+                VALUES %s
+                ON CONFLICT (app_id, key) DO UPDATE
+                SET value = EXCLUDED.value,
+                    revision = {self.config_table}.revision + 1,
+                    updated_at = CURRENT_TIMESTAMP;
+            """,
+                [(self.app_id, key, value) for key, value in changed.items()],
+            )
+        if deleted:
+            cursor.execute(
+                f"DELETE FROM {self.config_table} WHERE app_id = %s AND key = ANY(%s);",
+                (self.app_id, deleted),
+            )
+        self._record_version(cursor, changed, deleted)
+
+    def _save_conditional(
+        self, cursor, config: Dict[str, Any]
+    ) -> Dict[str, Tuple[Any, int]]:
+        baseline = dict(self._baseline or {})
+        current = {key: value for key, (value, _) in baseline.items()}
+        changed, deleted = diff_rows(current, config, postgres_text)
+        conflicts = []
+        for key, value in changed.items():
+            if key in baseline:
+                cursor.execute(
+                    f"""
+                    UPDATE {self.config_table}
+                    SET value = %s, revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE app_id = %s AND key = %s AND revision = %s
+                    RETURNING revision;
+                """,
+                    (value, self.app_id, key, baseline[key][1]),
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {self.config_table} (app_id, key, value)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (app_id, key) DO NOTHING
+                    RETURNING revision;
+                """,
+                    (self.app_id, key, value),
+                )
+            row = cursor.fetchone()
+            if row is None:
+                conflicts.append(key)
+            else:
+                baseline[key] = (postgres_text(value), row[0])
+        for key in deleted:
+            cursor.execute(
+                f"DELETE FROM {self.config_table} WHERE app_id = %s AND key = %s AND revision = %s;",
+                (self.app_id, key, baseline[key][1]),
+            )
+            if cursor.rowcount == 0:
+                conflicts.append(key)
+            else:
+                del baseline[key]
+        if conflicts:
+            raise ConfigConflictError(self.app_id, conflicts)
+        if self.history and (changed or deleted):
+            self._record_version(cursor, changed, deleted)
+        return baseline
+
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        """
+        Atomically set a key if its stored value is still the expected one.
+        :param key: Key to set.
+        :param expected: Expected current value, None if the key is expected to be missing or NULL.
+        :param value: New value.
+        :return: True if the value was set, False if the stored value differed.
+        """
+        connection = self._connect()
+        cursor = connection.cursor()
+        try:
+            self.initialize_application()
+            if expected is None:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {self.config_table} (app_id, key, value)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (app_id, key) DO UPDATE
+                    SET value = EXCLUDED.value,
+                        revision = {self.config_table}.revision + 1,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE {self.config_table}.value IS NULL
+                    RETURNING revision;
+                """,
+                    (self.app_id, key, value),
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    UPDATE {self.config_table}
+                    SET value = %s, revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE app_id = %s AND key = %s AND value = %s
+                    RETURNING revision;
+                """,
+                    (value, self.app_id, key, postgres_text(expected)),
+                )
+            row = cursor.fetchone()
+            if row is None:
+                connection.rollback()
+                return False
+            if self.history:
+                self._record_version(cursor, {key: value}, [])
+            self._commit(connection, cursor)
+        except Exception as e:
+            print("Error saving configuration:", e)
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+        if self._baseline is not None:
+            self._baseline[key] = (postgres_text(value), row[0])
+        return True
+
+    def _record_version(
+        self, cursor, changed: Dict[str, Any], deleted: List[str]
+    ) -> None:
+        self._lock_application(cursor)
+        version = self.current_version(cursor) + 1
+        if version == 1:
+            # The first version records every key, later versions only the changes.
+            cursor.execute(
+                f"SELECT key, value FROM {self.config_table} WHERE app_id = %s;",
+                (self.app_id,),
+            )
+            changed = dict(cursor.fetchall())
+        cursor.execute(
+            f"INSERT INTO {self.config_table}_versions (app_id, version) VALUES (%s, %s);",
+            (self.app_id, version),
+        )
+        psycopg2.extras.execute_values(
+            cursor,
+            f"""
+            INSERT INTO {self.config_table}_history (app_id, key, version, value, deleted)
+            VALUES %s;
+        """,
+            [
+                (self.app_id, key, version, value, False)
+                for key, value in changed.items()
+            ]
+            + [(self.app_id, key, version, None, True) for key in deleted],
+        )
+        if self.retention and prune_due(version, self.retention):
+            self._prune(cursor, prune_cutoff(version, self.retention))
+
+    def _prune(self, cursor, cutoff: int) -> None:
+        # Rows older than the cutoff are only needed when they still hold the value of their key at the cutoff.
+        cursor.execute(
+            f"""
+            DELETE FROM {self.config_table}_history AS entry
+            WHERE app_id = %s AND version < %s AND (
+                deleted OR EXISTS (
+                    SELECT 1 FROM {self.config_table}_history AS newer
+                    WHERE newer.app_id = entry.app_id
+                        AND newer.key = entry.key
+                        AND newer.version > entry.version
+                        AND newer.version <= %s
+                )
+            );
+        """,
+            (self.app_id, cutoff, cutoff),
+        )
+        cursor.execute(
+            f"DELETE FROM {self.config_table}_versions WHERE app_id = %s AND version < %s;",
+            (self.app_id, cutoff),
+        )
+
+    def current_version(self, cursor=None) -> int:
+        """
+        Get the latest version of the application's configuration.
+        :param cursor: Cursor of an open transaction, a new connection is used if omitted.
+        :return: The version, 0 if no version was recorded.
+        """
+        return self._query(
+            cursor,
+            f"""
+            SELECT COALESCE(MAX(version), 0) FROM {self.config_table}_versions
+            WHERE app_id = %s;
+        """,
+            (self.app_id,),
+        )[0][0]
+
+    def versions(self) -> List[Tuple[int, Any]]:
+        """
+        List the versions still available for the application.
+        :return: List of (version, created_at) pairs, oldest first.
+        """
+        return self._query(
+            None,
+            f"""
+            SELECT version, created_at FROM {self.config_table}_versions
+            WHERE app_id = %s
+            ORDER BY version;
+        """,
+            (self.app_id,),
+        )
+
+    def load_version(self, version: int) -> Dict[str, Any]:
+        """
+        Load the configuration data as it was at a given version.
+        :param version: Version to load.
+        :return: Dict containing configuration data.
+        """
+        if not self.history:
+            raise ValueError("History is not enabled for this PostgresConfigLoader.")
+        exists = self._query(
+            None,
+            f"""
+            SELECT 1 FROM {self.config_table}_versions
+            WHERE app_id = %s AND version = %s;
+        """,
+            (self.app_id, version),
+        )
+        if not exists:
+            raise ValueError(f"Version {version} of {self.app_id} is not available.")
+        rows = self._query(
+            None,
+            f"""
+            SELECT DISTINCT ON (key) key, value, deleted
+            FROM {self.config_table}_history
+            WHERE app_id = %s AND version <= %s
+            ORDER BY key, version DESC;
+        """,
+            (self.app_id, version),
+        )
+        config = {key: value for key, value, deleted in rows if not deleted}
+        return unflatten(config) if self.nested else config
+
+    def load_keys(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Load some top-level keys of the configuration in one query, e.g. the working set recorded by an AccessLog.
+        With nested=True, the dotted keys below them are loaded too.
+        :param keys: Top-level keys.
+        :return: Dict containing the keys found.
+        """
+        # The dotted keys of a nested value share its top-level key.
+        column = "split_part(key, '.', 1)" if self.nested else "key"
+        connection = self._read_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"""
+                SELECT key, value FROM {self.config_table}
+                WHERE app_id = %s AND {column} = ANY(%s);
+            """,
+                (self.app_id, list(dict.fromkeys(keys))),
+            )
+            config = dict(cursor.fetchall())
+        except Exception as e:
+            print("Error loading configuration keys:", e)
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+        return unflatten(config) if self.nested else config
+
+    def _query(self, cursor, sql: str, params: Tuple) -> List[Tuple]:
+        if cursor is not None:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        connection = self._read_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error reading configuration history:", e)
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def for_app(self, app_id: str, app_name: str = "") -> "PostgresConfigLoader":
+        """
+        Create a loader for another application sharing this loader's connection settings.
+        :param app_id: Unique identifier for the application.
+        :param app_name: Name of the application.
+        :return: PostgresConfigLoader bound to app_id.
+        """
+        loader = copy.copy(self)
+        loader.app_id = app_id
+        loader.app_name = app_name
+        loader._baseline = None
+        return loader
+
+    def iter_many(
+        self, app_ids: Iterable[str], itersize: int = 5000
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Load the configuration of many applications in a single query, streamed through a server-side cursor.
+        Applications without any stored keys are yielded last, with an empty dict.
+        :param app_ids: Unique identifiers of the applications.
+        :param itersize: Number of rows fetched per round trip.
+        :return: Iterator of (app_id, config) pairs.
+        """
+        for app_id, config, _ in self._iter_rows(app_ids, itersize, False):
+            yield app_id, config
+
+    def iter_loaders(
+        self, app_ids: Iterable[str], itersize: int = 5000
+    ) -> Iterator[Tuple["PostgresConfigLoader", Dict[str, Any]]]:
+        """
+        Like iter_many(), with a loader bound to each application. With optimistic=True, each loader is ready to save
+        as after its own load(): the revisions come from the same query.
+        :param app_ids: Unique identifiers of the applications.
+        :param itersize: Number of rows fetched per round trip.
+        :return: Iterator of (loader, config) pairs.
+        """
+        for app_id, config, baseline in self._iter_rows(
+            app_ids, itersize, self.optimistic
+        ):
+            loader = self.for_app(app_id)
+            loader._baseline = baseline
+            yield loader, config
+
+    def _iter_rows(
+        self, app_ids: Iterable[str], itersize: int, revisions: bool
+    ) -> Iterator[Tuple[str, Dict[str, Any], Optional[Dict[str, Tuple[Any, int]]]]]:
+        app_ids = [str(app_id) for app_id in dict.fromkeys(app_ids)]
+        pending = set(app_ids)
+        connection = self._read_connection()
+        cursor = connection.cursor(name=f"config_bulk_{uuid.uuid4().hex}")
+        cursor.itersize = itersize
+        columns = "app_id, key, value, revision" if revisions else "app_id, key, value"
+
+        def build(rows):
+            config = {row[1]: row[2] for row in rows}
+            baseline = {row[1]: (row[2], row[3]) for row in rows} if revisions else None
+            return unflatten(config) if self.nested else config, baseline
+
+        try:
+            cursor.execute(
+                f"""
+                SELECT {columns} FROM {self.config_table}
+                WHERE app_id = ANY(%s::uuid[])
+                ORDER BY app_id;
+            """,
+                (app_ids,),
+            )
+            current_id, rows = None, []
+            for row in cursor:
+                app_id = str(row[0])
+                if app_id != current_id:
+                    if current_id is not None:
+                        pending.discard(current_id)
+                        yield (current_id, *build(rows))
+                    current_id, rows = app_id, []
+                rows.append(row)
+            if current_id is not None:
+                pending.discard(current_id)
+                yield (current_id, *build(rows))
+            for app_id in app_ids:
+                if app_id in pending:
+                    yield app_id, {}, {} if revisions else None
+        except Exception as e:
+            print("Error loading configurations:", e)
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def load_many(self, app_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the configuration of many applications.
+        :param app_ids: Unique identifiers of the applications.
+        :return: Dict mapping app_id to its configuration data.
+        """
+        return dict(self.iter_many(app_ids))
+
+    def bucket_hashes(self, buckets: int = BUCKETS) -> Dict[int, str]:
+        """
+        Compute the hash of each bucket of stored rows in the database, see the merkle module.
+        :param buckets: Number of buckets, a power of two.
+        :return: Dict mapping each non-empty bucket to its hash.
+        """
+        rows = self._query(
+            None,
+            f"""
+            SELECT {postgres_bucket_sql(buckets)} AS bucket, sum({POSTGRES_DIGEST_SQL})
+            FROM {self.config_table} WHERE app_id = %s GROUP BY bucket;
+        """,
+            (self.app_id,),
+        )
+        return {bucket: bucket_hex(total) for bucket, total in rows}
+
+    def rows_in_buckets(
+        self, bucket_ids: Iterable[int], buckets: int = BUCKETS
+    ) -> Dict[str, Any]:
+        """
+        Read the stored rows of some buckets.
+        :param bucket_ids: Buckets to read.
+        :param buckets: Number of buckets, a power of two.
+        :return: Dict of flat keys and stored values.
+        """
+        rows = self._query(
+            None,
+            f"""
+            SELECT key, value FROM {self.config_table}
+            WHERE app_id = %s AND {postgres_bucket_sql(buckets)} = ANY(%s);
+        """,
+            (self.app_id, list(bucket_ids)),
+        )
+        return dict(rows)
+
+    def apply_changes(self, upserts: Dict[str, Any], deletes: List[str]) -> None:
+        """
+        Write single changed rows, e.g. from merkle.sync(). Keys are stored as given, without flattening.
+        :param upserts: Flat keys to insert or update, with their values.
+        :param deletes: Flat keys to delete.
         :return: None
         """
-        sql = f"""
-CREATE TABLE IF NOT EXISTS {self.applications_table} (
-    app_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    app_name TEXT UNIQUE NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
-CREATE TABLE IF NOT EXISTS {self.config_table} (
-    id SERIAL PRIMARY KEY,
-    app_id UUID REFERENCES {self.applications_table}(app_id) ON DELETE CASCADE,
-    key TEXT NOT NULL,
-    value TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE (app_id, key)
-);
-                """
-        connection = psycopg2.connect(self.postgres_uri)
+        connection = self._connect()
         cursor = connection.cursor()
         try:
-            cursor.execute(sql)
-            connection.commit()
+            if self.history:
+                self._lock_application(cursor)
+            if upserts:
+                psycopg2.extras.execute_values(
+                    cursor,
+                    f"""
+                    INSERT INTO {self.config_table} (app_id, key, value)
+                    VALUES %s
+                    ON CONFLICT (app_id, key) DO UPDATE
+                    SET value = EXCLUDED.value,
+                        revision = {self.config_table}.revision + 1,
+                        updated_at = CURRENT_TIMESTAMP;
+                """,
+                    [(self.app_id, key, value) for key, value in upserts.items()],
+                )
+            if deletes:
+                cursor.execute(
+                    f"DELETE FROM {self.config_table} WHERE app_id = %s AND key = ANY(%s);",
+                    (self.app_id, list(deletes)),
+                )
+            if self.history and (upserts or deletes):
+                self._record_version(cursor, upserts, deletes)
+            self._commit(connection, cursor)
         except Exception as e:
-            print("Error creating schema:", e)
+            print("Error saving configuration:", e)
             connection.rollback()
             raise
         finally:
             cursor.close()
             connection.close()
+        self._baseline = None
+
+    def list_app_ids(self) -> List[str]:
+        """
+        List the applications that have an application row or stored keys.
+        :return: Sorted list of app_ids.
+        """
+        connection = self._read_connection()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"""
+                SELECT app_id FROM {self.applications_table}
+                UNION SELECT app_id FROM {self.config_table}
+                ORDER BY 1;
+            """
+            )
+            return [str(row[0]) for row in cursor.fetchall()]
+        except Exception as e:
+            print("Error listing applications:", e)
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def save_many(self, configs: Mapping[str, Dict[str, Any]]) -> None:
+        """
+        Save the configuration of many applications in one transaction.
+        Loaders keeping history or saving optimistically save each application on its own instead. With
+        optimistic=True, this loader's own application is checked against the revisions of its last load, and the
+        other applications against the revisions read just before the write.
+        :param configs: Dict mapping app_id to its configuration data.
+        :return: None
+        """
+        if self.history or self.optimistic:
+            self._save_each(configs)
+            return
+        connection = self._connect()
+        cursor = connection.cursor()
+        try:
+            psycopg2.extras.execute_values(
+                cursor,
+                f"""
+                INSERT INTO {self.applications_table} (app_id, app_name)
+                VALUES %s
+                ON CONFLICT DO NOTHING;
+            """,
+                [
+                    (app_id, str(config.get("APP_NAME") or app_id))
+                    for app_id, config in configs.items()
+                ],
+            )
+            rows = []
+            for app_id, config in configs.items():
+                flat = flatten(config) if self.nested else config
+                if self.nested:
+                    self._delete_stale(cursor, app_id, config, flat)
+                rows.extend((app_id, key, value) for key, value in flat.items())
+            psycopg2.extras.execute_values(
+                cursor,
+                f"""
+                INSERT INTO {self.config_table} (app_id, key, value)
+                VALUES %s
+                ON CONFLICT (app_id, key) DO UPDATE
+                SET value = EXCLUDED.value,
+                    revision = {self.config_table}.revision + 1,
+                    updated_at = CURRENT_TIMESTAMP;
+            """,
+                rows,
+            )
+            self._commit(connection, cursor)
+        except Exception as e:
+            print("Error saving configurations:", e)
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _save_each(self, configs: Mapping[str, Dict[str, Any]]) -> None:
+        baselines: Dict[str, Optional[Dict[str, Tuple[Any, int]]]] = {}
+        if self.optimistic:
+            if self._baseline is not None and self.app_id in configs:
+                baselines[self.app_id] = self._baseline
+            unknown = [app_id for app_id in configs if app_id not in baselines]
+            # A loader from for_app() has no baseline, every stored key would count as a conflict.
+            rows = self._iter_rows(unknown, 5000, True) if unknown else ()
+            for app_id, _, baseline in rows:
+                baselines[app_id] = baseline
+        for app_id, config in configs.items():
+            loader = self.for_app(app_id)
+            loader._baseline = baselines.get(app_id)
+            loader.save(config)
+            if app_id == self.app_id:
+                self._baseline = loader._baseline
@@ -0,0 +1,217 @@
+"""
+Package: config_manager
+Module: profiling
+This module contains the profile() context manager that records loader calls and Configuration mutations to find
+code paths where one logical change causes many backend writes.
+
+Example usage:
+
+```python
+import config_manager
+
+with config_manager.profile() as p:
+    for key, value in changes.items():
+        config[key] = value  # one full save per key
+print(p.summary()["write_amplification"])
+p.to_json("profile.json")
+```
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .instrumentation import Observer, OperationEvent, active_operations, observe
+
+MUTATIONS = ("set", "delete", "update", "clear", "rollback", "compare_and_set")
+READS = ("load", "load_keys", "load_many")
+WRITES = ("save", "save_many", "apply_changes", "compare_and_set")
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _caller_stack(depth: int) -> List[str]:
+    """
+    Get the innermost frames outside of config_manager.
+    :param depth: Maximum number of frames.
+    :return: List of 'file:line in function' strings, innermost first.
+    """
+    stack = []
+    frame = sys._getframe(1)
+    while frame is not None and len(stack) < depth:
+        filename = frame.f_code.co_filename
+        if not os.path.abspath(filename).startswith(_PACKAGE_DIR):
+            stack.append(f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return stack
+
+
+class Profile(Observer):
+    """
+    Records loader calls and Configuration mutations while registered, see profile().
+    """
+
+    def __init__(self, stack_depth: int = 5, top: int = 10):
+        """
+        Initialize the profile.
+        :param stack_depth: Number of caller frames recorded per call.
+        :param top: Number of keys and call sites listed in the summary.
+        """
+        self.stack_depth = stack_depth
+        self.top = top
+        self.loader_calls: List[Dict[str, Any]] = []
+        self.mutations: List[Dict[str, Any]] = []
+        self.started_ns: Optional[int] = None
+        self.stopped_ns: Optional[int] = None
+        self._lock = threading.Lock()
+        self._pending = threading.local()
+
+    def on_event(self, event: OperationEvent) -> None:
+        if event.component == "loader":
+            self._record_loader_call(event)
+        elif event.operation in MUTATIONS:
+            self._record_mutation(event)
+
+    def _record_loader_call(self, event: OperationEvent) -> None:
+        mutation = bool(active_operations().intersection(MUTATIONS))
+        call = {
+            "name": event.name,
+            "operation": event.operation,
+            "duration_ms": event.duration_ns / 1e6,
+            "key_count": event.key_count,
+            "bytes": event.bytes,
+            "error": repr(event.error) if event.error is not None else None,
+            "in_mutation": mutation,
+            "stack": _caller_stack(self.stack_depth),
+        }
+        with self._lock:
+            self.loader_calls.append(call)
+        if mutation and event.operation in WRITES:
+            # Attributed to the mutation once it completes, its event is emitted after this one.
+            self._pending.__dict__.setdefault("writes", []).append(call)
+
+    def _record_mutation(self, event: OperationEvent) -> None:
+        writes = self._pending.__dict__.pop("writes", [])
+        stack = _caller_stack(self.stack_depth)
+        mutation = {
+            "name": event.name,
+            "operation": event.operation,
+            "keys": list(event.keys or ()),
+            "duration_ms": event.duration_ns / 1e6,
+            "writes": len(writes),
+            "keys_written": sum(write["key_count"] or 0 for write in writes),
+            "site": stack[0] if stack else None,
+        }
+        with self._lock:
+            self.mutations.append(mutation)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the recorded calls.
+        :return: Dict with totals per loader operation, write amplification, the hottest keys and the call sites
+            causing the most writes.
+        """
+        with self._lock:
+            calls = list(self.loader_calls)
+            mutations = list(self.mutations)
+
+        operations: Dict[str, Dict[str, Any]] = {}
+        sites: Dict[str, Dict[str, Any]] = {}
+        for call in calls:
+            totals = operations.setdefault(
+                call["name"], {"count": 0, "duration_ms": 0.0, "keys": 0, "errors": 0}
+            )
+            totals["count"] += 1
+            totals["duration_ms"] += call["duration_ms"]
+            totals["keys"] += call["key_count"] or 0
+            totals["errors"] += call["error"] is not None
+            site = call["stack"][0] if call["stack"] else "<unknown>"
+            site_totals = sites.setdefault(
+                site, {"site": site, "calls": 0, "writes": 0, "duration_ms": 0.0}
+            )
+            site_totals["calls"] += 1
+            site_totals["writes"] += call["operation"] in WRITES
+            site_totals["duration_ms"] += call["duration_ms"]
+
+        keys: Dict[str, Dict[str, Any]] = {}
+        keys_changed = 0
+        for mutation in mutations:
+            keys_changed += len(mutation["keys"])
+            for key in mutation["keys"]:
+                totals = keys.setdefault(
+                    key, {"key": key, "mutations": 0, "writes": 0, "keys_written": 0}
+                )
+                totals["mutations"] += 1
+                totals["writes"] += mutation["writes"]
+                totals["keys_written"] += mutation["keys_written"]
+
+        writes = [call for call in calls if call["operation"] in WRITES]
+        attributed = [call for call in writes if call["in_mutation"]]
+        keys_written = sum(call["key_count"] or 0 for call in attributed)
+        return {
+            "duration_ms": self.duration_ms,
+            "loader_calls": operations,
+            "mutations": len(mutations),
+            "backend_writes": len(writes),
+            "backend_reads": sum(call["operation"] in READS for call in calls),
+            "unattributed_writes": len(writes) - len(attributed),
+            "write_amplification": (
+                len(attributed) / len(mutations) if mutations else None
+            ),
+            "keys_written_per_key_changed": (
+                keys_written / keys_changed if keys_changed else None
+            ),
+            "hottest_keys": sorted(
+                keys.values(), key=lambda item: (-item["writes"], -item["mutations"])
+            )[: self.top],
+            "call_sites": sorted(
+                sites.values(), key=lambda item: (-item["writes"], -item["duration_ms"])
+            )[: self.top],
+        }
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.started_ns is None:
+            return None
+        stopped_ns = self.stopped_ns or time.perf_counter_ns()
+        return (stopped_ns - self.started_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "summary": self.summary(),
+            "loader_calls": list(self.loader_calls),
+            "mutations": list(self.mutations),
+        }
+
+    def to_json(self, file_path: Optional[str] = None) -> Optional[str]:
+        """
+        Export the summary and every recorded call as JSON.
+        :param file_path: File to write, the JSON string is returned if omitted.
+        :return: The JSON string if no file path is given, otherwise None.
+        """
+        data = json.dumps(self.to_dict(), indent=4, default=str)
+        if file_path is None:
+            return data
+        with open(file_path, "w") as file:
+            file.write(data)
+
+
+@contextmanager
+def profile(stack_depth: int = 5, top: int = 10) -> Iterator[Profile]:
+    """
+    Record every loader call and Configuration mutation made inside the with block.
+    :param stack_depth: Number of caller frames recorded per call.
+    :param top: Number of keys and call sites listed in the summary.
+    :return: The Profile, usable after the block exits.
+    """
+    recorder = Profile(stack_depth=stack_depth, top=top)
+    recorder.started_ns = time.perf_counter_ns()
+    try:
+        with observe(recorder):
+            yield recorder
+    finally:
+        recorder.stopped_ns = time.perf_counter_ns()
@@ -0,0 +1,222 @@
+"""
+Package: config_manager
+Module: registry
+This module contains the ConfigurationRegistry class that holds the configurations of many applications in one
+process, bounded by a least-recently-used tenant count and/or memory budget.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .base_loader import BaseConfigLoader
+from .compact import CompactMapping
+from .configuration import Configuration
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory held by a configuration value, including nested containers.
+    :param value: Value to measure.
+    :return: Approximate size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, CompactMapping):
+        # Keys live in a shared KeyTable and are not owned by the mapping.
+        for child in value.values():
+            size += estimate_size(child)
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            size += estimate_size(key) + estimate_size(child)
+    elif isinstance(value, (list, tuple, set)):
+        for child in value:
+            size += estimate_size(child)
+    return size
+
+
+class ConfigurationRegistry:
+    """
+    Registry of live Configuration objects keyed by app_id, with LRU eviction and on-demand reloads.
+
+    Tenants share one template loader: each tenant's loader is derived from it with `for_app()`, so connection
+    settings are held once.
+    """
+
+    def __init__(
+        self,
+        config_type: Optional[str] = None,
+        loader_factory: Optional[Callable[[str], BaseConfigLoader]] = None,
+        max_tenants: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        compact: bool = False,
+        **kwargs,
+    ):
+        """
+        Initialize the registry.
+        :param config_type: Type of configuration ('postgres', 'sqlite', 'http'), used with the loader arguments in kwargs.
+        :param loader_factory: Alternative to config_type, a callable creating the loader for an app_id.
+        :param max_tenants: Maximum number of resident configurations.
+        :param max_bytes: Approximate memory budget for resident configurations.
+        :param compact: Store configurations as CompactMapping, sharing key strings between tenants.
+        :param kwargs: Additional arguments required by the loader.
+        """
+        if (config_type is None) == (loader_factory is None):
+            raise ValueError(
+                "Exactly one of config_type or loader_factory is required."
+            )
+        self.template = None
+        if config_type is not None:
+            self.template = Configuration._get_loader(
+                config_type, app_name="", app_id="", **kwargs
+            )
+            if not hasattr(self.template, "for_app"):
+                raise ValueError(f"Unsupported configuration type: {config_type}")
+        self.loader_factory = loader_factory
+        self.max_tenants = max_tenants
+        self.max_bytes = max_bytes
+        self.compact = compact
+        self._tenants: "OrderedDict[str, Configuration]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._names: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._stats = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0}
+
+    def _loader_for(self, app_id: str) -> BaseConfigLoader:
+        if self.template is not None:
+            return self.template.for_app(app_id)
+        return self.loader_factory(app_id)
+
+    def get(self, app_id: str) -> Configuration:
+        """
+        Get the configuration of an application, loading it if it is not resident.
+        :param app_id: Unique identifier for the application.
+        :return: Configuration of the application.
+        """
+        with self._lock:
+            config = self._tenants.get(app_id)
+            if config is not None:
+                self._tenants.move_to_end(app_id)
+                self._stats["hits"] += 1
+                return config
+            self._stats["misses"] += 1
+        config = Configuration(
+            self._loader_for(app_id), app_id=app_id, compact=self.compact
+        )
+        return self._admit(config)
+
+    def get_by_name(self, app_name: str) -> Configuration:
+        """
+        Get the configuration of a resident application by its APP_NAME.
+        :param app_name: Name of the application.
+        :return: Configuration of the application.
+        """
+        with self._lock:
+            app_id = self._names.get(app_name)
+        if app_id is None:
+            raise KeyError(app_name)
+        return self.get(app_id)
+
+    def preload(self, app_ids: Iterable[str]) -> None:
+        """
+        Load many applications with one bulk query, skipping resident ones.
+        :param app_ids: Unique identifiers of the applications.
+        :return: None
+        """
+        with self._lock:
+            missing = [app_id for app_id in app_ids if app_id not in self._tenants]
+        if not hasattr(self.template, "iter_loaders"):
+            for app_id in missing:
+                self.get(app_id)
+            return
+        # Optimistic loaders get the revisions of the same query, see iter_loaders().
+        for loader, data in self.template.iter_loaders(missing):
+            self._admit(
+                Configuration(
+                    loader,
+                    app_id=loader.app_id,
+                    config=data,
+                    compact=self.compact,
+                )
+            )
+
+    def _admit(self, config: Configuration) -> Configuration:
+        app_id = config.app_id
+        size = estimate_size(config.config)
+        with self._lock:
+            existing = self._tenants.get(app_id)
+            if existing is not None:
+                # Loaded concurrently by another thread, keep the first one.
+                return existing
+            self._stats["loads"] += 1
+            self._tenants[app_id] = config
+            self._sizes[app_id] = size
+            self._bytes += size
+            app_name = config.get("APP_NAME")
+            if app_name:
+                self._names[app_name] = app_id
+            self._evict(keep=app_id)
+        return config
+
+    def _evict(self, keep: str) -> None:
+        while len(self._tenants) > 1 and (
+            (self.max_tenants is not None and len(self._tenants) > self.max_tenants)
+            or (self.max_bytes is not None and self.resident_bytes > self.max_bytes)
+        ):
+            app_id = next(iter(self._tenants))
+            if app_id == keep:
+                break
+            self._remove(app_id)
+            self._stats["evictions"] += 1
+
+    def _remove(self, app_id: str) -> None:
+        config = self._tenants.pop(app_id)
+        self._bytes -= self._sizes.pop(app_id, 0)
+        app_name = config.get("APP_NAME")
+        if app_name and self._names.get(app_name) == app_id:
+            del self._names[app_name]
+
+    def invalidate(self, app_id: str) -> None:
+        """
+        Drop an application so the next access reloads it.
+        :param app_id: Unique identifier for the application.
+        :return: None
+        """
+        with self._lock:
+            if app_id in self._tenants:
+                self._remove(app_id)
+
+    def refresh_sizes(self) -> None:
+        """
+        Re-measure resident configurations after they were mutated, evicting if over budget.
+        :return: None
+        """
+        with self._lock:
+            for app_id, config in self._tenants.items():
+                self._sizes[app_id] = estimate_size(config.config)
+            self._bytes = sum(self._sizes.values())
+            if self._tenants:
+                self._evict(keep=next(reversed(self._tenants)))
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._bytes
+
+    def metrics(self) -> Dict[str, int]:
+        """
+        Get registry metrics.
+        :return: Dict with resident_tenants, resident_bytes, hits, misses, loads and evictions.
+        """
+        with self._lock:
+            return {
+                "resident_tenants": len(self._tenants),
+                "resident_bytes": self.resident_bytes,
+                **self._stats,
+            }
+
+    def __contains__(self, app_id: str) -> bool:
+        return app_id in self._tenants
+
+    def __len__(self) -> int:
+        return len(self._tenants)
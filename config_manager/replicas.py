@@ -0,0 +1,172 @@
+"""
+Package: config_manager
+Module: replicas
+This module contains the ReplicaPool class that spreads the reads of PostgresConfigLoader over PostgreSQL streaming
+replicas, while writes go to the primary.
+
+Replicas are used in turn. A replica that refuses connections is skipped for retry_after seconds. After a write,
+the WAL position (LSN) of the primary is recorded per primary URI for the whole process, and a replica only serves
+reads of this process once it has replayed up to that position. Otherwise the read goes to the primary, so the
+writing process always reads its own writes, whichever loader made them.
+
+Example usage:
+
+```python
+loader = PostgresConfigLoader(
+    "postgresql://primary/config",
+    app_name="app",
+    replica_uris=["postgresql://replica-1/config", "postgresql://replica-2/config"],
+)
+```
+"""
+
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+import psycopg2
+
+# WAL position of the last write of this process, per primary URI with replicas.
+_written: Dict[str, Optional[int]] = {}
+_written_lock = threading.Lock()
+
+
+def parse_lsn(lsn: str) -> int:
+    """
+    Convert a PostgreSQL LSN such as '0/16B3748' to an integer.
+    :param lsn: LSN text.
+    :return: Position in the WAL.
+    """
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+def has_replicas(primary_uri: str) -> bool:
+    """
+    Check whether reads of a primary go to replicas in this process, so its writes must be recorded.
+    :param primary_uri: URI of the primary.
+    :return: True if a ReplicaPool was created for it.
+    """
+    return primary_uri in _written
+
+
+def record_write(primary_uri: str, lsn: Optional[str]) -> None:
+    """
+    Record the WAL position of a primary after a write.
+    :param primary_uri: URI of the primary.
+    :param lsn: Value of pg_current_wal_lsn().
+    :return: None
+    """
+    if lsn is None:
+        return
+    position = parse_lsn(lsn)
+    with _written_lock:
+        written = _written.get(primary_uri)
+        if written is None or position > written:
+            _written[primary_uri] = position
+
+
+def reset_positions() -> None:
+    """
+    Forget the recorded write positions, e.g. between tests.
+    :return: None
+    """
+    with _written_lock:
+        _written.clear()
+
+
+class ReplicaPool:
+    """
+    Healthy replicas, used round-robin. The WAL position of the last write is shared by every pool of a primary.
+    """
+
+    __slots__ = (
+        "primary_uri",
+        "replica_uris",
+        "retry_after",
+        "_turn",
+        "_down",
+        "_lock",
+    )
+
+    def __init__(
+        self, primary_uri: str, replica_uris: List[str], retry_after: float = 30.0
+    ):
+        """
+        Initialize the pool.
+        :param primary_uri: URI of the primary, used for writes and when no replica can serve a read.
+        :param replica_uris: URIs of the replicas.
+        :param retry_after: Seconds a replica is skipped after a failed connection.
+        """
+        self.primary_uri = primary_uri
+        self.replica_uris = list(replica_uris)
+        self.retry_after = retry_after
+        with _written_lock:
+            _written.setdefault(primary_uri, None)
+        self._turn = itertools.count()
+        self._down: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def healthy(self) -> List[str]:
+        """
+        Get the replicas not skipped after a failure, starting with the next one in turn.
+        :return: Replica URIs.
+        """
+        now = time.monotonic()
+        with self._lock:
+            uris = [uri for uri in self.replica_uris if self._down.get(uri, 0) <= now]
+            start = next(self._turn)
+        if not uris:
+            return []
+        start %= len(uris)
+        return uris[start:] + uris[:start]
+
+    def mark_down(self, uri: str) -> None:
+        with self._lock:
+            self._down[uri] = time.monotonic() + self.retry_after
+
+    @property
+    def written_lsn(self) -> Optional[int]:
+        return _written.get(self.primary_uri)
+
+    def wrote(self, lsn: Optional[str]) -> None:
+        """
+        Record the WAL position of the primary after a write, see record_write().
+        :param lsn: Value of pg_current_wal_lsn().
+        :return: None
+        """
+        record_write(self.primary_uri, lsn)
+
+    def connect(self):
+        """
+        Connect for a read: to the next healthy replica that has replayed this process's writes, or to the primary.
+        :return: psycopg2 connection.
+        """
+        for uri in self.healthy():
+            try:
+                connection = psycopg2.connect(uri)
+            except psycopg2.OperationalError as e:
+                print("Error connecting to replica, skipping it:", e)
+                self.mark_down(uri)
+                continue
+            if self._caught_up(connection):
+                return connection
+            connection.close()
+        return psycopg2.connect(self.primary_uri)
+
+    def _caught_up(self, connection) -> bool:
+        written = self.written_lsn
+        if written is None:
+            return True
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT pg_last_wal_replay_lsn();")
+            replayed = cursor.fetchone()[0]
+        except Exception as e:
+            print("Error checking replica position:", e)
+            return False
+        finally:
+            cursor.close()
+        # NULL when the server is not in recovery, i.e. a primary.
+        return replayed is None or parse_lsn(replayed) >= written
@@ -0,0 +1,388 @@
+"""
+Package: config_manager
+Module: server
+This module contains the ConfigServer class, a small asyncio HTTP server that fronts a configuration loader so many
+processes can share one backend connection.
+
+Each application's configuration is cached in memory and refreshed in the background, with one bulk query per refresh
+when the loader supports it. Responses carry an ETag: a request with a matching If-None-Match gets a 304, and adding
+`?wait=<seconds>` turns it into a long poll that returns as soon as the configuration changes.
+
+Routes:
+
+- `GET /apps/<app_id>`: configuration as JSON.
+- `PUT /apps/<app_id>`: replace the configuration with a JSON object. Keys missing from the body are deleted when
+  the loader has apply_changes() (file loaders rewrite the whole file anyway). The response and the cache hold the
+  configuration as reloaded from the loader.
+- `GET /healthz`: liveness check.
+
+Example usage:
+
+```python
+from config_manager import ConfigServer, PostgresConfigLoader
+
+server = ConfigServer(PostgresConfigLoader(postgres_uri, app_name=""), port=8080)
+asyncio.run(server.serve_forever())
+```
+
+or from the command line: `python -m config_manager.server sqlite --sqlite-location config.db --port 8080`.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .base_loader import BaseConfigLoader
+from .path_index import SEPARATOR, flatten
+
+_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    502: "Bad Gateway",
+}
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+class _Entry:
+    """
+    A cached configuration, replaced by a new entry whenever it changes.
+    """
+
+    __slots__ = ("data", "body", "etag", "changed")
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+        self.body = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+        self.etag = make_etag(self.body)
+        # Set once the entry is superseded, wakes up long polls.
+        self.changed = asyncio.Event()
+
+
+class ConfigServer:
+    """
+    HTTP server caching and serving the configurations of a loader.
+    """
+
+    def __init__(
+        self,
+        loader: BaseConfigLoader,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        refresh_interval: float = 1.0,
+        max_wait: float = 30.0,
+        workers: int = 4,
+        max_apps: int = 1024,
+        max_body: int = 16 * 1024 * 1024,
+    ):
+        """
+        Initialize the server.
+        :param loader: Loader to serve. Loaders with for_app() (SQLite, PostgreSQL) serve every application,
+            other loaders serve the same configuration for any app_id.
+        :param host: Address to listen on.
+        :param port: Port to listen on, 0 picks a free port.
+        :param refresh_interval: Seconds between background reloads of cached configurations.
+        :param max_wait: Upper bound for long polls in seconds.
+        :param workers: Threads running the blocking loader calls.
+        :param max_apps: Number of configurations cached and refreshed. The least recently requested one is dropped
+            beyond it, so requests for unknown app_ids cannot grow the cache without bound.
+        :param max_body: Largest request body in bytes, larger ones get a 413 without being read.
+        """
+        self.loader = loader
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.max_wait = max_wait
+        self.max_apps = max_apps
+        self.max_body = max_body
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="config-server"
+        )
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Lock] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """
+        Start listening and refreshing in the background.
+        :return: None
+        """
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """
+        Stop listening and release the worker threads.
+        :return: None
+        """
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=False)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def start_in_thread(self) -> "ConfigServer":
+        """
+        Run the server on its own event loop in a daemon thread, for use from synchronous code.
+        :return: The server, listening once this returns.
+        """
+        started = threading.Event()
+        errors: List[BaseException] = []
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="config-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop_thread(self) -> None:
+        """
+        Stop a server started with start_in_thread().
+        :return: None
+        """
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    def _loader_for(self, app_id: str) -> BaseConfigLoader:
+        for_app = getattr(self.loader, "for_app", None)
+        return for_app(app_id) if for_app is not None else self.loader
+
+    async def _run(self, function, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, function, *args
+        )
+
+    def _store(self, app_id: str, data: Dict[str, Any]) -> _Entry:
+        entry = _Entry(data)
+        current = self._entries.get(app_id)
+        if current is not None and current.etag == entry.etag:
+            return current
+        self._entries[app_id] = entry
+        if current is not None:
+            current.changed.set()
+        while len(self._entries) > self.max_apps:
+            _, evicted = self._entries.popitem(last=False)
+            evicted.changed.set()
+        return entry
+
+    async def _get_entry(self, app_id: str) -> _Entry:
+        entry = self._entries.get(app_id)
+        if entry is not None:
+            self._entries.move_to_end(app_id)
+            return entry
+        # Concurrent first requests for an app share one load.
+        lock = self._loading.setdefault(app_id, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(app_id)
+            if entry is None:
+                data = await self._run(self._loader_for(app_id).load)
+                entry = self._store(app_id, data)
+        self._loading.pop(app_id, None)
+        return entry
+
+    async def refresh(self) -> None:
+        """
+        Reload every cached configuration, waking up long polls of those that changed.
+        :return: None
+        """
+        app_ids = list(self._entries)
+        if not app_ids:
+            return
+        if hasattr(self.loader, "load_many"):
+            loaded = await self._run(self.loader.load_many, app_ids)
+            for app_id in app_ids:
+                self._refreshed(app_id, loaded.get(app_id, {}))
+            return
+        for app_id in app_ids:
+            self._refreshed(app_id, await self._run(self._loader_for(app_id).load))
+
+    def _refreshed(self, app_id: str, data: Dict[str, Any]) -> None:
+        # Entries evicted while loading stay evicted.
+        if app_id in self._entries:
+            self._store(app_id, data)
+
+    def _replace(self, app_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        loader = self._loader_for(app_id)
+        loader.save(data)
+        stored = loader.load()
+        roots = {str(key).split(SEPARATOR, 1)[0] for key in data}
+        removed = {key: value for key, value in stored.items() if key not in roots}
+        if removed and hasattr(loader, "apply_changes"):
+            # save() only upserts. Nested loaders store removed subtrees as dotted rows.
+            loader.apply_changes({}, [*removed, *flatten(removed)])
+            stored = loader.load()
+        return stored
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the cached configurations until the backend recovers.
+                print("Error refreshing configuration:", e)
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = headers.get("content-length", "0")
+            if not length.isdigit():
+                status, extra, payload = 400, {}, b'{"error": "invalid content-length"}'
+            elif int(length) > self.max_body:
+                status, extra, payload = 413, {}, b'{"error": "body too large"}'
+            else:
+                body = await reader.readexactly(int(length))
+                status, extra, payload = await self._route(
+                    method, target, headers, body
+                )
+        except Exception as e:
+            print("Error serving configuration:", e)
+            status, extra, payload = 502, {}, json.dumps({"error": str(e)}).encode()
+        try:
+            head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+            if status != 304:
+                head.append("Content-Type: application/json")
+                head.append(f"Content-Length: {len(payload)}")
+            head.extend(f"{name}: {value}" for name, value in extra.items())
+            head.append("Connection: close")
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            if status != 304:
+                writer.write(payload)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _route(
+        self, method: str, target: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        if parts == ["healthz"]:
+            return 200, {}, b'{"status": "ok"}'
+        if len(parts) != 2 or parts[0] != "apps":
+            return 404, {}, b'{"error": "not found"}'
+        app_id = parts[1]
+        if method == "GET":
+            query = parse_qs(url.query)
+            try:
+                wait = min(float(query.get("wait", ["0"])[0]), self.max_wait)
+            except ValueError:
+                return 400, {}, b'{"error": "wait must be a number of seconds"}'
+            return await self._get(app_id, headers.get("if-none-match"), wait)
+        if method == "PUT":
+            try:
+                data = json.loads(body)
+            except ValueError as e:
+                return 400, {}, json.dumps({"error": str(e)}).encode()
+            if not isinstance(data, dict):
+                return 400, {}, b'{"error": "configuration must be a JSON object"}'
+            entry = self._store(app_id, await self._run(self._replace, app_id, data))
+            return 200, {"ETag": entry.etag}, entry.body
+        return 405, {"Allow": "GET, PUT"}, b'{"error": "method not allowed"}'
+
+    async def _get(
+        self, app_id: str, if_none_match: Optional[str], wait: float
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        entry = await self._get_entry(app_id)
+        if if_none_match == entry.etag and wait > 0:
+            try:
+                await asyncio.wait_for(entry.changed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+            entry = self._entries.get(app_id, entry)
+        if if_none_match == entry.etag:
+            return 304, {"ETag": entry.etag}, b""
+        return 200, {"ETag": entry.etag}, entry.body
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from .configuration import Configuration
+
+    parser = argparse.ArgumentParser(description="Serve configurations over HTTP.")
+    parser.add_argument("config_type", choices=["sqlite", "postgres", "json", "yaml"])
+    parser.add_argument("--sqlite-location")
+    parser.add_argument("--postgres-uri")
+    parser.add_argument("--file-path")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--refresh-interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+    loader = Configuration._get_loader(
+        args.config_type,
+        app_name="",
+        app_id="",
+        sqlite_location=args.sqlite_location,
+        postgres_uri=args.postgres_uri,
+        file_path=args.file_path,
+    )
+    server = ConfigServer(
+        loader,
+        host=args.host,
+        port=args.port,
+        refresh_interval=args.refresh_interval,
+    )
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Package: config_manager
+Module: snapshot
+This module contains the SnapshotLoader class that keeps a last-known-good local copy of another loader's
+configuration, so a process can start while the primary backend is slow or down.
+
+The snapshot is written in the background, in the binary format of BinaryConfigLoader, after each successful load
+or save. With revalidation enabled, the first load returns the snapshot immediately. The primary load then runs in
+a background thread, retried until it succeeds, and subscribers receive the fresh data (stale-while-revalidate).
+Without a snapshot, the first load waits for the primary as usual. A load falling back to the snapshot because the
+primary failed is revalidated in the background the same way.
+
+While `stale` is set, Configuration writes wait up to `write_timeout` seconds for the fresh data before applying the
+change, so a write is never built on the snapshot, which would overwrite newer values in the primary.
+
+Example usage:
+
+```python
+config = Configuration.load_existing(
+    "postgres", app_id, postgres_uri=uri, snapshot_dir="/var/cache/config_manager"
+)
+config.loader.wait_fresh(timeout=5)  # optional, config updates itself when the primary load completes
+```
+"""
+
+import os
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+from .base_loader import BaseConfigLoader
+from .binary_loader import BinaryConfigLoader
+
+
+class SnapshotLoader(BaseConfigLoader):
+    """
+    Configuration loader serving a local snapshot of a primary loader.
+    """
+
+    __slots__ = (
+        "primary",
+        "snapshot_dir",
+        "app_id",
+        "revalidate",
+        "retry_interval",
+        "write_timeout",
+        "stale",
+        "_snapshot",
+        "_subscribers",
+        "_fresh",
+        "_refreshed",
+        "_revalidating",
+        "_lock",
+        "_pending",
+        "_writing",
+        "_idle",
+        "_closed",
+    )
+
+    def __init__(
+        self,
+        primary: BaseConfigLoader,
+        snapshot_dir: str,
+        app_id: Optional[str] = None,
+        revalidate: bool = True,
+        retry_interval: float = 5.0,
+        write_timeout: float = 30.0,
+    ):
+        """
+        Initialize the SnapshotLoader.
+        :param primary: Loader of the primary backend.
+        :param snapshot_dir: Directory holding one snapshot file per application.
+        :param app_id: Unique identifier for the application, defaults to the app_id of the primary loader.
+        :param revalidate: Serve an existing snapshot at once and load the primary in the background. If False, the
+            primary is loaded first and the snapshot is only used when that fails.
+        :param retry_interval: Seconds between background attempts while the primary is unavailable.
+        :param write_timeout: Seconds a Configuration write waits for fresh data while the loader is stale.
+        """
+        self.primary = primary
+        self.snapshot_dir = snapshot_dir
+        self.app_id = app_id or getattr(primary, "app_id", None) or "default"
+        self.revalidate = revalidate
+        self.retry_interval = retry_interval
+        self.write_timeout = write_timeout
+        self.stale = False
+        os.makedirs(snapshot_dir, exist_ok=True)
+        self._snapshot = BinaryConfigLoader(
+            os.path.join(snapshot_dir, f"{self.app_id}.snapshot")
+        )
+        # Callables returning the subscriber, or None once it was garbage collected.
+        self._subscribers: List[Callable[[], Any]] = []
+        self._fresh = threading.Event()
+        self._refreshed: Optional[Dict[str, Any]] = None
+        self._revalidating = False
+        self._lock = threading.Lock()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._writing = False
+        self._idle = threading.Condition(self._lock)
+        self._closed = threading.Event()
+
+    @property
+    def snapshot_path(self) -> str:
+        return self._snapshot.file_path
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load configuration data, from the snapshot if the primary is not available yet.
+        :return: Dict containing configuration data.
+        """
+        if self.revalidate and not self._fresh.is_set():
+            snapshot = self._read_snapshot()
+            if snapshot is not None:
+                self._serve_stale()
+                return snapshot
+        try:
+            config = self.primary.load()
+        except Exception as e:
+            snapshot = self._read_snapshot()
+            if snapshot is None:
+                raise
+            print("Error loading configuration, using snapshot:", e)
+            self._serve_stale()
+            return snapshot
+        self._loaded(config)
+        with self._lock:
+            # The caller holds newer data than an undelivered revalidation.
+            self._refreshed = None
+        self.stale = False
+        self._fresh.set()
+        return config
+
+    def save(self, config: Dict[str, Any]) -> None:
+        """
+        Save configuration data to the primary, then refresh the snapshot in the background.
+        :param config: A dict containing configuration data.
+        :return: None
+        """
+        self.primary.save(config)
+        self._write_snapshot(config)
+
+    def subscribe(
+        self, callback: Callable[[Dict[str, Any]], None]
+    ) -> Callable[[], None]:
+        """
+        Register a callback receiving the configuration loaded from the primary after a stale load. Bound methods are
+        held through weak references, so subscribing does not keep their object alive.
+        :param callback: Callable receiving the fresh configuration data.
+        :return: Callable removing the subscription.
+        """
+        if hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            reference = weakref.WeakMethod(callback)
+        else:
+            reference = lambda: callback  # noqa: E731
+        with self._lock:
+            self._subscribers.append(reference)
+            # The primary load completed before any callback was registered, delivered once.
+            refreshed, self._refreshed = self._refreshed, None
+        if refreshed is not None:
+            callback(dict(refreshed))
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if reference in self._subscribers:
+                    self._subscribers.remove(reference)
+
+        return unsubscribe
+
+    def wait_fresh(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until data from the primary has been loaded and delivered to subscribers.
+        :param timeout: Seconds to wait, None waits indefinitely.
+        :return: True if fresh data was loaded.
+        """
+        return self._fresh.wait(timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for pending snapshot writes, e.g. before shutdown.
+        :param timeout: Seconds to wait, None waits indefinitely.
+        :return: True if no write is pending.
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._writing, timeout)
+
+    def close(self) -> None:
+        """
+        Stop retrying the primary in the background.
+        :return: None
+        """
+        self._closed.set()
+
+    def for_app(self, app_id: str, app_name: str = "") -> "SnapshotLoader":
+        """
+        Create a loader for another application, with its own snapshot in the same directory.
+        :param app_id: Unique identifier for the application.
+        :param app_name: Name of the application.
+        :return: SnapshotLoader bound to app_id.
+        """
+        return SnapshotLoader(
+            self.primary.for_app(app_id, app_name),
+            self.snapshot_dir,
+            app_id=app_id,
+            revalidate=self.revalidate,
+            retry_interval=self.retry_interval,
+            write_timeout=self.write_timeout,
+        )
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            # Copied out of the memory map, the file is replaced by later snapshots.
+            return self._snapshot.load().copy()
+        except Exception as e:
+            print("Error reading snapshot:", e)
+            return None
+
+    def _serve_stale(self) -> None:
+        with self._lock:
+            self.stale = True
+            self._fresh.clear()
+            start, self._revalidating = not self._revalidating, True
+        if start:
+            threading.Thread(
+                target=self._revalidate, name="config-snapshot", daemon=True
+            ).start()
+
+    def _revalidate(self) -> None:
+        while not self._closed.is_set():
+            try:
+                config = self.primary.load()
+            except Exception as e:
+                print("Error revalidating configuration:", e)
+                self._closed.wait(self.retry_interval)
+                continue
+            self._loaded(config)
+            with self._lock:
+                live = [(reference, reference()) for reference in self._subscribers]
+                live = [
+                    (reference, callback)
+                    for reference, callback in live
+                    if callback is not None
+                ]
+                self._subscribers = [reference for reference, _ in live]
+                callbacks = [callback for _, callback in live]
+                # Kept for a subscriber registering later, only when nobody received it.
+                self._refreshed = None if callbacks else config
+            for callback in callbacks:
+                callback(dict(config))
+            # Cleared only once subscribers hold the fresh data, writers wait for it.
+            with self._lock:
+                self.stale = False
+                self._revalidating = False
+                self._fresh.set()
+            return
+
+    def _loaded(self, config: Dict[str, Any]) -> None:
+        self._write_snapshot(config)
+
+    def _write_snapshot(self, config: Dict[str, Any]) -> None:
+        # Writes are coalesced: the writer thread only writes the latest pending configuration.
+        with self._lock:
+            self._pending = dict(config)
+            if self._writing:
+                return
+            self._writing = True
+        threading.Thread(
+            target=self._write_pending, name="config-snapshot-writer", daemon=True
+        ).start()
+
+    def _write_pending(self) -> None:
+        while True:
+            with self._lock:
+                config, self._pending = self._pending, None
+                if config is None:
+                    self._writing = False
+                    self._idle.notify_all()
+                    return
+            try:
+                self._snapshot.save(config)
+            except Exception as e:
+                print("Error writing snapshot:", e)
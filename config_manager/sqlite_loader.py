@@ -4,68 +4,73 @@ Module: sqlite_loader
 This module contains the SQLiteConfigLoader class that is used to load and save configuration data from SQLite databases.
 """
 
+import copy
 import sqlite3
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 from uuid import uuid4
 
 from .base_loader import BaseConfigLoader
+from .concurrency import ConfigConflictError
+from .history import DEFAULT_RETENTION, diff_rows, prune_cutoff, prune_due, sqlite_text
+from .merkle import BUCKETS, register_sqlite_functions
+from .migrations import migrate_sqlite
+from .path_index import flatten, stale_keys, unflatten
+
+# Stays below SQLite's default limit on bound parameters per statement.
+BULK_CHUNK_SIZE = 900
 
 
 class SQLiteConfigLoader(BaseConfigLoader):
+    __slots__ = (
+        "sqlite_location",
+        "app_name",
+        "app_id",
+        "nested",
+        "history",
+        "retention",
+        "optimistic",
+        "_baseline",
+    )
+
     def __init__(
-        self, sqlite_location: str, app_name: str, app_id: Optional[str] = None
+        self,
+        sqlite_location: str,
+        app_name: str,
+        app_id: Optional[str] = None,
+        nested: bool = False,
+        history: bool = False,
+        retention: Optional[int] = DEFAULT_RETENTION,
+        optimistic: bool = False,
     ):
         """
         Initialize the SQLiteConfigLoader.
         :param sqlite_location: Path to the SQLite database.
         :param app_name: Name of the application.
         :param app_id: Unique identifier for the application.
+        :param nested: Store nested values as dotted keys and rebuild them on load.
+        :param history: Record every change in the config_history table and write only changed keys.
+        :param retention: Number of versions kept per application, None keeps all of them.
+        :param optimistic: Only write keys changed since the last load, each one conditional on its revision, and
+            raise ConfigConflictError if another writer changed it in between.
         """
         self.sqlite_location = sqlite_location
         self.app_name = app_name
         self.app_id = app_id or None
+        self.nested = nested
+        self.history = history
+        self.retention = retention
+        self.optimistic = optimistic
+        # Stored value and revision of each key as of the last load, used by optimistic saves.
+        self._baseline: Optional[Dict[str, Tuple[Any, int]]] = None
         self.initialize_database()
 
     def initialize_database(self) -> None:
         """
-        Initialize the SQLite database.
+        Initialize the SQLite database, applying pending schema migrations once per process.
         :return: None
         """
-        connection = sqlite3.connect(self.sqlite_location)
-        cursor = connection.cursor()
-        try:
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS applications (
-                    app_id TEXT PRIMARY KEY,
-                    app_name TEXT UNIQUE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """
-            )
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS config (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    app_id TEXT NOT NULL,
-                    key TEXT NOT NULL,
-                    value TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE (app_id, key),
-                    FOREIGN KEY (app_id) REFERENCES applications(app_id) ON DELETE CASCADE
-                );
-            """
-            )
-            connection.commit()
-        except Exception as e:
-            print("Error initializing database:", e)
-            connection.rollback()
-            raise
-        finally:
-            cursor.close()
-            connection.close()
+        migrate_sqlite(self.sqlite_location)
 
     def initialize_application(self) -> None:
         """
@@ -104,6 +109,17 @@ class SQLiteConfigLoader(BaseConfigLoader):
         connection = sqlite3.connect(self.sqlite_location)
         cursor = connection.cursor()
         try:
+            if self.optimistic:
+                cursor.execute(
+                    "SELECT key, value, revision FROM config WHERE app_id = ?;",
+                    (self.app_id,),
+                )
+                rows = cursor.fetchall()
+                self._baseline = {
+                    key: (value, revision) for key, value, revision in rows
+                }
+                config = {key: value for key, value, _ in rows}
+                return unflatten(config) if self.nested else config
             cursor.execute(
                 """
                 SELECT key, value FROM config
@@ -120,7 +136,7 @@ class SQLiteConfigLoader(BaseConfigLoader):
         finally:
             cursor.close()
             connection.close()
-        return config
+        return unflatten(config) if self.nested else config
 
     def save(self, config: Dict[str, Any]) -> None:
         """
@@ -128,12 +144,27 @@ class SQLiteConfigLoader(BaseConfigLoader):
         :param config: A dict containing configuration data.
         :return: None
         """
+        nested_config = config
+        if self.nested:
+            config = flatten(config)
         connection = sqlite3.connect(self.sqlite_location)
         cursor = connection.cursor()
         try:
             # Ensure the application exists
             self.initialize_application()
 
+            if self.optimistic:
+                baseline = self._save_conditional(cursor, config)
+                connection.commit()
+                self._baseline = baseline
+                return
+            if self.history:
+                self._save_changes(cursor, config)
+                connection.commit()
+                return
+
+            if self.nested:
+                self._delete_stale(cursor, self.app_id, nested_config, config)
             for key, value in config.items():
                 cursor.execute(
                     """
@@ -141,11 +172,15 @@ class SQLiteConfigLoader(BaseConfigLoader):
                     VALUES (?, ?, ?)
                     ON CONFLICT(app_id, key) DO UPDATE SET
                         value = excluded.value,
+                        revision = config.revision + 1,
                         updated_at = CURRENT_TIMESTAMP;
                 """,
                     (self.app_id, key, value),
                 )
             connection.commit()
+        except ConfigConflictError:
+            connection.rollback()
+            raise
         except Exception as e:
             print("Error saving configuration:", e)
             connection.rollback()
@@ -153,3 +188,553 @@ class SQLiteConfigLoader(BaseConfigLoader):
         finally:
             cursor.close()
             connection.close()
+
+    def _delete_stale(
+        self,
+        cursor: sqlite3.Cursor,
+        app_id: str,
+        config: Mapping[str, Any],
+        flat: Mapping[str, Any],
+    ) -> None:
+        # Dotted rows of replaced or shrunk values would be merged back into the next load.
+        cursor.execute("SELECT key FROM config WHERE app_id = ?;", (app_id,))
+        stale = stale_keys((row[0] for row in cursor.fetchall()), config, flat)
+        cursor.executemany(
+            "DELETE FROM config WHERE app_id = ? AND key = ?;",
+            [(app_id, key) for key in stale],
+        )
+
+    def _save_changes(self, cursor: sqlite3.Cursor, config: Dict[str, Any]) -> None:
+        cursor.execute(
+            "SELECT key, value FROM config WHERE app_id = ?;", (self.app_id,)
+        )
+        changed, deleted = diff_rows(dict(cursor.fetchall()), config, sqlite_text)
+        if not changed and not deleted:
+            return
+        cursor.executemany(
+            """
+            INSERT INTO config (app_id, key, value)
+            VALUES (?, ?, ?)
+            ON CONFLICT(app_id, key) DO UPDATE SET
+                value = excluded.value,
+                revision = config.revision + 1,
+                updated_at = CURRENT_TIMESTAMP;
+        """,
+            [(self.app_id, key, value) for key, value in changed.items()],
+        )
+        cursor.executemany(
+            "DELETE FROM config WHERE app_id = ? AND key = ?;",
+            [(self.app_id, key) for key in deleted],
+        )
+        self._record_version(cursor, changed, deleted)
+
+    def _save_conditional(
+        self, cursor: sqlite3.Cursor, config: Dict[str, Any]
+    ) -> Dict[str, Tuple[Any, int]]:
+        baseline = dict(self._baseline or {})
+        current = {key: value for key, (value, _) in baseline.items()}
+        changed, deleted = diff_rows(current, config, sqlite_text)
+        conflicts = []
+        for key, value in changed.items():
+            if key in baseline:
+                cursor.execute(
+                    """
+                    UPDATE config
+                    SET value = ?, revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE app_id = ? AND key = ? AND revision = ?
+                    RETURNING revision;
+                """,
+                    (value, self.app_id, key, baseline[key][1]),
+                )
+            else:
+                cursor.execute(
+                    """
+                    INSERT INTO config (app_id, key, value)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(app_id, key) DO NOTHING
+                    RETURNING revision;
+                """,
+                    (self.app_id, key, value),
+                )
+            row = cursor.fetchone()
+            if row is None:
+                conflicts.append(key)
+            else:
+                baseline[key] = (sqlite_text(value), row[0])
+        for key in deleted:
+            cursor.execute(
+                "DELETE FROM config WHERE app_id = ? AND key = ? AND revision = ?;",
+                (self.app_id, key, baseline[key][1]),
+            )
+            if cursor.rowcount == 0:
+                conflicts.append(key)
+            else:
+                del baseline[key]
+        if conflicts:
+            raise ConfigConflictError(self.app_id, conflicts)
+        if self.history and (changed or deleted):
+            self._record_version(cursor, changed, deleted)
+        return baseline
+
+    def compare_and_set(self, key: str, expected: Any, value: Any) -> bool:
+        """
+        Atomically set a key if its stored value is still the expected one.
+        :param key: Key to set.
+        :param expected: Expected current value, None if the key is expected to be missing or NULL.
+        :param value: New value.
+        :return: True if the value was set, False if the stored value differed.
+        """
+        connection = sqlite3.connect(self.sqlite_location)
+        cursor = connection.cursor()
+        try:
+            self.initialize_application()
+            if expected is None:
+                cursor.execute(
+                    """
+                    INSERT INTO config (app_id, key, value)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(app_id, key) DO UPDATE SET
+                        value = excluded.value,
+                        revision = config.revision + 1,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE config.value IS NULL
+                    RETURNING revision;
+                """,
+                    (self.app_id, key, value),
+                )
+            else:
+                cursor.execute(
+                    """
+                    UPDATE config
+                    SET value = ?, revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE app_id = ? AND key = ? AND value = ?
+                    RETURNING revision;
+                """,
+                    (value, self.app_id, key, sqlite_text(expected)),
+                )
+            row = cursor.fetchone()
+            if row is None:
+                connection.rollback()
+                return False
+            if self.history:
+                self._record_version(cursor, {key: value}, [])
+            connection.commit()
+        except Exception as e:
+            print("Error saving configuration:", e)
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+        if self._baseline is not None:
+            self._baseline[key] = (sqlite_text(value), row[0])
+        return True
+
+    def _record_version(
+        self, cursor: sqlite3.Cursor, changed: Dict[str, Any], deleted: List[str]
+    ) -> None:
+        version = self.current_version(cursor) + 1
+        if version == 1:
+            # The first version records every key, later versions only the changes.
+            cursor.execute(
+                "SELECT key, value FROM config WHERE app_id = ?;", (self.app_id,)
+            )
+            changed = dict(cursor.fetchall())
+        cursor.execute(
+            "INSERT INTO config_versions (app_id, version) VALUES (?, ?);",
+            (self.app_id, version),
+        )
+        cursor.executemany(
+            """
+            INSERT INTO config_history (app_id, key, version, value, deleted)
+            VALUES (?, ?, ?, ?, ?);
+        """,
+            [(self.app_id, key, version, value, 0) for key, value in changed.items()]
+            + [(self.app_id, key, version, None, 1) for key in deleted],
+        )
+        if self.retention and prune_due(version, self.retention):
+            self._prune(cursor, prune_cutoff(version, self.retention))
+
+    def _prune(self, cursor: sqlite3.Cursor, cutoff: int) -> None:
+        # Rows older than the cutoff are only needed when they still hold the value of their key at the cutoff.
+        cursor.execute(
+            """
+            DELETE FROM config_history
+            WHERE app_id = ? AND version < ? AND (
+                deleted = 1 OR EXISTS (
+                    SELECT 1 FROM config_history AS newer
+                    WHERE newer.app_id = config_history.app_id
+                        AND newer.key = config_history.key
+                        AND newer.version > config_history.version
+                        AND newer.version <= ?
+                )
+            );
+        """,
+            (self.app_id, cutoff, cutoff),
+        )
+        cursor.execute(
+            "DELETE FROM config_versions WHERE app_id = ? AND version < ?;",
+            (self.app_id, cutoff),
+        )
+
+    def current_version(self, cursor: Optional[sqlite3.Cursor] = None) -> int:
+        """
+        Get the latest version of the application's configuration.
+        :param cursor: Cursor of an open transaction, a new connection is used if omitted.
+        :return: The version, 0 if no version was recorded.
+        """
+        return self._query(
+            cursor,
+            "SELECT COALESCE(MAX(version), 0) FROM config_versions WHERE app_id = ?;",
+            (self.app_id,),
+        )[0][0]
+
+    def versions(self) -> List[Tuple[int, Any]]:
+        """
+        List the versions still available for the application.
+        :return: List of (version, created_at) pairs, oldest first.
+        """
+        return self._query(
+            None,
+            """
+            SELECT version, created_at FROM config_versions
+            WHERE app_id = ?
+            ORDER BY version;
+        """,
+            (self.app_id,),
+        )
+
+    def load_version(self, version: int) -> Dict[str, Any]:
+        """
+        Load the configuration data as it was at a given version.
+        :param version: Version to load.
+        :return: Dict containing configuration data.
+        """
+        if not self.history:
+            raise ValueError("History is not enabled for this SQLiteConfigLoader.")
+        exists = self._query(
+            None,
+            "SELECT 1 FROM config_versions WHERE app_id = ? AND version = ?;",
+            (self.app_id, version),
+        )
+        if not exists:
+            raise ValueError(f"Version {version} of {self.app_id} is not available.")
+        rows = self._query(
+            None,
+            """
+            SELECT key, value, deleted FROM config_history AS entry
+            WHERE app_id = ? AND version = (
+                SELECT MAX(version) FROM config_history
+                WHERE app_id = entry.app_id AND key = entry.key AND version <= ?
+            );
+        """,
+            (self.app_id, version),
+        )
+        config = {key: value for key, value, deleted in rows if not deleted}
+        return unflatten(config) if self.nested else config
+
+    def load_keys(
+        self, keys: Iterable[str], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Load some top-level keys of the configuration, e.g. the working set recorded by an AccessLog.
+        With nested=True, the dotted keys below them are loaded too.
+        :param keys: Top-level keys.
+        :param chunk_size: Number of keys bound per query.
+        :return: Dict containing the keys found.
+        """
+        keys = list(dict.fromkeys(keys))
+        # The dotted keys of a nested value share its top-level key.
+        column = (
+            "CASE WHEN instr(key, '.') > 0 THEN substr(key, 1, instr(key, '.') - 1) ELSE key END"
+            if self.nested
+            else "key"
+        )
+        config = {}
+        connection = sqlite3.connect(self.sqlite_location)
+        try:
+            for start in range(0, len(keys), chunk_size):
+                chunk = keys[start : start + chunk_size]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = connection.execute(
+                    f"SELECT key, value FROM config WHERE app_id = ? AND {column} IN ({placeholders});",
+                    [self.app_id, *chunk],
+                )
+                config.update(rows)
+        except Exception as e:
+            print("Error loading configuration keys:", e)
+            raise
+        finally:
+            connection.close()
+        return unflatten(config) if self.nested else config
+
+    def _query(
+        self, cursor: Optional[sqlite3.Cursor], sql: str, params: Tuple
+    ) -> List[Tuple]:
+        if cursor is not None:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        connection = sqlite3.connect(self.sqlite_location)
+        try:
+            return connection.execute(sql, params).fetchall()
+        except Exception as e:
+            print("Error reading configuration history:", e)
+            raise
+        finally:
+            connection.close()
+
+    def for_app(self, app_id: str, app_name: str = "") -> "SQLiteConfigLoader":
+        """
+        Create a loader for another application in the same database without re-running initialization.
+        :param app_id: Unique identifier for the application.
+        :param app_name: Name of the application.
+        :return: SQLiteConfigLoader bound to app_id.
+        """
+        loader = copy.copy(self)
+        loader.app_id = app_id
+        loader.app_name = app_name
+        loader._baseline = None
+        return loader
+
+    def iter_many(
+        self, app_ids: Iterable[str], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Load the configuration of many applications with one query per chunk of app_ids.
+        Applications without any stored keys are yielded with an empty dict.
+        :param app_ids: Unique identifiers of the applications.
+        :param chunk_size: Number of app_ids bound per query.
+        :return: Iterator of (app_id, config) pairs.
+        """
+        for app_id, config, _ in self._iter_rows(app_ids, chunk_size, False):
+            yield app_id, config
+
+    def iter_loaders(
+        self, app_ids: Iterable[str], chunk_size: int = BULK_CHUNK_SIZE
+    ) -> Iterator[Tuple["SQLiteConfigLoader", Dict[str, Any]]]:
+        """
+        Like iter_many(), with a loader bound to each application. With optimistic=True, each loader is ready to save
+        as after its own load(): the revisions come from the same query.
+        :param app_ids: Unique identifiers of the applications.
+        :param chunk_size: Number of app_ids bound per query.
+        :return: Iterator of (loader, config) pairs.
+        """
+        for app_id, config, baseline in self._iter_rows(
+            app_ids, chunk_size, self.optimistic
+        ):
+            loader = self.for_app(app_id)
+            loader._baseline = baseline
+            yield loader, config
+
+    def _iter_rows(
+        self, app_ids: Iterable[str], chunk_size: int, revisions: bool
+    ) -> Iterator[Tuple[str, Dict[str, Any], Optional[Dict[str, Tuple[Any, int]]]]]:
+        app_ids = [str(app_id) for app_id in dict.fromkeys(app_ids)]
+        connection = sqlite3.connect(self.sqlite_location)
+        cursor = connection.cursor()
+        try:
+            for start in range(0, len(app_ids), chunk_size):
+                chunk = app_ids[start : start + chunk_size]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor.execute(
+                    f"""
+                    SELECT app_id, key, value, revision FROM config
+                    WHERE app_id IN ({placeholders})
+                    ORDER BY app_id;
+                """,
+                    chunk,
+                )
+                rows = {app_id: [] for app_id in chunk}
+                for app_id, key, value, revision in cursor:
+                    rows[app_id].append((key, value, revision))
+                for app_id, app_rows in rows.items():
+                    config = {key: value for key, value, _ in app_rows}
+                    baseline = None
+                    if revisions:
+                        baseline = {key: (value, rev) for key, value, rev in app_rows}
+                    config = unflatten(config) if self.nested else config
+                    yield app_id, config, baseline
+        except Exception as e:
+            print("Error loading configurations:", e)
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def load_many(self, app_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the configuration of many applications.
+        :param app_ids: Unique identifiers of the applications.
+        :return: Dict mapping app_id to its configuration data.
+        """
+        return dict(self.iter_many(app_ids))
+
+    def bucket_hashes(self, buckets: int = BUCKETS) -> Dict[int, str]:
+        """
+        Compute the hash of each bucket of stored rows in the database, see the merkle module.
+        :param buckets: Number of buckets, a power of two.
+        :return: Dict mapping each non-empty bucket to its hash.
+        """
+        rows = self._hash_query(
+            """
+            SELECT cm_bucket(key, ?) AS bucket, cm_bucket_hash(key, value)
+            FROM config WHERE app_id = ? GROUP BY bucket;
+        """,
+            (buckets, self.app_id),
+        )
+        return dict(rows)
+
+    def rows_in_buckets(
+        self, bucket_ids: Iterable[int], buckets: int = BUCKETS
+    ) -> Dict[str, Any]:
+        """
+        Read the stored rows of some buckets.
+        :param bucket_ids: Buckets to read.
+        :param buckets: Number of buckets, a power of two.
+        :return: Dict of flat keys and stored values.
+        """
+        bucket_ids = list(bucket_ids)
+        placeholders = ", ".join("?" for _ in bucket_ids)
+        rows = self._hash_query(
+            f"""
+            SELECT key, value FROM config
+            WHERE app_id = ? AND cm_bucket(key, ?) IN ({placeholders});
+        """,
+            (self.app_id, buckets, *bucket_ids),
+        )
+        return dict(rows)
+
+    def _hash_query(self, sql: str, params: Tuple) -> List[Tuple]:
+        connection = sqlite3.connect(self.sqlite_location)
+        register_sqlite_functions(connection)
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        except Exception as e:
+            print("Error hashing configuration:", e)
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def apply_changes(self, upserts: Dict[str, Any], deletes: List[str]) -> None:
+        """
+        Write single changed rows, e.g. from merkle.sync(). Keys are stored as given, without flattening.
+        :param upserts: Flat keys to insert or update, with their values.
+        :param deletes: Flat keys to delete.
+        :return: None
+        """
+        connection = sqlite3.connect(self.sqlite_location)
+        cursor = connection.cursor()
+        try:
+            cursor.executemany(
+                """
+                INSERT INTO config (app_id, key, value)
+                VALUES (?, ?, ?)
+                ON CONFLICT(app_id, key) DO UPDATE SET
+                    value = excluded.value,
+                    revision = config.revision + 1,
+                    updated_at = CURRENT_TIMESTAMP;
+            """,
+                [(self.app_id, key, value) for key, value in upserts.items()],
+            )
+            cursor.executemany(
+                "DELETE FROM config WHERE app_id = ? AND key = ?;",
+                [(self.app_id, key) for key in deletes],
+            )
+            if self.history and (upserts or deletes):
+                self._record_version(cursor, upserts, deletes)
+            connection.commit()
+        except Exception as e:
+            print("Error saving configuration:", e)
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+        self._baseline = None
+
+    def list_app_ids(self) -> List[str]:
+        """
+        List the applications that have an application row or stored keys.
+        :return: Sorted list of app_ids.
+        """
+        connection = sqlite3.connect(self.sqlite_location)
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT app_id FROM applications UNION SELECT app_id FROM config ORDER BY 1;"
+            )
+            return [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            print("Error listing applications:", e)
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def save_many(self, configs: Mapping[str, Dict[str, Any]]) -> None:
+        """
+        Save the configuration of many applications in one transaction.
+        Loaders keeping history or saving optimistically save each application on its own instead. With
+        optimistic=True, this loader's own application is checked against the revisions of its last load, and the
+        other applications against the revisions read just before the write.
+        :param configs: Dict mapping app_id to its configuration data.
+        :return: None
+        """
+        if self.history or self.optimistic:
+            self._save_each(configs)
+            return
+        connection = sqlite3.connect(self.sqlite_location)
+        cursor = connection.cursor()
+        try:
+            cursor.executemany(
+                "INSERT OR IGNORE INTO applications (app_id, app_name) VALUES (?, ?);",
+                [
+                    (app_id, str(config.get("APP_NAME") or app_id))
+                    for app_id, config in configs.items()
+                ],
+            )
+            rows = []
+            for app_id, config in configs.items():
+                flat = flatten(config) if self.nested else config
+                if self.nested:
+                    self._delete_stale(cursor, app_id, config, flat)
+                rows.extend((app_id, key, value) for key, value in flat.items())
+            cursor.executemany(
+                """
+                INSERT INTO config (app_id, key, value)
+                VALUES (?, ?, ?)
+                ON CONFLICT(app_id, key) DO UPDATE SET
+                    value = excluded.value,
+                    revision = config.revision + 1,
+                    updated_at = CURRENT_TIMESTAMP;
+            """,
+                rows,
+            )
+            connection.commit()
+        except Exception as e:
+            print("Error saving configurations:", e)
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+
+    def _save_each(self, configs: Mapping[str, Dict[str, Any]]) -> None:
+        baselines: Dict[str, Optional[Dict[str, Tuple[Any, int]]]] = {}
+        if self.optimistic:
+            if self._baseline is not None and self.app_id in configs:
+                baselines[self.app_id] = self._baseline
+            unknown = [app_id for app_id in configs if app_id not in baselines]
+            # A loader from for_app() has no baseline, every stored key would count as a conflict.
+            rows = self._iter_rows(unknown, BULK_CHUNK_SIZE, True) if unknown else ()
+            for app_id, _, baseline in rows:
+                baselines[app_id] = baseline
+        for app_id, config in configs.items():
+            loader = self.for_app(app_id)
+            loader._baseline = baselines.get(app_id)
+            loader.save(config)
+            if app_id == self.app_id:
+                self._baseline = loader._baseline
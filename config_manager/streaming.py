@@ -0,0 +1,407 @@
+"""
+Package: config_manager
+Module: streaming
+This module contains incremental JSON and YAML parsers that yield the (key, value) pairs of one mapping in a document.
+
+Only the selected sub-tree is turned into Python objects. Everything else is scanned and discarded, so memory use
+is bounded by the chunk size plus the largest single value that is yielded, not by the size of the document.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+if TYPE_CHECKING:
+    import yaml
+
+CHUNK_SIZE = 64 * 1024
+
+PathType = Union[str, Sequence[Union[str, int]], None]
+
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_STRING_SPECIAL = re.compile(r'["\\]')
+# Whole strings are matched in one step, a lone quote means a string continues past the buffer.
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]|"')
+_SCALAR_END = re.compile(r"[\s,\]}]")
+_WHITESPACE = " \t\n\r"
+
+
+def split_path(path: PathType) -> List[str]:
+    """
+    Split a dotted path such as 'db.replicas.0' into its components.
+    :param path: Dotted string, sequence of components or None for the document root.
+    :return: List of path components.
+    """
+    if path is None or path == "":
+        return []
+    if isinstance(path, str):
+        return path.split(".")
+    return [str(part) for part in path]
+
+
+def replace_at_path(document: Any, path: PathType, value: Any) -> Any:
+    """
+    Replace the value at path inside a parsed document.
+    :param document: Parsed document.
+    :param path: Dotted path of the value to replace, the document root replaces everything.
+    :param value: New value.
+    :return: The updated document.
+    """
+    components = split_path(path)
+    if not components:
+        return value
+    parent = document
+    for component in components[:-1]:
+        parent = parent[int(component) if isinstance(parent, list) else component]
+    last = components[-1]
+    parent[int(last) if isinstance(parent, list) else last] = value
+    return document
+
+
+class _JSONStream:
+    """
+    Chunked reader over a JSON text stream.
+
+    Consumed text is dropped from the buffer whenever more input is read, except for the value currently being
+    captured.
+    """
+
+    def __init__(self, file: IO[str], chunk_size: int = CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.mark: Optional[int] = None
+
+    def _fill(self) -> bool:
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        self.buffer = self.buffer[keep:] + chunk
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(
+                f"Invalid JSON: expected {char!r}, found {found or 'end of input'!r}"
+            )
+        self.pos += 1
+
+    def _scan_string(self) -> None:
+        match = _STRING.match(self.buffer, self.pos)
+        if match is not None:
+            self.pos = match.end()
+            return
+        self.pos += 1
+        while True:
+            match = _STRING_SPECIAL.search(self.buffer, self.pos)
+            if match is None or (
+                match.group() == "\\" and match.end() >= len(self.buffer)
+            ):
+                self.pos = len(self.buffer) if match is None else match.start()
+                if not self._fill():
+                    raise ValueError("Invalid JSON: unterminated string")
+                continue
+            if match.group() == '"':
+                self.pos = match.end()
+                return
+            self.pos = match.end() + 1
+
+    def _scan_container(self) -> None:
+        depth = 0
+        while True:
+            for match in _TOKEN.finditer(self.buffer, self.pos):
+                token = match.group()
+                if token == '"':
+                    self.pos = match.start()
+                    self._scan_string()
+                    break
+                if token[0] == '"':
+                    continue
+                depth += 1 if token in "{[" else -1
+                if depth == 0:
+                    self.pos = match.end()
+                    return
+            else:
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    raise ValueError("Invalid JSON: unterminated container")
+
+    def _scan_scalar(self) -> None:
+        while True:
+            match = _SCALAR_END.search(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return
+            self.pos = len(self.buffer)
+            if not self._fill():
+                return
+
+    def _scan(self) -> None:
+        char = self.peek()
+        if not char:
+            raise ValueError("Invalid JSON: unexpected end of input")
+        if char == '"':
+            self._scan_string()
+        elif char in "{[":
+            self._scan_container()
+        else:
+            self._scan_scalar()
+
+    def skip_value(self) -> None:
+        self._scan()
+
+    def read_value(self) -> Any:
+        self.peek()
+        self.mark = self.pos
+        try:
+            self._scan()
+            text = self.buffer[self.mark : self.pos]
+        finally:
+            self.mark = None
+        return json.loads(text)
+
+    def members(self) -> Iterator[str]:
+        """
+        Iterate the keys of the object at the current position. The caller must read or skip each value.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise ValueError("Invalid JSON: expected an object key")
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Invalid JSON: unexpected {separator!r} in object")
+
+    def elements(self) -> Iterator[int]:
+        """
+        Iterate the indexes of the array at the current position. The caller must read or skip each value.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Invalid JSON: unexpected {separator!r} in array")
+            index += 1
+
+    def descend(self, component: str) -> bool:
+        char = self.peek()
+        if char == "{":
+            for key in self.members():
+                if key == component:
+                    return True
+                self.skip_value()
+        elif char == "[" and component.isdigit():
+            target = int(component)
+            for index in self.elements():
+                if index == target:
+                    return True
+                self.skip_value()
+        return False
+
+
+def iter_json_items(
+    file: IO[str], path: PathType = None, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Incrementally yield the (key, value) pairs of the JSON object at path.
+    :param file: Text stream containing a JSON document.
+    :param path: Dotted path of the object to read, the document root by default.
+    :param chunk_size: Number of characters read from the stream at a time.
+    :return: Iterator of (key, value) pairs.
+    """
+    stream = _JSONStream(file, chunk_size)
+    components = split_path(path)
+    for depth, component in enumerate(components):
+        if not stream.descend(component):
+            raise KeyError(".".join(components[: depth + 1]))
+    if stream.peek() != "{":
+        raise ValueError(f"Value at {'.'.join(components) or 'root'} is not an object.")
+    for key in stream.members():
+        yield key, stream.read_value()
+
+
+class _YAMLEvents:
+    """
+    Turns a YAML event stream into nodes, composing only the sub-trees that are needed.
+    """
+
+    def __init__(self, file: IO[str], loader_class: Type[yaml.SafeLoader]):
+        import yaml
+
+        self.events = yaml.parse(file, Loader=loader_class)
+        self.resolver = yaml.SafeLoader("")
+        self.anchors: Dict[str, yaml.Node] = {}
+
+    def next(self) -> yaml.Event:
+        return next(self.events)
+
+    def compose(self, event: yaml.Event) -> yaml.Node:
+        import yaml
+
+        if isinstance(event, yaml.AliasEvent):
+            if event.anchor not in self.anchors:
+                raise ValueError(f"Undefined YAML alias: {event.anchor}")
+            return self.anchors[event.anchor]
+        if isinstance(event, yaml.ScalarEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = self.resolver.resolve(
+                    yaml.ScalarNode, event.value, event.implicit
+                )
+            node = yaml.ScalarNode(
+                tag, event.value, event.start_mark, event.end_mark, style=event.style
+            )
+        elif isinstance(event, yaml.SequenceStartEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = self.resolver.resolve(yaml.SequenceNode, None, event.implicit)
+            node = yaml.SequenceNode(tag, [], event.start_mark, None)
+            while not isinstance(child := self.next(), yaml.SequenceEndEvent):
+                node.value.append(self.compose(child))
+        elif isinstance(event, yaml.MappingStartEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = self.resolver.resolve(yaml.MappingNode, None, event.implicit)
+            node = yaml.MappingNode(tag, [], event.start_mark, None)
+            while not isinstance(child := self.next(), yaml.MappingEndEvent):
+                node.value.append((self.compose(child), self.compose(self.next())))
+        else:
+            raise ValueError(f"Unexpected YAML event: {event}")
+        if event.anchor is not None:
+            self.anchors[event.anchor] = node
+        return node
+
+    def skip(self, event: yaml.Event) -> None:
+        import yaml
+
+        if getattr(event, "anchor", None) is not None and not isinstance(
+            event, yaml.AliasEvent
+        ):
+            # Anchored nodes may be referenced later, so they are kept.
+            self.compose(event)
+            return
+        if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+            while not isinstance(
+                child := self.next(), (yaml.SequenceEndEvent, yaml.MappingEndEvent)
+            ):
+                self.skip(child)
+                if isinstance(event, yaml.MappingStartEvent):
+                    self.skip(self.next())
+
+    def construct(self, node: yaml.Node) -> Any:
+        return self.resolver.construct_document(node)
+
+    def descend(self, event: yaml.Event, component: str) -> Optional[yaml.Event]:
+        import yaml
+
+        if isinstance(event, yaml.MappingStartEvent):
+            while not isinstance(key_event := self.next(), yaml.MappingEndEvent):
+                key = self.construct(self.compose(key_event))
+                value_event = self.next()
+                if str(key) == component:
+                    return value_event
+                self.skip(value_event)
+        elif isinstance(event, yaml.SequenceStartEvent) and component.isdigit():
+            index = 0
+            while not isinstance(value_event := self.next(), yaml.SequenceEndEvent):
+                if index == int(component):
+                    return value_event
+                self.skip(value_event)
+                index += 1
+        return None
+
+
+def iter_yaml_items(
+    file: IO[str], path: PathType = None, loader_class: Optional[Type] = None
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Incrementally yield the (key, value) pairs of the YAML mapping at path in the first document.
+    :param file: Text stream containing a YAML document.
+    :param path: Dotted path of the mapping to read, the document root by default.
+    :param loader_class: YAML loader class whose parser produces the events, SafeLoader by default.
+    :return: Iterator of (key, value) pairs.
+    """
+    # Imported here, so JSON-only users never load PyYAML.
+    import yaml
+
+    events = _YAMLEvents(file, loader_class or yaml.SafeLoader)
+    event = events.next()
+    while isinstance(event, (yaml.StreamStartEvent, yaml.DocumentStartEvent)):
+        event = events.next()
+    if isinstance(event, yaml.StreamEndEvent):
+        if path:
+            raise KeyError(path)
+        return
+    components = split_path(path)
+    for depth, component in enumerate(components):
+        event = events.descend(event, component)
+        if event is None:
+            raise KeyError(".".join(components[: depth + 1]))
+    if isinstance(event, yaml.AliasEvent):
+        node = events.compose(event)
+        if not isinstance(node, yaml.MappingNode):
+            raise ValueError(f"Value at {'.'.join(components)} is not a mapping.")
+        yield from events.construct(node).items()
+        return
+    if not isinstance(event, yaml.MappingStartEvent):
+        raise ValueError(f"Value at {'.'.join(components) or 'root'} is not a mapping.")
+    explicit = set()
+    while not isinstance(key_event := events.next(), yaml.MappingEndEvent):
+        key_node = events.compose(key_event)
+        value = events.construct(events.compose(events.next()))
+        if key_node.tag == "tag:yaml.org,2002:merge":
+            # Merge keys never override keys set explicitly in the mapping.
+            for merged in value if isinstance(value, list) else [value]:
+                for key, merged_value in merged.items():
+                    if key not in explicit:
+                        yield key, merged_value
+            continue
+        key = events.construct(key_node)
+        explicit.add(key)
+        yield key, value
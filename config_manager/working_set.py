@@ -0,0 +1,276 @@
+"""
+Package: config_manager
+Module: working_set
+This module contains the AccessLog class that records which keys a process reads, and the LazyMapping class that
+holds a partially loaded configuration.
+
+Most services read a small, stable subset of a large configuration. With an AccessLog, Configuration records the
+top-level keys read through [], get() and attribute access, and persists them per app_id and process name. On the
+next start, loaders providing load_keys() (SQLite, PostgreSQL) fetch only that working set in one query. Keys outside
+it are fetched one at a time on first access, and the rest of the configuration is loaded when it is needed as a
+whole, e.g. to iterate, compare or save it. Configurations with interpolate=True or optimistic=True load everything
+at once, since references are parsed from every value and conditional writes need every revision.
+
+Example usage:
+
+```python
+config = Configuration.load_existing(
+    "postgres", app_id, postgres_uri=uri, access_dir="/var/cache/config_manager"
+)
+```
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import weakref
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .path_index import SEPARATOR
+
+_MISSING = object()
+
+# Logs flushed at interpreter exit, without keeping them alive.
+_logs: "weakref.WeakSet[AccessLog]" = weakref.WeakSet()
+
+
+def _flush_all() -> None:
+    for log in list(_logs):
+        log.flush()
+
+
+atexit.register(_flush_all)
+
+
+def default_process_name() -> str:
+    name = os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else ""
+    return os.path.splitext(name)[0] or "python"
+
+
+class AccessLog:
+    """
+    Keys read by one process from one application's configuration, persisted across runs.
+    """
+
+    __slots__ = (
+        "file_path",
+        "max_runs",
+        "run",
+        "_known",
+        "_touched",
+        "_lock",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        directory: str,
+        app_id: str,
+        process_name: Optional[str] = None,
+        max_runs: int = 10,
+    ):
+        """
+        Initialize the AccessLog and read the keys recorded by earlier runs.
+        :param directory: Directory holding one file per application and process name.
+        :param app_id: Unique identifier for the application.
+        :param process_name: Name of the process, defaults to the script name.
+        :param max_runs: Keys not read during this many runs are dropped from the working set.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.file_path = os.path.join(
+            directory, f"{app_id}.{process_name or default_process_name()}.keys"
+        )
+        self.max_runs = max_runs
+        runs, self._known = self._read()
+        self.run = runs + 1
+        self._touched: Set[str] = set()
+        self._lock = threading.Lock()
+        _logs.add(self)
+
+    def keys(self) -> List[str]:
+        """
+        Get the working set recorded by earlier runs.
+        :return: Top-level keys.
+        """
+        return list(self._known)
+
+    def record(self, key: str) -> None:
+        """
+        Record a read of a top-level key, persisted by flush().
+        :param key: Key read.
+        :return: None
+        """
+        if key not in self._touched:
+            with self._lock:
+                self._touched.add(key)
+
+    def flush(self) -> None:
+        """
+        Merge the keys read during this run into the file. Runs at interpreter exit for the logs still in use.
+        :return: None
+        """
+        with self._lock:
+            touched = set(self._touched)
+        runs, known = self._read()
+        run = max(runs, self.run)
+        known.update(dict.fromkeys(touched, run))
+        # Processes sharing a name merge their keys, the file is replaced atomically.
+        known = {key: last for key, last in known.items() if last > run - self.max_runs}
+        temp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"runs": run, "keys": known}, file)
+            os.replace(temp_path, self.file_path)
+        except Exception as e:
+            print("Error saving access log:", e)
+
+    def _read(self) -> Tuple[int, Dict[str, int]]:
+        if not os.path.exists(self.file_path):
+            return 0, {}
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            return int(data["runs"]), {str(k): int(v) for k, v in data["keys"].items()}
+        except Exception as e:
+            print("Error reading access log:", e)
+            return 0, {}
+
+
+class LazyMapping(MutableMapping):
+    """
+    Configuration data of which only a working set is loaded. Other keys are fetched on first access, and everything
+    is loaded before the mapping is iterated or measured.
+    """
+
+    __slots__ = (
+        "_data",
+        "_absent",
+        "_deleted",
+        "_fetch_keys",
+        "_fetch_all",
+        "complete",
+    )
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        requested: Iterable[str],
+        fetch_keys: Callable[[List[str]], Dict[str, Any]],
+        fetch_all: Callable[[], Dict[str, Any]],
+    ):
+        """
+        Initialize the mapping.
+        :param data: Prefetched data.
+        :param requested: Keys that were requested by the prefetch, the ones missing from data are known absent.
+        :param fetch_keys: Callable loading some top-level keys, see load_keys() on the SQL loaders.
+        :param fetch_all: Callable loading the whole configuration.
+        """
+        self._data = data
+        self._absent: Set[str] = {key for key in requested if key not in data}
+        self._deleted: Set[str] = set()
+        self._fetch_keys = fetch_keys
+        self._fetch_all = fetch_all
+        self.complete = False
+
+    def _fault(self, key: Any) -> Any:
+        if self.complete or key in self._absent or key in self._deleted:
+            return _MISSING
+        if not isinstance(key, str):
+            return _MISSING
+        value = self._fetch_keys([key]).get(key, _MISSING)
+        if value is _MISSING:
+            self._absent.add(key)
+        else:
+            self._data[key] = value
+        return value
+
+    def load_all(self) -> None:
+        """
+        Load the keys outside the working set. Values set or deleted in memory are kept.
+        :return: None
+        """
+        if self.complete:
+            return
+        for key, value in self._fetch_all().items():
+            if key not in self._data and key not in self._deleted:
+                self._data[key] = value
+        self.complete = True
+        self._absent.clear()
+        self._deleted.clear()
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._fault(key)
+            if value is _MISSING:
+                raise KeyError(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._fault(key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._data[key] = value
+        self._deleted.discard(key)
+        self._absent.discard(key)
+
+    def __delitem__(self, key: Any) -> None:
+        self[key]
+        del self._data[key]
+        if not self.complete:
+            self._deleted.add(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        self.load_all()
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        self.load_all()
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._absent.clear()
+        self._deleted.clear()
+        self.complete = True
+
+    def copy(self) -> Dict[str, Any]:
+        self.load_all()
+        return dict(self._data)
+
+    def __repr__(self) -> str:
+        state = "complete" if self.complete else f"{len(self._data)} loaded"
+        return f"LazyMapping({state})"
+
+
+def lookup_path(mapping: Any, path: str, default: Any) -> Any:
+    """
+    Resolve a dotted path by walking nested values, without indexing the whole configuration.
+    :param mapping: Configuration data.
+    :param path: Dotted path.
+    :param default: Value returned when the path is missing.
+    :return: The value, or default.
+    """
+    value = mapping
+    for part in path.split(SEPARATOR):
+        if isinstance(value, list):
+            try:
+                value = value[int(part)]
+            except (ValueError, IndexError):
+                return default
+        elif hasattr(value, "get"):
+            value = value.get(part, _MISSING)
+            if value is _MISSING:
+                return default
+        else:
+            return default
+    return value
@@ -2,13 +2,32 @@
 Package: config_manager
 Module: yaml_loader
 This module contains the YAMLConfigLoader class that is used to load and save configuration data from YAML files.
+
+The libyaml based `CSafeLoader`/`CSafeDumper` are used when PyYAML was built with libyaml, with the pure-Python
+`SafeLoader`/`SafeDumper` as fallback.
 """
 
-from typing import Any, Dict, Optional
+import io
+import os
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
 
 import yaml
 
 from .base_loader import BaseConfigLoader
+from .streaming import PathType, iter_yaml_items, replace_at_path
+
+HAS_LIBYAML = hasattr(yaml, "CSafeLoader") and hasattr(yaml, "CSafeDumper")
+
+
+def get_yaml_classes(use_libyaml: bool = True):
+    """
+    Get the safe YAML loader and dumper classes.
+    :param use_libyaml: Prefer the libyaml implementation when it is available.
+    :return: Tuple of (loader class, dumper class).
+    """
+    if use_libyaml and HAS_LIBYAML:
+        return yaml.CSafeLoader, yaml.CSafeDumper
+    return yaml.SafeLoader, yaml.SafeDumper
 
 
 class YAMLConfigLoader(BaseConfigLoader):
@@ -16,36 +35,120 @@ class YAMLConfigLoader(BaseConfigLoader):
     Configuration loader for YAML files.
     """
 
+    __slots__ = ("file_path", "yaml_data", "yaml_loader", "yaml_dumper", "root_path")
+
     def __init__(
-        self, file_path: Optional[str] = None, yaml_data: Optional[str] = None
+        self,
+        file_path: Optional[str] = None,
+        yaml_data: Optional[str] = None,
+        use_libyaml: bool = True,
+        root_path: PathType = None,
     ):
         """
         Initialize YAMLConfigLoader with file path and YAML data.
         :param file_path: Path to YAML file.
         :param yaml_data: YAML data.
+        :param use_libyaml: Use the libyaml loader and dumper when available.
+        :param root_path: Dotted path of the mapping to load, parsed incrementally when set.
         """
         self.file_path = file_path
         self.yaml_data = yaml_data
+        self.yaml_loader, self.yaml_dumper = get_yaml_classes(use_libyaml)
+        self.root_path = root_path
+
+    def payload_size(self) -> Optional[int]:
+        if self.file_path and os.path.exists(self.file_path):
+            return os.path.getsize(self.file_path)
+        return None
 
     def load(self) -> Dict[str, Any]:
         """
         Load configuration data from YAML file.
         :return: Dict containing configuration data.
         """
+        if self.root_path:
+            return dict(self.iter_items(self.root_path))
+        if self.yaml_data:
+            return yaml.load(self.yaml_data, Loader=self.yaml_loader) or {}
+        if not self.file_path:
+            raise ValueError("File path must be provided for YAMLConfigLoader.")
+        with open(self.file_path, "r") as file:
+            return yaml.load(file, Loader=self.yaml_loader) or {}
+
+    def iter_items(self, path: PathType = None) -> Iterator[Tuple[str, Any]]:
+        """
+        Incrementally parse the first YAML document, yielding the (key, value) pairs of the mapping at path.
+        Branches outside path are skipped at the event level without being materialized.
+        :param path: Dotted path of the mapping to read, the document root by default.
+        :return: Iterator of (key, value) pairs.
+        """
         if self.yaml_data:
-            return yaml.safe_load(self.yaml_data) or {}
+            yield from iter_yaml_items(
+                io.StringIO(self.yaml_data), path, self.yaml_loader
+            )
+            return
         if not self.file_path:
             raise ValueError("File path must be provided for YAMLConfigLoader.")
         with open(self.file_path, "r") as file:
-            return yaml.safe_load(file) or {}
+            yield from iter_yaml_items(file, path, self.yaml_loader)
 
-    def save(self, config: Dict[str, Any]) -> str | None:
+    def iter_documents(self) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily load each document of a multi-document YAML stream.
+        :return: Iterator of dicts, one per document.
+        """
+        if self.yaml_data:
+            for document in yaml.load_all(self.yaml_data, Loader=self.yaml_loader):
+                yield document or {}
+            return
+        if not self.file_path:
+            raise ValueError("File path must be provided for YAMLConfigLoader.")
+        with open(self.file_path, "r") as file:
+            for document in yaml.load_all(file, Loader=self.yaml_loader):
+                yield document or {}
+
+    def dumps(self, config: Mapping[str, Any]) -> str:
+        """
+        Serialize configuration data to a YAML string.
+        :param config: A mapping containing configuration data.
+        :return: YAML string.
+        """
+        if not isinstance(config, dict):
+            config = dict(config)
+        return yaml.dump(config, Dumper=self.yaml_dumper, default_flow_style=False)
+
+    def save(self, config: Mapping[str, Any]) -> str | None:
         """
         Save configuration data to YAML file.
-        :param config: A dict containing configuration data.
-        :return: None
+        :param config: A mapping containing configuration data.
+        :return: The YAML string if no file path is set, otherwise None.
+        """
+        if not self.file_path:
+            return self.dumps(config)
+        if not isinstance(config, dict):
+            config = dict(config)
+        if self.root_path:
+            # Only a sub-tree was loaded, write it back into the full document.
+            with open(self.file_path, "r") as file:
+                document = yaml.load(file, Loader=self.yaml_loader) or {}
+            config = replace_at_path(document, self.root_path, config)
+        with open(self.file_path, "w") as file:
+            yaml.dump(config, file, Dumper=self.yaml_dumper, default_flow_style=False)
+
+    def save_documents(self, configs: Iterable[Mapping[str, Any]]) -> str | None:
+        """
+        Save several configurations as one multi-document YAML stream, writing each document as it is produced.
+        :param configs: Iterable of mappings, one per document.
+        :return: The YAML string if no file path is set, otherwise None.
         """
+        documents = (
+            config if isinstance(config, dict) else dict(config) for config in configs
+        )
         if not self.file_path:
-            return yaml.dump(config, default_flow_style=False)
+            return yaml.dump_all(
+                documents, Dumper=self.yaml_dumper, default_flow_style=False
+            )
         with open(self.file_path, "w") as file:
-            yaml.dump(config, file, default_flow_style=False)
+            yaml.dump_all(
+                documents, file, Dumper=self.yaml_dumper, default_flow_style=False
+            )
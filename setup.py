@@ -14,7 +14,7 @@ setup(
     author="Will Morris",
     author_email="willmorris188@gmail.com",
     url="https://git.willmo.dev/willmo103/Python-ConfigManager",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     include_package_data=True,  # Include files from MANIFEST.in
     install_requires=[
         "psycopg2-binary>=2.9",
@@ -22,6 +22,12 @@ setup(
         "python-dotenv>=1.0",
     ],
     extras_require={
+        "fast": [
+            "orjson>=3.9",
+        ],
+        "secrets": [
+            "cryptography>=41",
+        ],
         "dev": [
             "black==24.10.0",
             "isort==6.0.0b2",
@@ -30,6 +36,11 @@ setup(
             "pytest-mock==3.14.0",
         ],
     },
+    entry_points={
+        "console_scripts": [
+            "config-manager=config_manager.cli:main",
+        ],
+    },
     python_requires=">=3.7",
     classifiers=[
         "Programming Language :: Python :: 3",
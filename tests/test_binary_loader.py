@@ -0,0 +1,86 @@
+import pytest
+
+from config_manager.binary_loader import (
+    BinaryConfigLoader,
+    BinaryConfigReader,
+    encode_binary,
+)
+from config_manager.configuration import Configuration
+from config_manager.json_loader import JSONConfigLoader
+
+
+@pytest.fixture
+def sample_config():
+    return {
+        "KEY1": "value1",
+        "PORT": 5432,
+        "RATIO": 0.5,
+        "DEBUG": True,
+        "EMPTY": None,
+        "HOSTS": ["a", "b"],
+        "DB": {"host": "localhost", "port": 5432},
+    }
+
+
+def test_round_trip(sample_config, tmp_path):
+    path = tmp_path / "config.bin"
+    loader = BinaryConfigLoader(file_path=str(path))
+    loader.save(sample_config)
+    config = loader.load()
+    assert config.copy() == sample_config
+    assert list(config) == list(sample_config)
+
+
+def test_lookup_missing_key(sample_config):
+    reader = BinaryConfigReader(encode_binary(sample_config))
+    assert reader["PORT"] == 5432
+    assert "MISSING" not in reader
+    with pytest.raises(KeyError):
+        reader["MISSING"]
+
+
+def test_many_keys_hash_index():
+    data = {f"KEY_{i}": f"value_{i}" for i in range(2000)}
+    reader = BinaryConfigReader(encode_binary(data))
+    assert len(reader) == 2000
+    assert reader["KEY_1234"] == "value_1234"
+
+
+def test_save_without_file_returns_bytes(sample_config):
+    data = BinaryConfigLoader(file_path=None).save(sample_config)
+    assert data.startswith(b"CMCB")
+
+
+def test_invalid_file():
+    with pytest.raises(ValueError):
+        BinaryConfigReader(b"NOPE" + b"\x00" * 20)
+
+
+def test_mapping_overlay(sample_config, tmp_path):
+    path = tmp_path / "config.bin"
+    BinaryConfigLoader(file_path=str(path)).save(sample_config)
+    config = BinaryConfigLoader(file_path=str(path)).load()
+    config["NEW"] = "new"
+    config["KEY1"] = "changed"
+    del config["PORT"]
+    assert config["KEY1"] == "changed"
+    assert "PORT" not in config
+    assert len(config) == len(sample_config)
+    config.clear()
+    assert len(config) == 0
+    assert config.copy() == {}
+
+
+def test_configuration_to_binary(sample_config, tmp_path):
+    source = Configuration(JSONConfigLoader(json_data='{"KEY1": "value1"}'))
+    path = tmp_path / "compiled.bin"
+    source.to_binary(str(path))
+    compiled = Configuration(BinaryConfigLoader(str(path)), app_id=source.app_id)
+    assert compiled == source
+    assert compiled.get("KEY1") == "value1"
+    compiled["KEY2"] = "value2"
+    assert BinaryConfigLoader(str(path)).load()["KEY2"] == "value2"
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,143 @@
+import io
+import json
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+import config_manager
+from config_manager.cli import main, parse_backend, read_pairs
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+APP_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+@pytest.fixture
+def database(tmp_path):
+    location = str(tmp_path / "config.db")
+    SQLiteConfigLoader(location, app_name="app", app_id=APP_ID).save(
+        {"DB_HOST": "localhost", "DB_PORT": "5432"}
+    )
+    return location
+
+
+def run(*argv, stdin=""):
+    out = io.StringIO()
+    with patch("sys.stdin", io.StringIO(stdin)):
+        status = main(list(argv), out=out)
+    return status, out.getvalue()
+
+
+def test_parse_backend():
+    assert parse_backend("config.db") == ("sqlite", {"sqlite_location": "config.db"})
+    assert parse_backend("sqlite:///tmp/c") == ("sqlite", {"sqlite_location": "/tmp/c"})
+    assert parse_backend("settings.yml") == ("yaml", {"file_path": "settings.yml"})
+    assert parse_backend("postgresql://db/config")[0] == "postgres"
+    assert parse_backend("http://127.0.0.1:8080")[0] == "http"
+    with pytest.raises(ValueError):
+        parse_backend("config.txt")
+
+
+def test_read_pairs():
+    ndjson = '{"key": "A", "value": 1}\n\n{"B": "x", "C": null}\n'
+    assert list(read_pairs(io.StringIO(ndjson))) == [("A", 1), ("B", "x"), ("C", None)]
+    document = json.dumps({"A": 1, "B": "x"}, indent=2)
+    assert dict(read_pairs(io.StringIO(document))) == {"A": 1, "B": "x"}
+
+
+def test_get(database):
+    assert run("get", database, "--app-id", APP_ID, "DB_HOST") == (0, "localhost\n")
+    status, out = run("get", database, "--app-id", APP_ID, "DB_HOST", "MISSING")
+    assert status == 1
+    assert json.loads(out) == {"key": "DB_HOST", "value": "localhost"}
+    assert run("get", database, "DB_HOST")[0] == 2  # --app-id is required
+
+
+def test_set_from_stdin_is_one_write(database):
+    lines = "".join(
+        json.dumps({"key": f"KEY{index}", "value": str(index)}) + "\n"
+        for index in range(1000)
+    )
+    with patch.object(
+        SQLiteConfigLoader,
+        "save_many",
+        autospec=True,
+        side_effect=SQLiteConfigLoader.save_many,
+    ) as save_many, patch.object(SQLiteConfigLoader, "save") as save:
+        status, _ = run(
+            "set", database, "--app-id", APP_ID, "-", "EXTRA=1", stdin=lines
+        )
+    assert status == 0
+    assert save_many.call_count == 1
+    save.assert_not_called()
+    stored = SQLiteConfigLoader(database, app_name="", app_id=APP_ID).load()
+    assert len(stored) == 1003 and stored["KEY999"] == "999" and stored["EXTRA"] == "1"
+
+
+def test_set_nested_registers_app_and_replaces_subtrees(tmp_path):
+    location = str(tmp_path / "nested.db")
+    db = json.dumps({"db": {"host": "h", "port": 1, "pool": {"size": 5}}})
+    assert run("set", location, "--app-id", "new", "--nested", "-", stdin=db)[0] == 0
+    loader = SQLiteConfigLoader(location, app_name="", app_id="new", nested=True)
+    assert "new" in loader.list_app_ids()
+    assert run("set", location, "--app-id", "new", "--nested", "db.pool=5")[0] == 0
+    assert run("set", location, "--app-id", "new", "--nested", "db.host=x")[0] == 0
+    assert loader.load() == {"db": {"host": "x", "port": "1", "pool": "5"}}
+
+
+def test_dump_and_load_round_trip(database, tmp_path):
+    status, out = run("dump", database, "--app-id", APP_ID, "--format", "ndjson")
+    assert status == 0
+    target = str(tmp_path / "copy.json")
+    assert run("load", target, "-", stdin=out)[0] == 0
+    assert run("dump", target)[1].strip() == json.dumps(
+        {"DB_HOST": "localhost", "DB_PORT": "5432"}, indent=2, sort_keys=True
+    )
+
+
+def test_diff_and_migrate(database, tmp_path):
+    replica = str(tmp_path / "replica.db")
+    status, out = run("diff", database, replica, "--app-id", APP_ID)
+    assert status == 1
+    assert json.loads(out)["removed"] == {"DB_HOST": "localhost", "DB_PORT": "5432"}
+
+    status, out = run("migrate", database, replica)
+    assert status == 0 and json.loads(out)["apps_done"] == 1
+    assert run("diff", database, replica, "--app-id", APP_ID) == (
+        0,
+        json.dumps({"added": {}, "changed": {}, "removed": {}}, indent=2) + "\n",
+    )
+
+
+def test_package_imports_lazily():
+    code = (
+        "import sys, config_manager.cli; "
+        "print(sorted(m for m in ('psycopg2', 'yaml', 'dotenv', 'asyncio') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+    assert config_manager.Configuration.__name__ == "Configuration"
+    assert "SQLiteConfigLoader" in dir(config_manager)
+    with pytest.raises(AttributeError):
+        config_manager.Missing
+
+
+def test_sqlite_commands_do_not_import_psycopg2(tmp_path):
+    location = str(tmp_path / "config.db")
+    code = (
+        "import sys, config_manager.cli; "
+        "from config_manager.sqlite_loader import SQLiteConfigLoader; "
+        f"config_manager.cli.main(['set', 'sqlite:{location}', '--app-id', 'app', 'KEY=1']); "
+        "print('psycopg2' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+if __name__ == "__main__":
+    pytest.main()
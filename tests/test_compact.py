@@ -0,0 +1,92 @@
+import copy
+import pickle
+
+import pytest
+
+from config_manager.compact import CompactMapping, KeyTable, compact
+from config_manager.configuration import Configuration
+from config_manager.json_loader import JSONConfigLoader
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+
+def fresh(key):
+    return "".join(list(key))
+
+
+def test_mapping_behaves_like_dict():
+    mapping = CompactMapping({"A": 1, "B": 2})
+    mapping["C"] = 3
+    del mapping["A"]
+    assert dict(mapping) == {"B": 2, "C": 3}
+    assert len(mapping) == 2
+    assert "A" not in mapping
+    assert mapping.get("A", "default") == "default"
+    with pytest.raises(KeyError):
+        mapping["A"]
+    with pytest.raises(KeyError):
+        del mapping["A"]
+    mapping["A"] = 4
+    assert mapping == {"A": 4, "B": 2, "C": 3}
+    assert mapping.copy() == {"A": 4, "B": 2, "C": 3}
+    mapping.clear()
+    assert len(mapping) == 0 and list(mapping) == []
+
+
+def test_same_schema_shares_interned_keys():
+    first = CompactMapping({fresh("APP_NAME"): "one", fresh("APP_ID"): "1"})
+    second = CompactMapping({fresh("APP_NAME"): "two", fresh("APP_ID"): "2"})
+    assert first.table is second.table
+    first_key, second_key = list(first), list(second)
+    assert first_key[0] is second_key[0]
+    first["EXTRA"] = 1
+    second["EXTRA"] = 2
+    assert first.table is second.table
+    assert first.table is KeyTable.for_keys(["APP_NAME", "APP_ID", "EXTRA"])
+
+
+def test_growing_tables_share_their_key_list():
+    mapping = CompactMapping()
+    for i in range(5000):
+        mapping[f"KEY_{i}"] = i
+    assert len(mapping.table) == 5000
+    assert mapping.table is KeyTable.for_keys(f"KEY_{i}" for i in range(5000))
+    branch = CompactMapping({"KEY_0": 0, "KEY_1": 1})
+    branch["OTHER"] = 2
+    assert dict(branch) == {"KEY_0": 0, "KEY_1": 1, "OTHER": 2}
+    assert "KEY_2" not in branch and branch.get("KEY_2") is None
+    with pytest.raises(KeyError):
+        del branch["KEY_2"]
+    assert mapping["KEY_4999"] == 4999 and "OTHER" not in mapping
+
+
+def test_compact_is_idempotent_and_picklable():
+    mapping = compact({"A": 1})
+    assert compact(mapping) is mapping
+    assert pickle.loads(pickle.dumps(mapping)) == {"A": 1}
+    assert copy.deepcopy(mapping).table is mapping.table
+
+
+def test_configuration_compact():
+    loader = JSONConfigLoader(json_data='{"KEY": "value", "db": {"host": "h"}}')
+    config = Configuration(loader, app_id="test_app_id", compact=True)
+    assert isinstance(config.config, CompactMapping)
+    assert config["KEY"] == "value"
+    assert config.get("db.host") == "h"
+    assert config.to_dict() == {
+        "KEY": "value",
+        "db": {"host": "h"},
+        "APP_ID": "test_app_id",
+    }
+
+
+def test_slotted_objects_keep_attributes_out_of_instance_dict(tmp_path):
+    loader = SQLiteConfigLoader(str(tmp_path / "config.db"), "app", "app-id")
+    config = Configuration(loader, app_id="app-id", config={})
+    with pytest.raises(AttributeError):
+        object.__getattribute__(loader, "__dict__")
+    assert object.__getattribute__(config, "__dict__") == {}
+    assert copy.copy(loader).app_id == "app-id"
+
+
+if __name__ == "__main__":
+    pytest.main()
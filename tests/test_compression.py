@@ -0,0 +1,105 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config_manager import compression
+from config_manager.base_loader import BaseConfigLoader
+from config_manager.compression import compress, decompress, is_compressed
+from config_manager.configuration import Configuration
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+APP_ID = "123e4567-e89b-12d3-a456-426614174000"
+RULES = json.dumps([{"rule": index, "action": "allow"} for index in range(2000)])
+
+
+@pytest.mark.parametrize("algorithm", ["zlib", "lzma"])
+def test_round_trip(algorithm):
+    token = compress(RULES, algorithm)
+    assert token.startswith(f"cmp:v1:{algorithm}:")
+    assert len(token) < len(RULES) / 5
+    assert decompress(token) == RULES
+
+
+def test_incompressible_values_are_kept():
+    assert compress("short") == "short"
+    assert not is_compressed("short")
+    with pytest.raises(ValueError):
+        compress(RULES, "brotli")
+
+
+def test_sqlite_stores_compressed_and_decompresses_once(tmp_path):
+    location = str(tmp_path / "config.db")
+    config = Configuration.initialize(
+        "sqlite", "app", sqlite_location=location, compress_threshold=1024
+    )
+    config["RULES"] = RULES
+    config["SMALL"] = "value"
+    stored = SQLiteConfigLoader(location, app_name="", app_id=config.app_id).load()
+    assert is_compressed(stored["RULES"])
+    assert stored["SMALL"] == "value"
+
+    raw = Configuration.load_existing("sqlite", config.app_id, sqlite_location=location)
+    assert raw["RULES"] == stored["RULES"]
+    loaded = Configuration.load_existing(
+        "sqlite", config.app_id, sqlite_location=location, compress_threshold=1024
+    )
+    with patch.object(
+        compression, "decompress", side_effect=compression.decompress
+    ) as inflate, patch("config_manager.configuration.decompress", inflate):
+        assert loaded["RULES"] == RULES
+        assert loaded.get("RULES") == RULES
+        assert loaded.RULES == RULES
+        assert inflate.call_count == 1
+    # Saving other keys writes the stored token back unchanged.
+    loaded["SMALL"] = "changed"
+    assert (
+        SQLiteConfigLoader(location, app_name="", app_id=config.app_id).load()["RULES"]
+        == stored["RULES"]
+    )
+
+
+def test_set_replaces_cached_value():
+    loader = MagicMock(spec=BaseConfigLoader)
+    loader.load.return_value = {}
+    config = Configuration(loader, app_id="app", compress_threshold=100)
+    config["RULES"] = RULES
+    assert config["RULES"] == RULES
+    config["RULES"] = RULES[:-1] + " "
+    assert config["RULES"] == RULES[:-1] + " "
+    assert is_compressed(config.config["RULES"])
+
+
+def test_compare_and_set_with_compressed_value(tmp_path):
+    config = Configuration.initialize(
+        "sqlite",
+        "app",
+        sqlite_location=str(tmp_path / "config.db"),
+        compress_threshold=100,
+    )
+    config["RULES"] = RULES
+    assert config.compare_and_set("RULES", RULES, "small")
+    assert config["RULES"] == "small"
+
+
+def test_versions_and_exports_are_decompressed(tmp_path):
+    config = Configuration.load_existing(
+        "sqlite",
+        APP_ID,
+        sqlite_location=str(tmp_path / "config.db"),
+        history=True,
+        compress_threshold=100,
+    )
+    config["RULES"] = RULES
+    config["RULES"] = "small"
+    assert is_compressed(config.at_version(1).config["RULES"])
+    assert config.at_version(1)["RULES"] == RULES
+    config["RULES"] = RULES
+    assert config.to_dict()["RULES"] == RULES
+    assert dict(iter(config))["RULES"] == RULES
+    assert json.loads(config.to_json())["RULES"] == RULES
+    assert is_compressed(config.config["RULES"])
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,151 @@
+import sqlite3
+
+import pytest
+
+from config_manager.concurrency import ConfigConflictError, retry_on_conflict
+from config_manager.configuration import Configuration
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+APP_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "config.db")
+
+
+def open_config(db_path, **kwargs):
+    loader = SQLiteConfigLoader(
+        db_path, app_name="TestApp", app_id=APP_ID, optimistic=True, **kwargs
+    )
+    return Configuration(loader, app_id=APP_ID)
+
+
+def test_optimistic_writers_detect_conflicts(db_path):
+    first = open_config(db_path)
+    first.update({"COUNTER": "1", "OTHER": "x"})
+    second = open_config(db_path)
+    first["COUNTER"] = "2"
+    with pytest.raises(ConfigConflictError) as error:
+        second["COUNTER"] = "3"
+    assert error.value.keys == ["COUNTER"]
+    assert first.loader.load()["COUNTER"] == "2"
+    # Keys not changed by the other writer still save.
+    second.reload()
+    second["OTHER"] = "y"
+    first["NEW"] = "z"
+    assert open_config(db_path).to_dict()["OTHER"] == "y"
+
+
+def test_optimistic_save_many_over_existing_rows(db_path):
+    other = "223e4567-e89b-12d3-a456-426614174000"
+    SQLiteConfigLoader(db_path, app_name="", app_id=APP_ID).save_many(
+        {APP_ID: {"KEY": "a"}, other: {"KEY": "b"}}
+    )
+    loader = SQLiteConfigLoader(
+        db_path, app_name="TestApp", app_id=APP_ID, optimistic=True
+    )
+    loader.load()
+    loader.save_many({APP_ID: {"KEY": "a2"}, other: {"KEY": "b2"}})
+    assert loader.load_many([APP_ID, other]) == {
+        APP_ID: {"KEY": "a2"},
+        other: {"KEY": "b2"},
+    }
+    # This loader's application is still checked against its own last load.
+    SQLiteConfigLoader(db_path, app_name="", app_id=APP_ID).save({"KEY": "elsewhere"})
+    with pytest.raises(ConfigConflictError):
+        loader.save_many({APP_ID: {"KEY": "a3"}})
+
+
+def test_bulk_loaded_optimistic_configs_save(db_path):
+    open_config(db_path).update({"COUNTER": "1"})
+    (config,) = Configuration.load_many(
+        "sqlite", [APP_ID], sqlite_location=db_path, optimistic=True
+    )
+    config["COUNTER"] = "2"
+    writer = open_config(db_path)
+    writer["COUNTER"] = "3"
+    with pytest.raises(ConfigConflictError):
+        config["COUNTER"] = "4"
+
+
+def test_optimistic_delete_conflict(db_path):
+    first = open_config(db_path)
+    first["KEY"] = "value"
+    second = open_config(db_path)
+    first["KEY"] = "changed"
+    with pytest.raises(ConfigConflictError):
+        del second["KEY"]
+    second.reload()
+    del second["KEY"]
+    assert "KEY" not in second.loader.load()
+
+
+def test_optimistic_insert_conflict(db_path):
+    first = open_config(db_path)
+    second = open_config(db_path)
+    first["KEY"] = "first"
+    with pytest.raises(ConfigConflictError):
+        second["KEY"] = "second"
+
+
+def test_only_changed_keys_are_written(db_path):
+    config = open_config(db_path)
+    config.update({"A": 1, "B": True})
+    config.update({"A": 1, "B": False})
+    with sqlite3.connect(db_path) as connection:
+        revisions = dict(connection.execute("SELECT key, revision FROM config"))
+    assert revisions == {"APP_ID": 1, "A": 1, "B": 2}
+
+
+def test_compare_and_set(db_path):
+    config = open_config(db_path)
+    assert config.compare_and_set("LEADER", None, "node-1")
+    assert not config.compare_and_set("LEADER", None, "node-2")
+    other = open_config(db_path)
+    assert other.compare_and_set("LEADER", "node-1", "node-2")
+    assert not config.compare_and_set("LEADER", "node-1", "node-3")
+    config.reload()
+    assert config["LEADER"] == "node-2"
+    # The baseline follows successful compare-and-set calls.
+    other["LEADER"] = "node-4"
+    assert other.loader.load()["LEADER"] == "node-4"
+
+
+def test_compare_and_set_records_history(db_path):
+    config = open_config(db_path, history=True)
+    config["KEY"] = "a"
+    assert config.compare_and_set("KEY", "a", "b")
+    assert config.at_version(1)["KEY"] == "a"
+    assert config.at_version(2)["KEY"] == "b"
+
+
+def test_retry_on_conflict(db_path):
+    first = open_config(db_path)
+    first["COUNTER"] = "0"
+    second = open_config(db_path)
+    calls = []
+
+    def increment(config):
+        calls.append(config["COUNTER"])
+        if len(calls) == 1:
+            first["COUNTER"] = "5"
+        config["COUNTER"] = str(int(config["COUNTER"]) + 1)
+
+    retry_on_conflict(second, increment, backoff=0)
+    assert calls == ["0", "5"]
+    assert first.loader.load()["COUNTER"] == "6"
+
+
+def test_retry_on_conflict_gives_up(db_path):
+    config = open_config(db_path)
+
+    def always_conflicts(config):
+        raise ConfigConflictError(APP_ID, ["KEY"])
+
+    with pytest.raises(ConfigConflictError):
+        retry_on_conflict(config, always_conflicts, attempts=2, backoff=0)
+
+
+if __name__ == "__main__":
+    pytest.main()
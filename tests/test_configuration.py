@@ -1,11 +1,15 @@
 # tests/test_configuration.py
 
+import json
 from unittest.mock import MagicMock, patch
 
 import pytest
+import yaml
 
 from config_manager.base_loader import BaseConfigLoader
+from config_manager.compact import CompactMapping
 from config_manager.configuration import Configuration
+from config_manager.sqlite_loader import SQLiteConfigLoader
 
 
 @pytest.fixture
@@ -141,6 +145,83 @@ def test_clear(mock_loader):
     mock_loader.save.assert_called_with(config.config)
 
 
+def test_to_json_string(mock_loader):
+    config = Configuration(loader=mock_loader, app_id="test-app-id")
+    assert config.to_json(backend="json") == json.dumps(config.config, indent=4)
+    assert config.to_json(pretty=False, backend="json") == json.dumps(config.config)
+
+
+def test_to_json_file(mock_loader, tmp_path):
+    config = Configuration(loader=mock_loader, app_id="test-app-id")
+    path = tmp_path / "config.json"
+    assert config.to_json(file_path=str(path)) is None
+    assert json.loads(path.read_text()) == config.config
+
+
+def test_to_yaml_string(mock_loader):
+    config = Configuration(loader=mock_loader, app_id="test-app-id")
+    assert yaml.safe_load(config.to_yaml()) == config.config
+
+
+def test_get_dotted_path(mock_loader):
+    mock_loader.load.return_value = {
+        "db": {"replicas": [{"host": "r1"}, {"host": "r2"}]},
+        "plain.key": "flat",
+    }
+    config = Configuration(loader=mock_loader, app_id="test-app-id")
+    assert config.get("db.replicas.1.host") == "r2"
+    assert config["db.replicas.0.host"] == "r1"
+    assert config.get("plain.key") == "flat"
+    assert config.get("db.missing", "default") == "default"
+    assert config["db.missing"] == ""
+
+
+def test_dotted_path_index_follows_mutations(mock_loader):
+    mock_loader.load.return_value = {"db": {"host": "old"}}
+    config = Configuration(loader=mock_loader, app_id="test-app-id")
+    assert config.get("db.host") == "old"
+    config["db"] = {"host": "new"}
+    assert config.get("db.host") == "new"
+    config.update({"cache": {"ttl": 60}})
+    assert config.get("cache.ttl") == 60
+    del config["db"]
+    assert config.get("db.host") is None
+    config.config = {"db": {"host": "replaced"}}
+    assert config.get("db.host") == "replaced"
+    config.config["db"]["host"] = "in-place"
+    config.reindex()
+    assert config.get("db.host") == "in-place"
+
+
+def test_init_with_preloaded_config(mock_loader):
+    config = Configuration(loader=mock_loader, app_id="test-app-id", config={"A": 1})
+    mock_loader.load.assert_not_called()
+    assert config.config == {"A": 1, "APP_ID": "test-app-id"}
+
+
+def test_load_many_sqlite(tmp_path):
+    db_path = str(tmp_path / "config.db")
+    for app_id in ("app-1", "app-2"):
+        Configuration.load_existing(
+            config_type="sqlite", app_id=app_id, sqlite_location=db_path
+        )["NAME"] = app_id
+    configs = list(
+        Configuration.load_many("sqlite", ["app-1", "app-2"], sqlite_location=db_path)
+    )
+    assert [config.app_id for config in configs] == ["app-1", "app-2"]
+    assert configs[1]["NAME"] == "app-2"
+    configs[1]["NAME"] = "renamed"
+    reloaded = Configuration.load_existing(
+        config_type="sqlite", app_id="app-2", sqlite_location=db_path
+    )
+    assert reloaded["NAME"] == "renamed"
+
+
+def test_load_many_unsupported_type():
+    with pytest.raises(ValueError):
+        list(Configuration.load_many("json", ["app-1"]))
+
+
 # def test_copy(mock_loader):
 #     config = Configuration(loader=mock_loader, app_id="test-app-id")
 #     copied_config = config.copy()
@@ -148,5 +229,55 @@ def test_clear(mock_loader):
 #     assert copied_config.app_id == config.app_id
 #     assert copied_config.loader == config.loader
 
+
+def test_at_version_and_rollback(tmp_path):
+    config = Configuration.load_existing(
+        config_type="sqlite",
+        app_id="history-app",
+        sqlite_location=str(tmp_path / "config.db"),
+        history=True,
+    )
+    config["KEY1"] = "value1"
+    config["KEY1"] = "value2"
+    del config["KEY1"]
+    assert [version for version, _ in config.versions()] == [1, 2, 3]
+    assert config.at_version(1)["KEY1"] == "value1"
+    assert "KEY1" not in config.at_version(3)
+    config.rollback(2)
+    assert config["KEY1"] == "value2"
+    assert config.loader.current_version() == 4
+    assert config.loader.load()["KEY1"] == "value2"
+
+
+def test_rollback_keeps_compact_representation(tmp_path):
+    config = Configuration(
+        SQLiteConfigLoader(
+            str(tmp_path / "config.db"), app_name="", app_id="app", history=True
+        ),
+        app_id="app",
+        compact=True,
+    )
+    config["flags.checkout"] = '{"rollout": 100}'
+    config["flags.checkout"] = '{"rollout": 0}'
+    assert not config.flags.is_enabled("checkout", "user-1")
+    config.rollback(1)
+    assert isinstance(config.config, CompactMapping)
+    assert config.flags.is_enabled("checkout", "user-1")
+
+
+def test_extra_attributes_can_be_set(mock_loader):
+    config = Configuration(mock_loader, app_id="test-app-id")
+    config.owner = "payments"
+    assert config.owner == "payments"
+    assert config.KEY1 == "value1"
+    assert "owner" not in config.config
+
+
+def test_history_requires_supporting_loader(mock_loader):
+    config = Configuration(mock_loader, app_id="test_app_id")
+    with pytest.raises(ValueError):
+        config.at_version(1)
+
+
 if __name__ == "__main__":
     pytest.main()
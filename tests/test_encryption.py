@@ -0,0 +1,155 @@
+import json
+import os
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config_manager.base_loader import BaseConfigLoader
+from config_manager.configuration import Configuration
+from config_manager.encryption import LocalKeyFile, Secret, SecretCache, is_token
+
+
+@pytest.fixture
+def box(tmp_path):
+    pytest.importorskip("cryptography")
+    from config_manager.encryption import SecretBox
+
+    return SecretBox(str(tmp_path / "config.key"), cache_size=2)
+
+
+@pytest.fixture
+def mock_loader():
+    loader = MagicMock(spec=BaseConfigLoader)
+    loader.load.return_value = {}
+    return loader
+
+
+def test_key_file_created_once(tmp_path):
+    path = str(tmp_path / "config.key")
+    key = LocalKeyFile(path).read()
+    assert len(key) == 32
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert LocalKeyFile(path).read() == key
+
+
+def test_missing_key_file_without_create(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        LocalKeyFile(str(tmp_path / "missing.key"), create=False).read()
+
+
+def test_cache_is_bounded_and_zeroized():
+    cache = SecretCache(maxsize=2)
+    first, second, third = bytearray(b"one"), bytearray(b"two"), bytearray(b"three")
+    cache.put("a", first)
+    cache.put("b", second)
+    cache.get("a")
+    cache.put("c", third)
+    assert cache.get("b") is None
+    assert second == bytearray(3)
+    assert len(cache) == 2
+    cache.zeroize()
+    assert len(cache) == 0
+    assert first == bytearray(3) and third == bytearray(5)
+
+
+def test_secret_requires_box(mock_loader):
+    config = Configuration(mock_loader, app_id="test-app-id")
+    with pytest.raises(ValueError):
+        config["API_KEY"] = Secret("s3cr3t")
+    assert repr(Secret("s3cr3t")) == "Secret('***')"
+
+
+def test_encrypt_round_trip(box):
+    token = box.encrypt("API_KEY", "s3cr3t")
+    assert is_token(token)
+    assert "s3cr3t" not in token
+    assert token != box.encrypt("API_KEY", "s3cr3t")
+    assert box.decrypt("API_KEY", token) == "s3cr3t"
+
+
+def test_token_is_bound_to_key(box):
+    token = box.encrypt("API_KEY", "s3cr3t")
+    with pytest.raises(Exception):
+        box.decrypt("OTHER_KEY", token)
+
+
+def test_cached_token_is_bound_to_key(box):
+    token = box.encrypt("API_KEY", "s3cr3t")
+    from cryptography.exceptions import InvalidTag
+
+    assert box.decrypt("API_KEY", token) == "s3cr3t"
+    with pytest.raises(InvalidTag):
+        box.decrypt("OTHER_KEY", token)
+
+
+def test_wrong_master_key(box, tmp_path):
+    from config_manager.encryption import SecretBox
+
+    token = box.encrypt("API_KEY", "s3cr3t")
+    other = SecretBox(str(tmp_path / "other.key"))
+    with pytest.raises(ValueError):
+        other.decrypt("API_KEY", token)
+
+
+def test_decrypted_lazily_once(box, mock_loader):
+    config = Configuration(mock_loader, app_id="test-app-id", secrets=box)
+    config["API_KEY"] = Secret("s3cr3t")
+    config["OTHER"] = Secret("unused")
+    assert is_token(mock_loader.save.call_args[0][0]["API_KEY"])
+    assert len(box.cache) == 0
+    with patch.object(
+        type(box), "_decrypt", autospec=True, side_effect=type(box)._decrypt
+    ) as decrypt:
+        assert config.get("API_KEY") == "s3cr3t"
+        assert config["API_KEY"] == "s3cr3t"
+        assert config.API_KEY == "s3cr3t"
+    decrypt.assert_called_once()
+    assert len(box.cache) == 1
+
+
+def test_replaced_secret_is_zeroized(box, mock_loader):
+    config = Configuration(mock_loader, app_id="test-app-id", secrets=box)
+    config["API_KEY"] = Secret("old")
+    config.get("API_KEY")
+    plaintext = box.cache.get(("API_KEY", config.config["API_KEY"]))
+    config["API_KEY"] = Secret("new")
+    assert plaintext == bytearray(3)
+    assert config.get("API_KEY") == "new"
+    del config["API_KEY"]
+    assert len(box.cache) == 0
+
+
+def test_compare_and_set_secret(box, tmp_path):
+    config = Configuration.load_existing(
+        "sqlite", app_id="app", sqlite_location=str(tmp_path / "config.db"), secrets=box
+    )
+    config["API_KEY"] = Secret("old")
+    assert not config.compare_and_set("API_KEY", "other", Secret("new"))
+    assert config.compare_and_set("API_KEY", "old", Secret("new"))
+    assert is_token(config.config["API_KEY"])
+    assert config.get("API_KEY") == "new"
+    assert config.compare_and_set("API_KEY", Secret("new"), "plain")
+    assert config.get("API_KEY") == "plain"
+
+
+def test_secrets_stored_encrypted(box, tmp_path):
+    db_path = str(tmp_path / "config.db")
+    config = Configuration.load_existing(
+        "sqlite", app_id="app", sqlite_location=db_path, secrets=box
+    )
+    config.update({"API_KEY": Secret("s3cr3t"), "HOST": "localhost"})
+    config.to_json(file_path=str(tmp_path / "config.json"))
+    with sqlite3.connect(db_path) as connection:
+        values = dict(connection.execute("SELECT key, value FROM config"))
+    assert is_token(values["API_KEY"])
+    assert "s3cr3t" not in (tmp_path / "config.json").read_text()
+    assert json.loads((tmp_path / "config.json").read_text())["HOST"] == "localhost"
+    reloaded = Configuration.load_existing(
+        "sqlite", app_id="app", sqlite_location=db_path, secrets=box
+    )
+    assert reloaded.get("API_KEY") == "s3cr3t"
+
+
+if __name__ == "__main__":
+    pytest.main()
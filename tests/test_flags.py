@@ -0,0 +1,221 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config_manager import flags
+from config_manager.base_loader import BaseConfigLoader
+from config_manager.configuration import Configuration
+from config_manager.flags import BUCKETS, FlagSet, bucket, definitions
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+APP_ID = "123e4567-e89b-12d3-a456-426614174000"
+USERS = [f"user-{i}" for i in range(20000)]
+
+
+def test_bucketing_is_deterministic():
+    assert bucket("checkout", "user-1") == bucket("checkout", "user-1")
+    assert 0 <= bucket("checkout", "user-1") < BUCKETS
+    first = FlagSet({"checkout": {"rollout": 30}})
+    second = FlagSet({"checkout": {"rollout": 30}})
+    assert first.evaluate_many("checkout", USERS) == second.evaluate_many(
+        "checkout", USERS
+    )
+    on = [user for user in USERS if first.is_enabled("checkout", user)]
+    assert all(bucket("checkout", user) < 3000 for user in on)
+
+
+@pytest.mark.parametrize("rollout", [0, 5, 50, 100])
+def test_rollout_proportion(rollout):
+    flag_set = FlagSet({"checkout": {"rollout": rollout}})
+    share = sum(flag_set.evaluate_many("checkout", USERS)) / len(USERS)
+    assert share == pytest.approx(rollout / 100, abs=0.02)
+
+
+def test_rollouts_are_nested_and_salted():
+    small = FlagSet({"checkout": {"rollout": 10}})
+    large = FlagSet({"checkout": {"rollout": 40}})
+    other = FlagSet({"search": {"rollout": 10}})
+    on = {user for user in USERS if small.is_enabled("checkout", user)}
+    # Raising the rollout keeps the users already enabled.
+    assert on <= {user for user in USERS if large.is_enabled("checkout", user)}
+    assert on != {user for user in USERS if other.is_enabled("search", user)}
+
+
+def test_allow_deny_and_enabled():
+    flag_set = FlagSet(
+        {
+            "checkout": {"rollout": 0, "allow": ["vip"], "deny": ["banned"]},
+            "everyone": {"deny": ["banned"]},
+            "off": {"enabled": False, "allow": ["vip"]},
+        }
+    )
+    assert flag_set.is_enabled("checkout", "vip")
+    assert not flag_set.is_enabled("checkout", "user-1")
+    assert not flag_set.is_enabled("everyone", "banned")
+    assert flag_set.is_enabled("everyone", "user-1")
+    assert not flag_set.is_enabled("off", "vip")
+    assert not flag_set.is_enabled("missing", "vip")
+    assert flag_set.evaluate_many("missing", ["a", "b"]) == [False, False]
+
+
+def test_first_matching_rule_wins():
+    flag_set = FlagSet(
+        {
+            "checkout": {
+                "rollout": 0,
+                "rules": [
+                    {"attribute": "plan", "in": ["enterprise"], "rollout": 100},
+                    {"attribute": "country", "in": ["DE"], "rollout": 0},
+                    {"attribute": "country", "in": ["DE", "FR"], "rollout": 100},
+                ],
+            }
+        }
+    )
+    assert flag_set.is_enabled("checkout", "u", {"plan": "enterprise", "country": "DE"})
+    assert not flag_set.is_enabled("checkout", "u", {"plan": "free", "country": "DE"})
+    assert flag_set.is_enabled("checkout", "u", {"country": "FR"})
+    assert not flag_set.is_enabled("checkout", "u", {"country": "US"})
+    assert not flag_set.is_enabled("checkout", "u")
+
+
+def test_variants():
+    flag_set = FlagSet(
+        {
+            "color": {"rollout": 50, "variants": {"blue": 75, "green": 25}},
+            "plain": {"rollout": 100},
+        }
+    )
+    results = flag_set.evaluate_many("color", USERS)
+    assert results == [flag_set.variant("color", user) for user in USERS]
+    assert set(results) == {"blue", "green", None}
+    assert results.count(None) / len(USERS) == pytest.approx(0.5, abs=0.02)
+    assert results.count("blue") / results.count("green") == pytest.approx(3, rel=0.1)
+    assert flag_set.variant("plain", "user-1") is None
+    assert flag_set.is_enabled("color", "user-1") == (
+        flag_set.variant("color", "user-1") is not None
+    )
+
+
+def test_batch_matches_single_evaluation():
+    flag_set = FlagSet(
+        {
+            "checkout": {
+                "rollout": 20,
+                "allow": ["user-3"],
+                "rules": [{"attribute": "country", "in": ["DE"], "rollout": 60}],
+            }
+        }
+    )
+    attributes = {"country": "DE"}
+    assert flag_set.evaluate_many("checkout", USERS, attributes) == [
+        flag_set.is_enabled("checkout", user, attributes) for user in USERS
+    ]
+
+
+@pytest.mark.parametrize(
+    "definition",
+    [
+        {"rollout": 101},
+        {"rollout": "many"},
+        {"rules": [{"in": ["DE"]}]},
+        {"variants": {"blue": 0}},
+        {"enabled": "maybe"},
+        {"enabled": 2},
+        "{not json",
+    ],
+)
+def test_invalid_definitions(definition):
+    with pytest.raises(ValueError):
+        FlagSet({"checkout": definition})
+
+
+@pytest.mark.parametrize(
+    "enabled, expected",
+    [
+        (True, True),
+        ("true", True),
+        ("On", True),
+        (1, True),
+        ("0", False),
+        ("no", False),
+    ],
+)
+def test_enabled_is_parsed_strictly(enabled, expected):
+    flag_set = FlagSet({"checkout": {"enabled": enabled}})
+    assert flag_set.is_enabled("checkout", "user-1") is expected
+
+
+def test_ids_and_rule_values_compared_as_strings():
+    flag_set = FlagSet(
+        {
+            "checkout": {
+                "rollout": 0,
+                "allow": [42],
+                "deny": ["7"],
+                "rules": [{"attribute": "tier", "in": [1], "rollout": 100}],
+            }
+        }
+    )
+    assert flag_set.is_enabled("checkout", "42")
+    assert flag_set.is_enabled("checkout", 42)
+    assert not flag_set.is_enabled("checkout", 7, {"tier": 1})
+    assert flag_set.is_enabled("checkout", "user-1", {"tier": "1"})
+
+
+def test_flags_from_nested_sqlite(tmp_path):
+    location = str(tmp_path / "config.db")
+    definition = {
+        "enabled": False,
+        "rollout": 0,
+        "allow": [1],
+        "rules": [{"attribute": "plan", "in": ["pro"], "rollout": 100}],
+    }
+    SQLiteConfigLoader(location, app_name="app", app_id=APP_ID, nested=True).save(
+        {"flags": {"off": definition, "on": {**definition, "enabled": True}}}
+    )
+    config = Configuration.load_existing(
+        "sqlite", APP_ID, sqlite_location=location, nested=True
+    )
+    assert not config.flags.is_enabled("off", 1)
+    assert config.flags.is_enabled("on", 1)
+    assert config.flags.is_enabled("on", "user-1", {"plan": "pro"})
+    assert not config.flags.is_enabled("on", "user-1", {"plan": "free"})
+
+
+def test_definitions_from_nested_and_prefixed_keys():
+    config = {
+        "flags": {"checkout": {"rollout": 10}},
+        "flags.search": json.dumps({"rollout": 20}),
+        "flagship": "ignored",
+    }
+    assert set(definitions(config)) == {"checkout", "search"}
+    assert set(FlagSet.from_config(config).flags) == {"checkout", "search"}
+
+
+def test_configuration_compiles_flags_once_per_load():
+    loader = MagicMock(spec=BaseConfigLoader)
+    loader.load.return_value = {"flags.checkout": json.dumps({"rollout": 100})}
+    config = Configuration(loader, app_id=APP_ID)
+    with patch.object(flags, "CompiledFlag", wraps=flags.CompiledFlag) as compile:
+        assert config.flags.is_enabled("checkout", "user-1")
+        assert config.flags.is_enabled("checkout", "user-2")
+        config["OTHER"] = "value"
+        config.flags
+        assert compile.call_count == 1
+
+        config["flags.checkout"] = json.dumps({"rollout": 0})
+        assert not config.flags.is_enabled("checkout", "user-1")
+        assert compile.call_count == 2
+
+        loader.load.return_value = {"flags.search": json.dumps({"rollout": 100})}
+        config.reload()
+        assert "checkout" not in config.flags
+        assert config.flags.is_enabled("search", "user-1")
+
+        del config["flags.search"]
+        assert len(config.flags) == 0
+
+
+if __name__ == "__main__":
+    pytest.main()
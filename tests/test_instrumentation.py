@@ -0,0 +1,136 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from config_manager.base_loader import BaseConfigLoader
+from config_manager.configuration import Configuration
+from config_manager.instrumentation import (
+    LoggingObserver,
+    MetricsObserver,
+    Observer,
+    OpenTelemetryObserver,
+    enabled,
+    observe,
+)
+from config_manager.json_loader import JSONConfigLoader
+
+
+class RecordingObserver(Observer):
+    def __init__(self):
+        self.events = []
+
+    def on_event(self, event):
+        self.events.append(event)
+
+
+class MemoryLoader(BaseConfigLoader):
+    def __init__(self):
+        self.data = {"KEY1": "value1"}
+
+    def load(self):
+        return dict(self.data)
+
+    def save(self, config):
+        self.data = dict(config)
+
+
+class ChildLoader(MemoryLoader):
+    def load(self):
+        return super().load()
+
+
+class FailingLoader(MemoryLoader):
+    def save(self, config):
+        raise RuntimeError("save failed")
+
+
+def test_disabled_by_default():
+    assert not enabled()
+    assert MemoryLoader().load() == {"KEY1": "value1"}
+
+
+def test_loader_events():
+    recorder = RecordingObserver()
+    with observe(recorder):
+        assert enabled()
+        loader = MemoryLoader()
+        loader.load()
+        loader.save({"A": 1, "B": 2})
+    assert not enabled()
+    assert [event.name for event in recorder.events] == [
+        "MemoryLoader.load",
+        "MemoryLoader.save",
+    ]
+    assert recorder.events[1].key_count == 2
+    assert recorder.events[1].duration_ns >= 0
+
+
+def test_super_calls_reported_once():
+    recorder = RecordingObserver()
+    with observe(recorder):
+        ChildLoader().load()
+    assert [event.name for event in recorder.events] == ["ChildLoader.load"]
+
+
+def test_errors_are_reported():
+    recorder = RecordingObserver()
+    with observe(recorder):
+        with pytest.raises(RuntimeError):
+            FailingLoader().save({})
+    assert isinstance(recorder.events[0].error, RuntimeError)
+
+
+def test_configuration_mutations_and_saves():
+    metrics = MetricsObserver()
+    with observe(metrics):
+        config = Configuration(MemoryLoader(), app_id="app")
+        config["KEY2"] = "value2"
+        config.update({"KEY3": "a", "KEY4": "b"})
+        del config["KEY2"]
+        config.clear()
+    snapshot = metrics.snapshot()
+    assert snapshot["MemoryLoader.load"]["count"] == 1
+    assert snapshot["MemoryLoader.save"]["count"] == 4
+    assert snapshot["Configuration.set"]["count"] == 1
+    assert snapshot["Configuration.update"]["keys"] == 2
+    assert snapshot["Configuration.delete"]["count"] == 1
+    assert snapshot["Configuration.clear"]["count"] == 1
+
+
+def test_file_size_reported(tmp_path):
+    recorder = RecordingObserver()
+    path = tmp_path / "config.json"
+    with observe(recorder):
+        JSONConfigLoader(file_path=str(path)).save({"KEY": "value"})
+    assert recorder.events[0].bytes == path.stat().st_size
+
+
+def test_broken_observer_does_not_break_loader():
+    class BrokenObserver(Observer):
+        def on_event(self, event):
+            raise ValueError("boom")
+
+    with observe(BrokenObserver()):
+        assert MemoryLoader().load() == {"KEY1": "value1"}
+
+
+def test_logging_observer(caplog):
+    with caplog.at_level("DEBUG", logger="config_manager"):
+        with observe(LoggingObserver()):
+            MemoryLoader().load()
+    assert "MemoryLoader.load took" in caplog.text
+
+
+def test_opentelemetry_observer():
+    tracer = MagicMock()
+    span = tracer.start_span.return_value
+    with observe(OpenTelemetryObserver(tracer=tracer)):
+        MemoryLoader().save({"A": 1})
+    name = tracer.start_span.call_args.args[0]
+    assert name == "config_manager.MemoryLoader.save"
+    span.set_attribute.assert_any_call("config_manager.key_count", 1)
+    span.end.assert_called_once()
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,113 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from config_manager.base_loader import BaseConfigLoader
+from config_manager.configuration import Configuration
+from config_manager.interpolation import InterpolationError, Interpolator, parse
+
+
+def make_config(data):
+    loader = MagicMock(spec=BaseConfigLoader)
+    loader.load.return_value = dict(data)
+    return Configuration(loader, app_id="app", interpolate=True)
+
+
+def test_parse():
+    assert parse("plain") is None
+    assert parse("${HOST}:${PORT:-5432}") == [("HOST", None), ":", ("PORT", "5432")]
+    assert parse("cost $${PRICE}") == ["cost ${PRICE}"]
+
+
+def test_resolve_and_defaults():
+    config = make_config(
+        {
+            "HOST": "db.local",
+            "PORT": 5432,
+            "DSN": "postgres://${HOST}:${PORT}/${NAME:-app}",
+            "DB_PORT": "${PORT}",
+            "LITERAL": "$${HOST}",
+        }
+    )
+    assert config["DSN"] == "postgres://db.local:5432/app"
+    assert config.get("DB_PORT") == 5432  # a single reference keeps its type
+    assert config.DB_PORT == "5432"
+    assert config["LITERAL"] == "${HOST}"
+    assert config.config["DSN"] == "postgres://${HOST}:${PORT}/${NAME:-app}"
+
+
+def test_chained_and_dotted_references():
+    config = make_config(
+        {"db": {"host": "db.local"}, "HOST": "${db.host}", "URL": "http://${HOST}/"}
+    )
+    assert config["URL"] == "http://db.local/"
+    config["db"] = {"host": "other"}
+    assert config["URL"] == "http://other/"
+
+
+def test_cycle_rejected_at_load():
+    with pytest.raises(InterpolationError, match="A -> B -> A|B -> A -> B"):
+        make_config({"A": "${B}", "B": "${A}"})
+
+
+def test_cycle_rejected_on_set_keeps_state():
+    config = make_config({"A": "${B}", "B": "x"})
+    with pytest.raises(InterpolationError):
+        config["B"] = "${A}"
+    assert config.config["B"] == "x"
+    assert config["A"] == "x"
+    config.loader.save.assert_not_called()
+
+
+def test_update_checks_merged_values():
+    config = make_config({"A": "${B}", "B": "x"})
+    config.update({"B": "${C}", "C": "y"})
+    assert config["A"] == "y"
+    with pytest.raises(InterpolationError):
+        config.update({"C": "${A}"})
+    assert config.config["C"] == "y"
+
+
+def test_failed_update_rolls_back_applied_keys():
+    config = make_config({"A": "x", "B": "y"})
+    assert config["A"] == "x"
+    with patch.object(Interpolator, "__init__") as rebuild:
+        with pytest.raises(InterpolationError):
+            config.update({"NEW": "${A}", "A": "${B}", "B": "${A}"})
+        rebuild.assert_not_called()
+    assert config.config["A"] == "x" and "NEW" not in config
+    config["B"] = "${A}"
+    assert config["B"] == "x"
+    config.loader.save.assert_called_once()
+
+
+def test_set_invalidates_only_dependents():
+    config = make_config(
+        {"HOST": "a", "PORT": "1", "URL": "${HOST}", "OTHER": "${PORT}"}
+    )
+    assert config["URL"] == "a" and config["OTHER"] == "1"
+    with patch.object(
+        Interpolator, "_expand", autospec=True, side_effect=Interpolator._expand
+    ) as expand:
+        config["HOST"] = "b"
+        assert config["URL"] == "b"
+        assert config["OTHER"] == "1"
+    assert expand.call_count == 1
+
+
+def test_delete_and_replace():
+    config = make_config({"HOST": "a", "URL": "${HOST}/x"})
+    del config["HOST"]
+    assert config["URL"] == "/x"
+    config.config = {"HOST": "c", "URL": "${HOST}!"}
+    assert config["URL"] == "c!"
+
+
+def test_disabled_by_default():
+    loader = MagicMock(spec=BaseConfigLoader)
+    loader.load.return_value = {"URL": "${HOST}"}
+    assert Configuration(loader, app_id="app")["URL"] == "${HOST}"
+
+
+if __name__ == "__main__":
+    pytest.main()
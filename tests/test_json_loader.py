@@ -2,7 +2,12 @@ import json
 
 import pytest
 
-from config_manager.json_loader import JSONConfigLoader
+from config_manager.json_loader import (
+    JSON_BACKENDS,
+    STDLIB_BACKEND,
+    JSONConfigLoader,
+    get_json_backend,
+)
 
 
 @pytest.fixture
@@ -40,5 +45,47 @@ def test_save_json_without_file_returns_json(sample_json):
     assert config == json.dumps(sample_json)
 
 
+@pytest.mark.parametrize("backend", sorted(JSON_BACKENDS))
+def test_backends_round_trip(backend, sample_json, tmp_path):
+    json_path = tmp_path / "config.json"
+    loader = JSONConfigLoader(file_path=str(json_path), backend=backend)
+    loader.save(sample_json)
+    assert loader.load() == sample_json
+    assert json.loads(loader.dumps(sample_json)) == sample_json
+
+
+def test_compact_file_mode(sample_json, tmp_path):
+    json_path = tmp_path / "config.json"
+    JSONConfigLoader(file_path=str(json_path), backend="json", pretty=False).save(
+        sample_json
+    )
+    assert json_path.read_text() == json.dumps(sample_json)
+
+
+def test_default_output_matches_stdlib(sample_json, tmp_path):
+    json_path = tmp_path / "config.json"
+    config = dict(sample_json, ratio=float("nan"))
+    JSONConfigLoader(file_path=str(json_path)).save(config)
+    assert json_path.read_text() == json.dumps(config, indent=4)
+
+
+def test_auto_backend_prefers_fast_engine():
+    backend = get_json_backend()
+    if "orjson" in JSON_BACKENDS:
+        assert backend.name == "orjson"
+    elif "ujson" not in JSON_BACKENDS:
+        assert backend is STDLIB_BACKEND
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_json_backend("simdjson")
+
+
+def test_fast_backend_falls_back_for_unsupported_values():
+    backend = get_json_backend()
+    assert json.loads(backend.dumps({"big": 2**70})) == {"big": 2**70}
+
+
 if __name__ == "__main__":
     pytest.main()
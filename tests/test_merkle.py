@@ -0,0 +1,106 @@
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from config_manager.configuration import Configuration
+from config_manager.json_loader import JSONConfigLoader
+from config_manager.merkle import (
+    ConfigDiff,
+    bucket_hashes,
+    diff,
+    key_bucket,
+    root_hash,
+    sync,
+)
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+
+@pytest.fixture
+def primary(tmp_path):
+    loader = SQLiteConfigLoader(str(tmp_path / "primary.db"), app_name="", app_id="app")
+    loader.save({f"KEY{index}": f"value{index}" for index in range(200)})
+    return loader
+
+
+@pytest.fixture
+def replica(tmp_path):
+    return SQLiteConfigLoader(str(tmp_path / "replica.db"), app_name="", app_id="app")
+
+
+def test_bucket_hashes_are_order_independent():
+    rows = {f"KEY{index}": str(index) for index in range(50)}
+    reversed_rows = dict(reversed(list(rows.items())))
+    assert bucket_hashes(rows) == bucket_hashes(reversed_rows)
+    assert root_hash(bucket_hashes(rows)) == root_hash(bucket_hashes(reversed_rows))
+    rows["KEY0"] = "changed"
+    changed = bucket_hashes(rows)
+    assert [b for b in changed if changed[b] != bucket_hashes(reversed_rows)[b]] == [
+        key_bucket("KEY0")
+    ]
+
+
+def test_sqlite_hashes_match_memory(primary):
+    assert primary.bucket_hashes() == bucket_hashes(primary.load())
+    assert primary.bucket_hashes(buckets=8) == bucket_hashes(primary.load(), 8)
+
+
+def test_sync_writes_only_changed_rows(primary, replica):
+    changes = sync(primary, replica)
+    assert len(changes.added) == 200
+    assert replica.load() == primary.load()
+    assert not sync(primary, replica)
+
+    primary.save({"KEY1": "new", "KEY300": "added"})
+    with sqlite3.connect(primary.sqlite_location) as connection:
+        connection.execute("DELETE FROM config WHERE key = 'KEY2'")
+    changes = sync(primary, replica)
+    assert changes == ConfigDiff(
+        added={"KEY300": "added"},
+        removed={"KEY2": "value2"},
+        changed={"KEY1": ("value1", "new")},
+    )
+    assert replica.load() == primary.load()
+    with sqlite3.connect(replica.sqlite_location) as connection:
+        revisions = dict(connection.execute("SELECT key, revision FROM config"))
+    assert revisions["KEY1"] == 2
+    assert revisions["KEY3"] == 1
+
+
+def test_rows_read_only_for_changed_buckets(primary, replica):
+    sync(primary, replica)
+    primary.save({"KEY5": "new"})
+    rows = []
+    rows_in_buckets = SQLiteConfigLoader.rows_in_buckets
+
+    def recording(loader, bucket_ids, buckets=64):
+        result = rows_in_buckets(loader, bucket_ids, buckets)
+        rows.append(len(result))
+        return result
+
+    with patch.object(SQLiteConfigLoader, "rows_in_buckets", recording):
+        assert diff(replica, primary).changed == {"KEY5": ("value5", "new")}
+    assert len(rows) == 2
+    assert max(rows) < 20
+
+
+def test_configuration_diff(primary, tmp_path):
+    config = Configuration(primary, app_id="app")
+    assert config.diff(primary) == ConfigDiff(removed={"APP_ID": "app"})
+    other = {**config.to_dict(), "KEY0": "other", "NEW": 1}
+    del other["KEY1"]
+    changes = config.diff(other)
+    assert changes.added == {"NEW": "1"}
+    assert changes.removed == {"KEY1": "value1"}
+    assert changes.changed == {"KEY0": ("value0", "other")}
+
+
+def test_sync_to_single_file_loader(primary, tmp_path):
+    target = JSONConfigLoader(str(tmp_path / "config.json"))
+    target.save({"KEY0": "stale", "EXTRA": "x"})
+    sync(primary, target)
+    assert target.load() == primary.load()
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,100 @@
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from config_manager.migrations import (
+    SQLITE_MIGRATIONS,
+    Migration,
+    migrate_sqlite,
+    reset_schema_cache,
+)
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    reset_schema_cache()
+    return str(tmp_path / "config.db")
+
+
+def schema_versions(db_path):
+    with sqlite3.connect(db_path) as connection:
+        return [
+            row[0] for row in connection.execute("SELECT version FROM schema_version")
+        ]
+
+
+def test_fresh_database_is_migrated(db_path):
+    assert migrate_sqlite(db_path) == SQLITE_MIGRATIONS[-1].version
+    assert schema_versions(db_path) == [m.version for m in SQLITE_MIGRATIONS]
+    with sqlite3.connect(db_path) as connection:
+        indexes = [row[1] for row in connection.execute("PRAGMA index_list(config)")]
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(config)")]
+    assert "config_app_updated" in indexes
+    assert "revision" in columns
+
+
+def test_runs_once_per_process(db_path):
+    SQLiteConfigLoader(db_path, app_name="App")
+    with patch("config_manager.migrations.sqlite3.connect") as mock_connect:
+        SQLiteConfigLoader(db_path, app_name="App")
+        SQLiteConfigLoader(db_path, app_name="Other")
+    mock_connect.assert_not_called()
+
+
+def test_current_schema_skips_ddl(db_path):
+    migrate_sqlite(db_path)
+    reset_schema_cache()
+    statements = []
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    connection.set_trace_callback(statements.append)
+    with patch("config_manager.migrations.sqlite3.connect", return_value=connection):
+        migrate_sqlite(db_path)
+    assert len(statements) == 1
+    assert statements[0].startswith("SELECT")
+
+
+def test_existing_database_is_adopted(db_path):
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            "CREATE TABLE applications (app_id TEXT PRIMARY KEY, app_name TEXT UNIQUE NOT NULL)"
+        )
+        connection.execute(
+            "CREATE TABLE config (id INTEGER PRIMARY KEY AUTOINCREMENT, app_id TEXT NOT NULL,"
+            " key TEXT NOT NULL, value TEXT, created_at TIMESTAMP, updated_at TIMESTAMP,"
+            " UNIQUE (app_id, key))"
+        )
+        connection.execute(
+            "INSERT INTO config (app_id, key, value) VALUES ('app', 'KEY', 'value')"
+        )
+    loader = SQLiteConfigLoader(db_path, app_name="App", app_id="app")
+    assert loader.load() == {"KEY": "value"}
+    assert schema_versions(db_path) == [m.version for m in SQLITE_MIGRATIONS]
+
+
+def test_new_migrations_are_applied(db_path):
+    migrate_sqlite(db_path)
+    reset_schema_cache()
+    extra = Migration(
+        SQLITE_MIGRATIONS[-1].version + 1,
+        "add tags",
+        ["ALTER TABLE applications ADD COLUMN tags TEXT;"],
+    )
+    migrate_sqlite(db_path, SQLITE_MIGRATIONS + [extra])
+    assert schema_versions(db_path)[-1] == extra.version
+
+
+def test_failed_migration_rolls_back(db_path):
+    broken = Migration(1, "broken", ["CREATE TABLE t (id INTEGER);", "NOT SQL;"])
+    with pytest.raises(sqlite3.OperationalError):
+        migrate_sqlite(db_path, [broken])
+    with sqlite3.connect(db_path) as connection:
+        tables = [
+            row[0] for row in connection.execute("SELECT name FROM sqlite_master")
+        ]
+    assert "t" not in tables
+
+
+if __name__ == "__main__":
+    pytest.main()
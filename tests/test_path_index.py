@@ -0,0 +1,54 @@
+import pytest
+
+from config_manager.path_index import PathIndex, flatten, unflatten
+
+
+@pytest.fixture
+def nested_config():
+    return {
+        "db": {
+            "host": "localhost",
+            "replicas": [{"host": "r1"}, {"host": "r2", "port": 5433}],
+        },
+        "name": "demo",
+        "empty": {},
+    }
+
+
+def test_index_lookup(nested_config):
+    index = PathIndex(nested_config)
+    assert index.get("db.replicas.1.host") == "r2"
+    assert index.get("db.replicas.0") == {"host": "r1"}
+    assert index.get("db.missing", "default") == "default"
+    assert "name" not in index
+
+
+def test_index_incremental_update(nested_config):
+    index = PathIndex(nested_config)
+    index.add("db", {"host": "other"})
+    assert index.get("db.host") == "other"
+    assert "db.replicas.0.host" not in index
+    index.remove("db")
+    assert len(index) == 0
+
+
+def test_flatten_unflatten_round_trip(nested_config):
+    flat = flatten(nested_config)
+    assert flat == {
+        "db.host": "localhost",
+        "db.replicas.0.host": "r1",
+        "db.replicas.1.host": "r2",
+        "db.replicas.1.port": 5433,
+        "name": "demo",
+        "empty": "{}",
+    }
+    assert unflatten(flat) == nested_config
+
+
+def test_unflatten_conflict():
+    with pytest.raises(ValueError):
+        unflatten({"db": "x", "db.host": "y"})
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,74 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from config_manager.json_loader import JSONConfigLoader
+from config_manager.pipeline import Checkpoint, migrate
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+
+@pytest.fixture
+def source(tmp_path):
+    loader = SQLiteConfigLoader(str(tmp_path / "source.db"), app_name="")
+    loader.save_many(
+        {
+            f"app-{index:03d}": {"INDEX": index, "NAME": f"app {index}"}
+            for index in range(25)
+        }
+    )
+    return loader
+
+
+@pytest.fixture
+def target(tmp_path):
+    return SQLiteConfigLoader(str(tmp_path / "target.db"), app_name="")
+
+
+def test_save_many_and_list_app_ids(source):
+    app_ids = source.list_app_ids()
+    assert len(app_ids) == 25
+    assert source.for_app("app-003").load() == {"INDEX": "3", "NAME": "app 3"}
+
+
+def test_migrate_all_apps(source, target):
+    seen = []
+    stats = migrate(
+        source, target, batch_size=4, workers=3, buffer=2, progress=seen.append
+    )
+    assert stats.apps_done == 25
+    assert stats.batches == 7
+    assert stats.keys == 50
+    assert len(seen) == 7
+    assert target.list_app_ids() == source.list_app_ids()
+    assert target.load_many(["app-007"]) == {"app-007": {"INDEX": "7", "NAME": "app 7"}}
+
+
+def test_migrate_resumes_from_checkpoint(source, target, tmp_path):
+    checkpoint = str(tmp_path / "migration.checkpoint")
+    Checkpoint(checkpoint).add(f"app-{index:03d}" for index in range(20))
+    stats = migrate(source, target, batch_size=10, checkpoint=checkpoint)
+    assert stats.apps_skipped == 20
+    assert stats.apps_done == 5
+    assert len(target.list_app_ids()) == 5
+    assert len(Checkpoint(checkpoint).done) == 25
+    assert migrate(source, target, checkpoint=checkpoint).apps_done == 0
+
+
+def test_migrate_stops_on_error(source):
+    target = MagicMock(spec=SQLiteConfigLoader)
+    target.save_many.side_effect = [None, RuntimeError("target down")]
+    with pytest.raises(RuntimeError):
+        migrate(source, target, batch_size=5, workers=1)
+    assert target.save_many.call_count == 2
+
+
+def test_migrate_single_app_loaders(source, tmp_path):
+    json_path = str(tmp_path / "config.json")
+    migrate(source, JSONConfigLoader(json_path), app_ids=["app-001"])
+    assert JSONConfigLoader(json_path).load() == {"INDEX": "1", "NAME": "app 1"}
+    with pytest.raises(ValueError):
+        migrate(source, JSONConfigLoader(json_path), batch_size=5)
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+import config_manager
+from config_manager.base_loader import BaseConfigLoader
+from config_manager.configuration import Configuration
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+
+class MemoryLoader(BaseConfigLoader):
+    def __init__(self):
+        self.data = {"KEY1": "value1"}
+
+    def load(self):
+        return dict(self.data)
+
+    def save(self, config):
+        self.data = dict(config)
+
+
+@pytest.fixture
+def config():
+    return Configuration(MemoryLoader(), app_id="test_app_id")
+
+
+def test_profile_write_amplification(config):
+    with config_manager.profile() as p:
+        for i in range(3):
+            config[f"KEY{i}"] = i
+        config.update({"A": 1, "B": 2})
+    summary = p.summary()
+    assert summary["mutations"] == 4
+    assert summary["backend_writes"] == 4
+    assert summary["write_amplification"] == 1.0
+    # Each save writes the whole dict: APP_ID, KEY0-2, KEY1 from load, A, B.
+    assert summary["keys_written_per_key_changed"] > 1
+    assert summary["loader_calls"]["MemoryLoader.save"]["count"] == 4
+    assert summary["duration_ms"] > 0
+
+
+def test_profile_hottest_keys_and_call_sites(config):
+    with config_manager.profile(top=1) as p:
+        for _ in range(5):
+            config["HOT"] = "value"
+        config["COLD"] = "value"
+    summary = p.summary()
+    assert [item["key"] for item in summary["hottest_keys"]] == ["HOT"]
+    assert summary["hottest_keys"][0]["writes"] == 5
+    site = summary["call_sites"][0]
+    assert __file__ in site["site"]
+    assert site["writes"] == 5
+    assert p.loader_calls[0]["stack"][0].startswith(__file__)
+
+
+def test_profile_unattributed_writes(config):
+    with config_manager.profile() as p:
+        config.loader.save(config.config)
+        config.loader.load()
+    summary = p.summary()
+    assert summary["mutations"] == 0
+    assert summary["unattributed_writes"] == 1
+    assert summary["backend_reads"] == 1
+    assert summary["write_amplification"] is None
+
+
+def test_profile_classifies_bulk_writes(tmp_path):
+    loader = SQLiteConfigLoader(str(tmp_path / "config.db"), "app", "app-id")
+    with config_manager.profile() as p:
+        loader.compare_and_set("KEY", None, "value")
+        loader.apply_changes({"A": "1", "B": "2"}, ["KEY"])
+        loader.save_many({"app-id": {"C": "3"}, "other": {"D": "4", "E": "5"}})
+        loader.load_keys(["A"])
+        loader.load()
+    summary = p.summary()
+    assert summary["backend_writes"] == 3
+    assert summary["backend_reads"] == 2
+    assert summary["loader_calls"]["SQLiteConfigLoader.apply_changes"]["keys"] == 3
+    assert summary["loader_calls"]["SQLiteConfigLoader.save_many"]["keys"] == 3
+
+
+def test_profile_compare_and_set_fallback_is_a_full_save(config):
+    config["KEY2"] = "value2"
+    with config_manager.profile() as p:
+        assert config.compare_and_set("KEY2", "value2", "new")
+    summary = p.summary()
+    assert summary["mutations"] == 1
+    assert p.mutations[0]["operation"] == "compare_and_set"
+    assert p.mutations[0]["writes"] == 1
+    assert p.mutations[0]["keys_written"] == len(config.config)
+    assert config.loader.data["KEY2"] == "new"
+
+
+def test_profile_stops_recording(config):
+    with config_manager.profile() as p:
+        config["KEY"] = "value"
+    config["KEY"] = "other"
+    assert len(p.mutations) == 1
+
+
+def test_profile_to_json(config, tmp_path):
+    with config_manager.profile() as p:
+        config["KEY"] = "value"
+    data = json.loads(p.to_json())
+    assert data["summary"]["backend_writes"] == 1
+    assert data["mutations"][0]["keys"] == ["KEY"]
+    file_path = tmp_path / "profile.json"
+    assert p.to_json(str(file_path)) is None
+    assert json.loads(file_path.read_text()) == json.loads(p.to_json())
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from config_manager.base_loader import BaseConfigLoader
+from config_manager.configuration import Configuration
+from config_manager.registry import ConfigurationRegistry, estimate_size
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "config.db")
+    for index in range(5):
+        config = Configuration.load_existing(
+            config_type="sqlite", app_id=f"app-{index}", sqlite_location=path
+        )
+        config.update({"APP_NAME": f"App{index}", "VALUE": str(index)})
+    return path
+
+
+def test_get_loads_and_caches(db_path):
+    registry = ConfigurationRegistry("sqlite", sqlite_location=db_path)
+    config = registry.get("app-1")
+    assert config["VALUE"] == "1"
+    assert registry.get("app-1") is config
+    assert registry.metrics()["hits"] == 1
+    assert registry.metrics()["misses"] == 1
+    assert registry.get_by_name("App1") is config
+
+
+def test_lru_eviction_by_count(db_path):
+    registry = ConfigurationRegistry("sqlite", sqlite_location=db_path, max_tenants=2)
+    registry.get("app-0")
+    registry.get("app-1")
+    registry.get("app-0")
+    registry.get("app-2")
+    assert "app-1" not in registry
+    assert "app-0" in registry and "app-2" in registry
+    assert registry.metrics()["evictions"] == 1
+    with pytest.raises(KeyError):
+        registry.get_by_name("App1")
+
+
+def test_eviction_by_memory_budget(db_path):
+    registry = ConfigurationRegistry("sqlite", sqlite_location=db_path)
+    size = estimate_size(registry.get("app-0").config)
+    registry = ConfigurationRegistry(
+        "sqlite", sqlite_location=db_path, max_bytes=int(size * 2.5)
+    )
+    registry.preload([f"app-{index}" for index in range(5)])
+    metrics = registry.metrics()
+    assert metrics["resident_tenants"] == 2
+    assert metrics["resident_bytes"] <= size * 2.5
+    assert metrics["loads"] == 5
+
+
+def test_invalidate_reloads(db_path):
+    registry = ConfigurationRegistry("sqlite", sqlite_location=db_path)
+    first = registry.get("app-3")
+    registry.invalidate("app-3")
+    assert registry.get("app-3") is not first
+
+
+def test_loader_factory():
+    loader = MagicMock(spec=BaseConfigLoader)
+    loader.load.return_value = {"KEY": "value"}
+    registry = ConfigurationRegistry(loader_factory=lambda app_id: loader)
+    assert registry.get("any")["KEY"] == "value"
+
+
+def test_compact_tenants_share_keys(db_path):
+    registry = ConfigurationRegistry("sqlite", sqlite_location=db_path, compact=True)
+    registry.preload(["app-0", "app-1"])
+    first, second = registry.get("app-0"), registry.get("app-1")
+    assert first.config.table is second.config.table
+    assert first["VALUE"] == "0"
+    assert estimate_size(first.config) < estimate_size(first.to_dict())
+
+
+def test_requires_one_source():
+    with pytest.raises(ValueError):
+        ConfigurationRegistry()
+    with pytest.raises(ValueError):
+        ConfigurationRegistry("json", file_path="config.json")
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,146 @@
+import http.client
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from config_manager.configuration import Configuration
+from config_manager.http_loader import HTTPConfigLoader
+from config_manager.server import ConfigServer
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "config.db")
+
+
+@pytest.fixture
+def server(db_path):
+    SQLiteConfigLoader(db_path, app_name="App", app_id="app").save({"KEY": "value"})
+    server = ConfigServer(
+        SQLiteConfigLoader(db_path, app_name=""), port=0, refresh_interval=0.05
+    ).start_in_thread()
+    yield server
+    server.stop_thread()
+
+
+def request(server, path, headers=None, method="GET", body=None):
+    connection = http.client.HTTPConnection(server.host, server.port, timeout=5)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, response.getheader("ETag"), response.read()
+    finally:
+        connection.close()
+
+
+def test_etag_and_not_modified(server):
+    status, etag, body = request(server, "/apps/app")
+    assert status == 200
+    assert b'"KEY": "value"' in body
+    status, same_etag, body = request(server, "/apps/app", {"If-None-Match": etag})
+    assert (status, same_etag, body) == (304, etag, b"")
+    assert request(server, "/apps/app", {"If-None-Match": '"other"'})[0] == 200
+
+
+def test_routes(server):
+    assert request(server, "/healthz")[0] == 200
+    assert request(server, "/missing")[0] == 404
+    assert request(server, "/apps/app?wait=soon")[0] == 400
+    assert request(server, "/apps/app", method="PUT", body=b"[1, 2]")[0] == 400
+    assert request(server, "/apps/app", method="PUT", body=b"{not json")[0] == 400
+
+
+def test_request_body_is_bounded(server):
+    for length in ("abc", "-1"):
+        status = request(server, "/apps/app", {"Content-Length": length}, method="PUT")[
+            0
+        ]
+        assert status == 400
+    server.max_body = 10
+    body = b'{"KEY": "' + b"x" * 100 + b'"}'
+    assert request(server, "/apps/app", method="PUT", body=body)[0] == 413
+    assert request(server, "/apps/app")[2] == b'{"KEY": "value"}'
+
+
+def test_compact_configuration_saved_over_http(server, db_path):
+    loader = HTTPConfigLoader(server.url, "app")
+    config = Configuration(loader, app_id="app", compact=True)
+    config["OTHER"] = "compact"
+    stored = SQLiteConfigLoader(db_path, app_name="App", app_id="app").load()
+    assert stored["KEY"] == "value" and stored["OTHER"] == "compact"
+    assert HTTPConfigLoader(server.url, "app").load()["OTHER"] == "compact"
+
+
+def test_put_replaces_and_caches_stored_values(server, db_path):
+    status, etag, body = request(
+        server, "/apps/app", method="PUT", body=b'{"OTHER": 1}'
+    )
+    assert status == 200
+    # The cache holds what the loader stored, not the request body.
+    assert json.loads(body) == {"OTHER": "1"}
+    assert SQLiteConfigLoader(db_path, app_name="App", app_id="app").load() == {
+        "OTHER": "1"
+    }
+    assert request(server, "/apps/app", {"If-None-Match": etag})[0] == 304
+
+
+def test_cached_apps_are_bounded(server):
+    server.max_apps = 2
+    for app_id in ("app", "one", "two", "app"):
+        assert request(server, f"/apps/{app_id}")[0] == 200
+    assert list(server._entries) == ["two", "app"]
+
+
+def test_http_loader_revalidates(server):
+    loader = HTTPConfigLoader(server.url, "app")
+    assert loader.load() == {"KEY": "value"}
+    etag = loader.etag
+    statuses = []
+    request_once = HTTPConfigLoader._request
+
+    def recording(self, *args, **kwargs):
+        result = request_once(self, *args, **kwargs)
+        statuses.append(result[0])
+        return result
+
+    with patch.object(HTTPConfigLoader, "_request", recording):
+        assert loader.load() == {"KEY": "value"}
+    assert statuses == [304]
+    assert loader.etag == etag
+
+
+def test_backend_change_wakes_long_poll(server, db_path):
+    loader = HTTPConfigLoader(server.url, "app")
+    loader.load()
+    assert loader.wait_for_change(timeout=0.1) is None
+
+    def write():
+        time.sleep(0.1)
+        SQLiteConfigLoader(db_path, app_name="App", app_id="app").save(
+            {"KEY": "changed"}
+        )
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    started = time.monotonic()
+    assert loader.wait_for_change(timeout=5) == {"KEY": "changed"}
+    assert time.monotonic() - started < 2
+    writer.join()
+
+
+def test_configuration_over_http(server, db_path):
+    config = Configuration.load_existing("http", app_id="app", base_url=server.url)
+    assert config["KEY"] == "value"
+    config["OTHER"] = "set over http"
+    stored = SQLiteConfigLoader(db_path, app_name="App", app_id="app").load()
+    assert stored["OTHER"] == "set over http"
+    other = HTTPConfigLoader(server.url, "app")
+    assert other.load()["OTHER"] == "set over http"
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,170 @@
+import gc
+import os
+import threading
+import weakref
+from unittest.mock import MagicMock
+
+import pytest
+
+from config_manager.base_loader import BaseConfigLoader
+from config_manager.configuration import Configuration
+from config_manager.snapshot import SnapshotLoader
+
+
+@pytest.fixture
+def primary():
+    loader = MagicMock(spec=BaseConfigLoader)
+    loader.load.return_value = {"KEY": "fresh"}
+    return loader
+
+
+def write_snapshot(snapshot_dir, app_id, config):
+    loader = SnapshotLoader(MagicMock(spec=BaseConfigLoader), snapshot_dir, app_id)
+    loader._snapshot.save(config)
+
+
+def test_first_load_writes_snapshot(primary, tmp_path):
+    loader = SnapshotLoader(primary, str(tmp_path), app_id="app")
+    assert loader.load() == {"KEY": "fresh"}
+    assert loader.flush(timeout=5)
+    assert os.path.exists(loader.snapshot_path)
+    assert loader.stale is False
+
+
+def test_missing_snapshot_and_primary_down(primary, tmp_path):
+    primary.load.side_effect = ConnectionError("down")
+    with pytest.raises(ConnectionError):
+        SnapshotLoader(primary, str(tmp_path), app_id="app").load()
+
+
+def test_stale_while_revalidate(primary, tmp_path):
+    write_snapshot(str(tmp_path), "app", {"KEY": "stale"})
+    release = threading.Event()
+
+    def slow_load():
+        release.wait(5)
+        return {"KEY": "fresh"}
+
+    primary.load.side_effect = slow_load
+    loader = SnapshotLoader(primary, str(tmp_path), app_id="app")
+    config = Configuration(loader, app_id="app")
+    assert config["KEY"] == "stale"
+    assert loader.stale is True
+    release.set()
+    assert loader.wait_fresh(timeout=5)
+    assert loader.flush(timeout=5)
+    assert config["KEY"] == "fresh"
+    assert config["APP_ID"] == "app"
+    assert loader.stale is False
+    assert loader._snapshot.load().copy() == {"KEY": "fresh"}
+
+
+def test_revalidation_retries(primary, tmp_path):
+    write_snapshot(str(tmp_path), "app", {"KEY": "stale"})
+    primary.load.side_effect = [ConnectionError("down"), {"KEY": "fresh"}]
+    loader = SnapshotLoader(primary, str(tmp_path), app_id="app", retry_interval=0.01)
+    assert loader.load() == {"KEY": "stale"}
+    assert loader.wait_fresh(timeout=5)
+    assert primary.load.call_count == 2
+
+
+def test_fallback_without_revalidation(primary, tmp_path):
+    write_snapshot(str(tmp_path), "app", {"KEY": "stale"})
+    loader = SnapshotLoader(primary, str(tmp_path), app_id="app", revalidate=False)
+    assert loader.load() == {"KEY": "fresh"}
+    primary.load.side_effect = ConnectionError("down")
+    assert loader.flush(timeout=5)
+    assert loader.load() == {"KEY": "fresh"}
+    assert loader.stale is True
+
+
+def test_writes_wait_for_fresh_data(primary, tmp_path):
+    write_snapshot(str(tmp_path), "app", {"KEY": "stale", "OLD": "stale"})
+    release = threading.Event()
+
+    def slow_load():
+        release.wait(5)
+        return {"KEY": "fresh", "NEW": "fresh"}
+
+    primary.load.side_effect = slow_load
+    loader = SnapshotLoader(primary, str(tmp_path), app_id="app")
+    config = Configuration(loader, app_id="app")
+    threading.Timer(0.1, release.set).start()
+    config["OTHER"] = "local"
+    saved = primary.save.call_args[0][0]
+    assert saved["KEY"] == "fresh" and saved["OTHER"] == "local"
+    assert "OLD" not in saved
+    assert config["NEW"] == "fresh"
+
+
+def test_write_times_out_while_primary_down(primary, tmp_path):
+    write_snapshot(str(tmp_path), "app", {"KEY": "stale"})
+    primary.load.side_effect = ConnectionError("down")
+    loader = SnapshotLoader(primary, str(tmp_path), app_id="app", write_timeout=0.05)
+    config = Configuration(loader, app_id="app")
+    with pytest.raises(TimeoutError):
+        config["KEY"] = "lost"
+    primary.save.assert_not_called()
+    loader.close()
+
+
+def test_refreshed_data_is_delivered_once(primary, tmp_path):
+    write_snapshot(str(tmp_path), "app", {"KEY": "stale"})
+    loader = SnapshotLoader(primary, str(tmp_path), app_id="app")
+    loader.load()
+    assert loader.wait_fresh(timeout=5)
+    first, second = [], []
+    loader.subscribe(first.append)
+    loader.subscribe(second.append)
+    assert first == [{"KEY": "fresh"}]
+    assert second == []
+
+
+def test_subscribers_are_not_kept_alive(primary, tmp_path):
+    write_snapshot(str(tmp_path), "app", {"KEY": "stale"})
+    release = threading.Event()
+    primary.load.side_effect = lambda: release.wait(5) and {"KEY": "fresh"}
+    loader = SnapshotLoader(primary, str(tmp_path), app_id="app")
+    config = Configuration(loader, app_id="app")
+    reference = weakref.ref(config)
+    received = []
+    unsubscribe = loader.subscribe(received.append)
+    del config
+    gc.collect()
+    assert reference() is None
+    unsubscribe()
+    release.set()
+    assert loader.wait_fresh(timeout=5)
+    assert received == [] and loader._subscribers == []
+
+
+def test_save_updates_snapshot(primary, tmp_path):
+    loader = SnapshotLoader(primary, str(tmp_path), app_id="app")
+    loader.save({"KEY": "saved"})
+    primary.save.assert_called_once_with({"KEY": "saved"})
+    assert loader.flush(timeout=5)
+    assert loader._snapshot.load().copy() == {"KEY": "saved"}
+
+
+def test_load_existing_with_snapshot_dir(tmp_path):
+    db_path = str(tmp_path / "config.db")
+    snapshot_dir = str(tmp_path / "snapshots")
+    config = Configuration.load_existing(
+        "sqlite", app_id="app", sqlite_location=db_path, snapshot_dir=snapshot_dir
+    )
+    assert isinstance(config.loader, SnapshotLoader)
+    config["KEY"] = "value"
+    assert config.loader.flush(timeout=5)
+    # Restarted against a primary that cannot be read.
+    restarted = Configuration.load_existing(
+        "json",
+        app_id="app",
+        file_path=str(tmp_path / "missing" / "config.json"),
+        snapshot_dir=snapshot_dir,
+        revalidate=False,
+    )
+    assert restarted["KEY"] == "value"
+
+
+if __name__ == "__main__":
+    pytest.main()
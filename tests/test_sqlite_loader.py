@@ -0,0 +1,154 @@
+import sqlite3
+
+import pytest
+
+from config_manager.sqlite_loader import SQLiteConfigLoader
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "config.db")
+
+
+@pytest.fixture
+def loader(db_path):
+    return SQLiteConfigLoader(
+        sqlite_location=db_path,
+        app_name="TestApp",
+        app_id="123e4567-e89b-12d3-a456-426614174000",
+    )
+
+
+def test_save_and_load(loader):
+    loader.save({"KEY1": "value1", "KEY2": "value2"})
+    assert loader.load() == {"KEY1": "value1", "KEY2": "value2"}
+
+
+def test_save_overwrites(loader):
+    loader.save({"KEY1": "value1"})
+    loader.save({"KEY1": "value2"})
+    assert loader.load() == {"KEY1": "value2"}
+
+
+def test_apps_are_isolated(loader, db_path):
+    other = SQLiteConfigLoader(
+        sqlite_location=db_path, app_name="Other", app_id="other"
+    )
+    loader.save({"KEY1": "value1"})
+    other.save({"KEY1": "other"})
+    assert loader.load() == {"KEY1": "value1"}
+    assert other.load() == {"KEY1": "other"}
+
+
+def test_nested_values_as_dotted_keys(db_path):
+    loader = SQLiteConfigLoader(
+        sqlite_location=db_path, app_name="Nested", app_id="nested", nested=True
+    )
+    config = {"db": {"host": "localhost", "replicas": [{"host": "r1"}]}}
+    loader.save(config)
+    assert loader.load() == config
+    flat = SQLiteConfigLoader(
+        sqlite_location=db_path, app_name="Nested", app_id="nested"
+    )
+    assert flat.load() == {"db.host": "localhost", "db.replicas.0.host": "r1"}
+
+
+def test_nested_save_replaces_subtrees(db_path):
+    loader = SQLiteConfigLoader(
+        sqlite_location=db_path, app_name="Nested", app_id="nested", nested=True
+    )
+    loader.save({"db": {"host": "h", "replicas": ["r1", "r2"]}, "cache": {"ttl": "5"}})
+    loader.save({"db": {"host": "h", "replicas": ["r1"]}, "cache": "off"})
+    assert loader.load() == {"db": {"host": "h", "replicas": ["r1"]}, "cache": "off"}
+    loader.save({"cache": {"ttl": "10"}})
+    assert loader.load() == {
+        "db": {"host": "h", "replicas": ["r1"]},
+        "cache": {"ttl": "10"},
+    }
+    loader.save_many({"nested": {"db": "x"}})
+    assert loader.load() == {"db": "x", "cache": {"ttl": "10"}}
+
+
+def test_load_many(loader, db_path):
+    for index in range(5):
+        loader.for_app(f"app-{index}").save({"INDEX": str(index)})
+    configs = loader.load_many([f"app-{index}" for index in range(5)] + ["missing"])
+    assert configs["app-3"] == {"INDEX": "3"}
+    assert configs["missing"] == {}
+    assert len(configs) == 6
+
+
+def test_iter_many_chunks(loader):
+    loader.for_app("a").save({"KEY": "a"})
+    loader.for_app("b").save({"KEY": "b"})
+    assert list(loader.iter_many(["a", "b", "a"], chunk_size=1)) == [
+        ("a", {"KEY": "a"}),
+        ("b", {"KEY": "b"}),
+    ]
+
+
+def test_for_app_keeps_settings(loader):
+    other = loader.for_app("other", app_name="Other")
+    assert other.sqlite_location == loader.sqlite_location
+    assert (other.app_id, other.app_name) == ("other", "Other")
+    assert loader.app_id == "123e4567-e89b-12d3-a456-426614174000"
+
+
+@pytest.fixture
+def history_loader(db_path):
+    return SQLiteConfigLoader(
+        sqlite_location=db_path,
+        app_name="TestApp",
+        app_id="123e4567-e89b-12d3-a456-426614174000",
+        history=True,
+        retention=20,
+    )
+
+
+def test_history_versions(history_loader):
+    history_loader.save({"KEY1": "value1", "KEY2": "value2"})
+    history_loader.save({"KEY1": "changed", "KEY2": "value2"})
+    history_loader.save({"KEY1": "changed", "KEY2": "value2"})
+    history_loader.save({"KEY1": "changed", "KEY3": 3})
+    assert [version for version, _ in history_loader.versions()] == [1, 2, 3]
+    assert history_loader.current_version() == 3
+    assert history_loader.load() == {"KEY1": "changed", "KEY3": "3"}
+    assert history_loader.load_version(1) == {"KEY1": "value1", "KEY2": "value2"}
+    assert history_loader.load_version(2) == {"KEY1": "changed", "KEY2": "value2"}
+    with pytest.raises(ValueError):
+        history_loader.load_version(4)
+
+
+def test_history_skips_unchanged_values(history_loader):
+    history_loader.save({"NUMBER": 1, "FLAG": True})
+    history_loader.save({"NUMBER": 1, "FLAG": True})
+    assert history_loader.current_version() == 1
+
+
+def test_history_retention_prunes_old_versions(history_loader):
+    history_loader.save({"STATIC": "kept", "COUNTER": "0", "GONE": "x"})
+    for index in range(1, 40):
+        config = {"STATIC": "kept", "COUNTER": str(index)}
+        history_loader.save(config)
+    versions = [version for version, _ in history_loader.versions()]
+    assert versions[-1] == 40
+    assert 20 <= len(versions) < 40
+    assert history_loader.load_version(versions[0]) == {
+        "STATIC": "kept",
+        "COUNTER": str(versions[0] - 1),
+    }
+    with pytest.raises(ValueError):
+        history_loader.load_version(1)
+    with sqlite3.connect(history_loader.sqlite_location) as connection:
+        (rows,) = connection.execute("SELECT COUNT(*) FROM config_history").fetchone()
+    assert rows == len(versions) + 1
+
+
+def test_history_disabled(loader):
+    loader.save({"KEY1": "value1"})
+    with pytest.raises(ValueError):
+        loader.load_version(1)
+
+
+if __name__ == "__main__":
+    pytest.main()
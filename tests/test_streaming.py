@@ -0,0 +1,128 @@
+import io
+import json
+
+import pytest
+import yaml
+
+from config_manager.configuration import Configuration
+from config_manager.json_loader import JSONConfigLoader
+from config_manager.streaming import iter_json_items, iter_yaml_items, split_path
+from config_manager.yaml_loader import YAMLConfigLoader
+
+
+@pytest.fixture
+def document():
+    return {
+        "app": {"name": "demo", "escaped": 'a "quoted" } value\\'},
+        "db": {
+            "host": "localhost",
+            "replicas": [{"host": "r1"}, {"host": "r2", "tags": {"zone": "b"}}],
+        },
+        "unused": {f"KEY_{i}": [i, {"nested": [None, True, 1.5]}] for i in range(200)},
+    }
+
+
+def test_split_path():
+    assert split_path(None) == []
+    assert split_path("db.replicas.0") == ["db", "replicas", "0"]
+    assert split_path(["db", 0]) == ["db", "0"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 65536])
+def test_iter_json_items(document, chunk_size):
+    text = json.dumps(document)
+    assert dict(iter_json_items(io.StringIO(text), chunk_size=chunk_size)) == document
+    assert (
+        dict(iter_json_items(io.StringIO(text), "app", chunk_size=chunk_size))
+        == document["app"]
+    )
+    assert (
+        dict(iter_json_items(io.StringIO(text), "db.replicas.1", chunk_size=chunk_size))
+        == document["db"]["replicas"][1]
+    )
+
+
+def test_iter_json_items_errors(document):
+    text = json.dumps(document)
+    with pytest.raises(KeyError):
+        list(iter_json_items(io.StringIO(text), "db.missing"))
+    with pytest.raises(ValueError):
+        list(iter_json_items(io.StringIO(text), "db.host"))
+    with pytest.raises(ValueError):
+        list(iter_json_items(io.StringIO('{"a": [1, 2}')))
+
+
+@pytest.mark.parametrize("loader_class", [yaml.SafeLoader, None])
+def test_iter_yaml_items(document, loader_class):
+    text = yaml.dump(document)
+    assert (
+        dict(iter_yaml_items(io.StringIO(text), loader_class=loader_class)) == document
+    )
+    assert (
+        dict(iter_yaml_items(io.StringIO(text), "db.replicas.1", loader_class))
+        == document["db"]["replicas"][1]
+    )
+    with pytest.raises(KeyError):
+        list(iter_yaml_items(io.StringIO(text), "db.missing", loader_class))
+
+
+def test_iter_yaml_items_anchors_and_merge_keys():
+    text = """
+defaults: &defaults
+  timeout: 30
+  retries: 3
+service:
+  <<: *defaults
+  retries: 5
+  name: api
+"""
+    assert dict(iter_yaml_items(io.StringIO(text), "service")) == {
+        "timeout": 30,
+        "retries": 5,
+        "name": "api",
+    }
+
+
+def test_json_loader_root_path(document, tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(document))
+    loader = JSONConfigLoader(file_path=str(path), root_path="db")
+    assert loader.load() == document["db"]
+
+
+def test_yaml_loader_root_path(document, tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.dump(document))
+    loader = YAMLConfigLoader(file_path=str(path), root_path="app")
+    assert loader.load() == document["app"]
+
+
+def test_save_writes_sub_tree_back(document, tmp_path):
+    json_path = tmp_path / "config.json"
+    json_path.write_text(json.dumps(document))
+    JSONConfigLoader(file_path=str(json_path), root_path="db.replicas.0").save(
+        {"host": "r0"}
+    )
+    saved = json.loads(json_path.read_text())
+    assert saved["db"]["replicas"][0] == {"host": "r0"}
+    assert saved["unused"] == document["unused"]
+
+    yaml_path = tmp_path / "config.yaml"
+    yaml_path.write_text(yaml.dump(document))
+    YAMLConfigLoader(file_path=str(yaml_path), root_path="app").save({"name": "new"})
+    saved = yaml.safe_load(yaml_path.read_text())
+    assert saved["app"] == {"name": "new"}
+    assert saved["db"] == document["db"]
+
+
+def test_configuration_from_sub_tree(document, tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(document))
+    config = Configuration.load_existing(
+        config_type="json", app_id="app", file_path=str(path), root_path="app"
+    )
+    assert config.to_dict() == dict(document["app"], APP_ID="app")
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -0,0 +1,149 @@
+import gc
+import json
+from unittest.mock import patch
+
+import pytest
+
+from config_manager import working_set
+from config_manager.configuration import Configuration
+from config_manager.sqlite_loader import SQLiteConfigLoader
+from config_manager.working_set import AccessLog, LazyMapping
+
+APP_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+@pytest.fixture
+def database(tmp_path):
+    location = str(tmp_path / "config.db")
+    loader = SQLiteConfigLoader(location, app_name="app", app_id=APP_ID)
+    loader.save({f"KEY{index}": f"value{index}" for index in range(100)})
+    return location
+
+
+def load(database, tmp_path, **kwargs):
+    return Configuration.load_existing(
+        "sqlite",
+        APP_ID,
+        sqlite_location=database,
+        access_dir=str(tmp_path / "access"),
+        process_name="worker",
+        **kwargs,
+    )
+
+
+def test_access_log_persists_keys(tmp_path):
+    log = AccessLog(str(tmp_path), APP_ID, process_name="worker")
+    assert log.keys() == []
+    log.record("A")
+    log.record("B")
+    log.flush()
+    with open(log.file_path, encoding="utf-8") as file:
+        assert json.load(file) == {"runs": 1, "keys": {"A": 1, "B": 1}}
+    assert sorted(AccessLog(str(tmp_path), APP_ID, process_name="worker").keys()) == [
+        "A",
+        "B",
+    ]
+    assert AccessLog(str(tmp_path), APP_ID, process_name="other").keys() == []
+
+
+def test_access_log_drops_unused_keys(tmp_path):
+    for run in range(3):
+        log = AccessLog(str(tmp_path), APP_ID, process_name="worker", max_runs=2)
+        log.record("B")
+        if run == 0:
+            log.record("A")
+        log.flush()
+    assert sorted(log.keys()) == ["A", "B"]
+    assert AccessLog(str(tmp_path), APP_ID, process_name="worker").keys() == ["B"]
+
+
+def test_first_run_loads_everything_and_records(database, tmp_path):
+    config = load(database, tmp_path)
+    assert isinstance(config.config, dict)
+    assert config["KEY1"] == "value1"
+    assert config.get("MISSING") is None
+    assert config.KEY2 == "value2"
+    config.access_log.flush()
+    log = AccessLog(str(tmp_path / "access"), APP_ID, process_name="worker")
+    assert sorted(log.keys()) == ["KEY1", "KEY2", "MISSING"]
+
+
+def test_prefetches_working_set(database, tmp_path):
+    first = load(database, tmp_path)
+    first["KEY1"], first.get("MISSING")
+    first.access_log.flush()
+
+    with patch.object(
+        SQLiteConfigLoader,
+        "load_keys",
+        autospec=True,
+        side_effect=SQLiteConfigLoader.load_keys,
+    ) as load_keys, patch.object(
+        SQLiteConfigLoader, "load", autospec=True, side_effect=SQLiteConfigLoader.load
+    ) as full_load:
+        config = load(database, tmp_path)
+        assert isinstance(config.config, LazyMapping)
+        assert config["KEY1"] == "value1"
+        assert config.get("MISSING", "default") == "default"
+        assert load_keys.call_count == 1
+        assert config["KEY50"] == "value50"  # miss, fetched on its own
+        assert load_keys.call_count == 2
+        full_load.assert_not_called()
+        assert len(config) == 101
+        assert full_load.call_count == 1
+
+
+def test_interpolation_loads_everything_at_once(database, tmp_path):
+    first = load(database, tmp_path)
+    first["KEY1"]
+    first.access_log.flush()
+    with patch.object(SQLiteConfigLoader, "load_keys") as load_keys:
+        config = load(database, tmp_path, interpolate=True)
+    assert isinstance(config.config, dict)
+    load_keys.assert_not_called()
+
+
+def test_logs_flushed_at_exit_without_being_kept_alive(tmp_path):
+    log = AccessLog(str(tmp_path), APP_ID, process_name="worker")
+    log.record("A")
+    working_set._flush_all()
+    assert AccessLog(str(tmp_path), APP_ID, process_name="worker").keys() == ["A"]
+    count = len(working_set._logs)
+    del log
+    gc.collect()
+    assert len(working_set._logs) < count
+
+
+def test_partial_configuration_saves_everything(database, tmp_path):
+    first = load(database, tmp_path)
+    first["KEY1"]
+    first.access_log.flush()
+
+    config = load(database, tmp_path)
+    config["KEY1"] = "changed"
+    del config["KEY2"]
+    stored = SQLiteConfigLoader(database, app_name="app", app_id=APP_ID).load()
+    assert stored["KEY1"] == "changed"
+    assert stored["KEY99"] == "value99"
+    assert "KEY2" not in config.config
+
+
+def test_nested_working_set(tmp_path):
+    location = str(tmp_path / "nested.db")
+    loader = SQLiteConfigLoader(location, app_name="app", app_id=APP_ID, nested=True)
+    loader.save({"db": {"host": "localhost", "port": 5432}, "other": "x"})
+    assert loader.load_keys(["db"]) == {"db": {"host": "localhost", "port": "5432"}}
+
+    kwargs = {"nested": True}
+    first = load(location, tmp_path, **kwargs)
+    assert first.get("db.host") == "localhost"
+    first.access_log.flush()
+    assert first.access_log.keys() == []
+    config = load(location, tmp_path, **kwargs)
+    assert config.access_log.keys() == ["db"]
+    assert config.get("db.port") == "5432"
+    assert not config.config.complete
+
+
+if __name__ == "__main__":
+    pytest.main()
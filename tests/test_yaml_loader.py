@@ -1,7 +1,7 @@
 import pytest
 import yaml
 
-from config_manager.yaml_loader import YAMLConfigLoader
+from config_manager.yaml_loader import HAS_LIBYAML, YAMLConfigLoader, get_yaml_classes
 
 
 @pytest.fixture
@@ -39,5 +39,38 @@ def test_save_yaml_without_file_returns_yaml(sample_yaml):
     assert config == yaml.dump(sample_yaml)
 
 
+@pytest.mark.parametrize("use_libyaml", [True, False])
+def test_load_save_with_each_implementation(use_libyaml, sample_yaml, tmp_path):
+    yaml_path = tmp_path / "config.yaml"
+    loader = YAMLConfigLoader(file_path=str(yaml_path), use_libyaml=use_libyaml)
+    loader.save(sample_yaml)
+    assert loader.load() == sample_yaml
+
+
+def test_libyaml_selection():
+    loader_class, dumper_class = get_yaml_classes(use_libyaml=False)
+    assert loader_class is yaml.SafeLoader
+    assert dumper_class is yaml.SafeDumper
+    if HAS_LIBYAML:
+        assert get_yaml_classes() == (yaml.CSafeLoader, yaml.CSafeDumper)
+
+
+def test_multi_document_round_trip(tmp_path):
+    documents = [{"app": "one"}, {"app": "two"}, {"app": "three"}]
+    yaml_path = tmp_path / "apps.yaml"
+    loader = YAMLConfigLoader(file_path=str(yaml_path))
+    loader.save_documents(iter(documents))
+    assert list(loader.iter_documents()) == documents
+
+
+def test_multi_document_without_file(sample_yaml):
+    loader = YAMLConfigLoader()
+    data = loader.save_documents([sample_yaml, sample_yaml])
+    assert list(YAMLConfigLoader(yaml_data=data).iter_documents()) == [
+        sample_yaml,
+        sample_yaml,
+    ]
+
+
 if __name__ == "__main__":
     pytest.main()